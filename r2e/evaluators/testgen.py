@@ -101,13 +101,17 @@ class TestGenEvaluator:
         self.problem_metrics["runnable_problems"].add(fut.id)
 
         run_test_logs = exec_stats["run_tests_logs"]
-        coverage_logs = exec_stats["coverage_logs"]
+        coverage_logs = exec_stats.get("coverage_logs", [])
         is_valid = self.parse_run_test_logs(run_test_logs)
 
         if is_valid:
             self.repo_properties["valid_repos"].add(fut.repo.repo_id)
             self.problem_metrics["valid_problems"].add(fut.id)
 
+            # no coverage (e.g., of a group that could not be split)
+            if not coverage_logs:
+                return
+
             executed_lines, executed_branches, line_cov, branch_cov = (
                 self.parse_coverage_logs(coverage_logs)
             )
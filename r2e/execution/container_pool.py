@@ -0,0 +1,242 @@
+"""Pool of warm execution containers (with test servers) per repo."""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+import rpyc
+
+from r2e.execution.r2e_simulator import DockerSimulator
+from r2e.execution.ports import PortAllocator, get_port_allocator
+
+
+def connect_service(port: int) -> rpyc.Connection:
+    return rpyc.connect(
+        "localhost", port, keepalive=True, config={"sync_request_timeout": 180}
+    )
+
+
+class PooledContainer:
+    """A running container, its test server port and the connection to it."""
+
+    def __init__(
+        self,
+        simulator: DockerSimulator,
+        port: int,
+        connect: Callable[[int], rpyc.Connection],
+        ready_timeout: float = 60,
+    ):
+        self.simulator = simulator
+        self.port = port
+        self.connect = connect
+        self.ready_timeout = ready_timeout
+        self.conn: Optional[rpyc.Connection] = None
+        self.uses = 0
+
+    @property
+    def repo_id(self) -> str:
+        return self.simulator.repo_id
+
+    def connection(self) -> rpyc.Connection:
+        if self.conn is None or self.conn.closed:
+            self.conn = self.connect(self.port)
+        return self.conn
+
+    def is_healthy(self) -> bool:
+        if not self.simulator.is_running():
+            return False
+        try:
+            self.connection().ping(timeout=10)
+        except Exception:
+            return False
+        return True
+
+    def reset(self):
+        """Restart the test server on a clean repo for the next FUT"""
+        self.close_connection()
+        self.simulator.restart_server(self.port)
+        self.wait_until_ready()
+
+    def wait_until_ready(self, interval: float = 0.5):
+        """Wait (up to `ready_timeout` seconds) until the test server answers.
+
+        The server is started in the background, so the container must not
+        be leased (and health checked) before it listens on its port.
+        """
+        deadline = time.monotonic() + self.ready_timeout
+        while True:
+            try:
+                self.connection().ping(timeout=10)
+                return
+            except Exception as e:
+                self.close_connection()
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(
+                        f"Test server of {self.repo_id} not ready on port {self.port}"
+                    ) from e
+            time.sleep(interval)
+
+    def close_connection(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+
+    def stop(self):
+        self.close_connection()
+        self.simulator.stop_container()
+
+
+class ContainerPool:
+    """Keeps up to `containers_per_repo` warm containers per repo of an image.
+
+    Containers are leased to run FUTs of their repo and are reset
+    (fresh test server, repo files restored) when released; a reset
+    container is only leased again once its test server answers.
+    A container is recycled after `max_uses` leases or when it fails
+    a health check.
+
+    Args:
+        image_name (str): docker image with the installed repos
+        containers_per_repo (int): maximum number of containers per repo
+        max_uses (int): number of leases after which a container is recycled
+        ready_timeout (float): seconds to wait for a restarted test server
+        port_allocator (PortAllocator): reserves the host ports of the test servers
+        start_simulator (Callable): starts a container (for tests)
+        connect (Callable): connects to a test server on a port (for tests)
+    """
+
+    def __init__(
+        self,
+        image_name: str,
+        containers_per_repo: int = 1,
+        max_uses: int = 20,
+        ready_timeout: float = 60,
+        port_allocator: Optional[PortAllocator] = None,
+        start_simulator: Optional[Callable[[str, int], DockerSimulator]] = None,
+        connect: Callable[[int], rpyc.Connection] = connect_service,
+    ):
+        self.image_name = image_name
+        self.containers_per_repo = containers_per_repo
+        self.max_uses = max_uses
+        self.ready_timeout = ready_timeout
+        self.port_allocator = port_allocator or get_port_allocator()
+        self.start_simulator = start_simulator or self.default_start_simulator
+        self.connect = connect
+
+        self._idle: dict[str, list[PooledContainer]] = {}
+        self._num_containers: dict[str, int] = {}
+        self._cond = threading.Condition()
+        self.started = 0
+        self.recycled = 0
+
+    def default_start_simulator(self, repo_id: str, port: int) -> DockerSimulator:
+        return DockerSimulator(repo_id=repo_id, port=port, image_name=self.image_name)
+
+    @contextmanager
+    def lease(self, repo_id: str) -> Iterator[rpyc.Connection]:
+        """Lease a connection to a warm test server of the repo.
+
+        The container is discarded if the body raises (its state is unknown).
+        """
+        container = self.acquire(repo_id)
+        try:
+            conn = container.connection()
+            yield conn
+        except BaseException:
+            self.release(container, healthy=False)
+            raise
+        self.release(container, healthy=True)
+
+    def acquire(self, repo_id: str) -> PooledContainer:
+        while True:
+            with self._cond:
+                while True:
+                    idle = self._idle.get(repo_id, [])
+                    if idle:
+                        container = idle.pop()
+                        break
+                    if self._num_containers.get(repo_id, 0) < self.containers_per_repo:
+                        container = None
+                        self._num_containers[repo_id] = (
+                            self._num_containers.get(repo_id, 0) + 1
+                        )
+                        break
+                    self._cond.wait()
+
+            if container is None:
+                try:
+                    port = self.port_allocator.allocate()
+                except BaseException:
+                    self._discard(repo_id, None)
+                    raise
+                try:
+                    container = self._start(repo_id, port)
+                except BaseException:
+                    self._discard(repo_id, port)
+                    raise
+                return container
+
+            if container.is_healthy():
+                return container
+            self._stop(container)
+
+    def release(self, container: PooledContainer, healthy: bool = True):
+        container.uses += 1
+        if not healthy or container.uses >= self.max_uses:
+            self._stop(container)
+            return
+
+        try:
+            container.reset()
+        except Exception:
+            self._stop(container)
+            return
+
+        with self._cond:
+            self._idle.setdefault(container.repo_id, []).append(container)
+            self._cond.notify_all()
+
+    def close_repo(self, repo_id: str):
+        """Stop the idle containers of a repo (e.g., once all its FUTs ran)"""
+        with self._cond:
+            containers = self._idle.pop(repo_id, [])
+        for container in containers:
+            self._stop(container)
+
+    def close(self):
+        """Stop all the idle containers"""
+        with self._cond:
+            repo_ids = list(self._idle)
+        for repo_id in repo_ids:
+            self.close_repo(repo_id)
+
+    def __enter__(self) -> "ContainerPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # helpers
+
+    def _start(self, repo_id: str, port: int) -> PooledContainer:
+        simulator = self.start_simulator(repo_id, port)
+        self.started += 1
+        return PooledContainer(simulator, port, self.connect, self.ready_timeout)
+
+    def _stop(self, container: PooledContainer):
+        try:
+            container.stop()
+        finally:
+            self.recycled += 1
+            self._discard(container.repo_id, container.port)
+
+    def _discard(self, repo_id: str, port: Optional[int]):
+        if port is not None:
+            self.port_allocator.release(port)
+        with self._cond:
+            self._num_containers[repo_id] -= 1
+            self._cond.notify_all()
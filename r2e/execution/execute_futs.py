@@ -1,7 +1,8 @@
 import json
 import rpyc
-from collections import ChainMap
+from typing import Any
 
+from r2e.logger import logger
 from r2e.models import FunctionUnderTest, MethodUnderTest
 
 
@@ -31,7 +32,7 @@ def setup_futs(
 
     fut_data = json.dumps({"funclass_names": fut_names, "file_path": fut_files.pop()})
 
-    all_tests: dict[str, str] = dict(ChainMap(*[fut.tests for fut in futs]))
+    all_tests = group_tests(futs)
     test_data = json.dumps({"generated_tests": all_tests})
 
     service_client.setup_repo(repo_data)
@@ -42,19 +43,104 @@ def setup_futs(
     init_error = str(init_response["error"])
 
     if init_error:
-        futs[0].test_history.update_exec_stats(
-            {
-                "output": (
-                    str(init_response["output"]) if "output" in init_response else None
-                ),
-                "error": init_error,
-            }
-        )
+        for fut in futs:
+            fut.test_history.update_exec_stats(
+                {
+                    "output": (
+                        str(init_response["output"])
+                        if "output" in init_response
+                        else None
+                    ),
+                    "error": init_error,
+                }
+            )
         return False, init_error
     else:
         return True, init_error
 
 
+GROUP_TEST_SEP = "__"
+
+
+def group_tests(futs: list[FunctionUnderTest | MethodUnderTest]) -> dict[str, str]:
+    """
+    Generated tests of the futs sent in one submission
+    with multiple futs, test ids are prefixed by the fut index (`fut{idx}__test_0`)
+    so that the tests of different futs do not clash and can be split back
+    """
+    if len(futs) == 1:
+        return dict(futs[0].tests)
+
+    return {
+        f"fut{idx}{GROUP_TEST_SEP}{test_id}": test
+        for idx, fut in enumerate(futs)
+        for test_id, test in fut.tests.items()
+    }
+
+
+def plan_fut_groups(
+    futs: list[FunctionUnderTest | MethodUnderTest], max_group_size: int = 1
+) -> list[list[FunctionUnderTest | MethodUnderTest]]:
+    """
+    Plans the submissions of the futs: futs of the same repo and file are
+    grouped (up to `max_group_size` futs) to run in one container submission
+    a fut whose funclass name is already in a group starts a new group
+    Groups are ordered by their first fut
+    """
+    groups: list[list[FunctionUnderTest | MethodUnderTest]] = []
+    open_groups: dict[tuple[str, str], int] = {}
+    for fut in futs:
+        name, file_path = fut.execution_fut_data
+        key = (fut.repo_id, file_path)
+        idx = open_groups.get(key)
+        if idx is not None:
+            group = groups[idx]
+            names = {x.execution_fut_data[0] for x in group}
+            if len(group) < max_group_size and name not in names:
+                group.append(fut)
+                continue
+        open_groups[key] = len(groups)
+        groups.append([fut])
+    return groups
+
+
+def split_submission_logs(
+    futs: list[FunctionUnderTest | MethodUnderTest], submission_logs: dict[str, Any]
+) -> list[dict[str, Any]]:
+    """
+    Splits the logs of a submission with multiple futs into per-fut logs
+    `run_tests_logs` are split by test id prefix (see `group_tests`) and
+    `coverage_logs` by position (one entry per fut, in order); coverage
+    that cannot be attributed to the futs is left empty (see `run_planned_futs`)
+    """
+    if len(futs) == 1:
+        return [submission_logs]
+
+    coverage_logs = submission_logs.get("coverage_logs")
+    split_coverage = isinstance(coverage_logs, list) and len(coverage_logs) == len(futs)
+    if coverage_logs is not None and not split_coverage:
+        logger.warning(
+            f"Coverage logs of {futs[0].repo_id} "
+            f"cannot be split among {len(futs)} functions"
+        )
+
+    fut_logs = []
+    for idx in range(len(futs)):
+        logs = dict(submission_logs)
+        prefix = f"fut{idx}{GROUP_TEST_SEP}"
+        logs["run_tests_logs"] = {
+            test_id[len(prefix) :]: test_logs
+            for test_id, test_logs in submission_logs["run_tests_logs"].items()
+            if test_id.startswith(prefix)
+        }
+        if split_coverage:
+            logs["coverage_logs"] = [coverage_logs[idx]]  # type: ignore
+        else:
+            logs["coverage_logs"] = []
+        fut_logs.append(logs)
+    return fut_logs
+
+
 def self_equiv_futs(
     futs: list[FunctionUnderTest | MethodUnderTest], service_connection: rpyc.Connection
 ) -> tuple[bool, str, FunctionUnderTest | MethodUnderTest]:
@@ -66,6 +152,9 @@ def self_equiv_futs(
 
     It also stores the relevant metadata (captured I/O) in the futs (in place)
 
+    Multiple futs (of the same file) are set up and submitted together;
+    the logs are split back into the exec stats of each fut
+
     Returns a boolean based on the success of the self-equivalence
     """
     service_client = service_connection.root
@@ -80,18 +169,19 @@ def self_equiv_futs(
 
     if "logs" not in submission_response:
         # print(submission_response["error"])
-        futs[0].test_history.update_exec_stats(
-            {
-                "error": str(submission_response["error"]),
-            }
-        )
+        for fut in futs:
+            fut.test_history.update_exec_stats(
+                {
+                    "error": str(submission_response["error"]),
+                }
+            )
         return False, str(submission_response["error"]), futs[0]
     submission_logs = json.loads(submission_response["logs"])
 
     valids = [x["valid"] for x in submission_logs["run_tests_logs"].values()]
 
-    ## TODO -- support multiple futs
-    futs[0].test_history.update_exec_stats(submission_logs)
+    for fut, fut_logs in zip(futs, split_submission_logs(futs, submission_logs)):
+        fut.test_history.update_exec_stats(fut_logs)
 
     if not all(valids):
         return False, str(submission_response["error"]), futs[0]
@@ -12,12 +12,45 @@ class ExecutionArgs(BaseModel):
         description="The number of processes to use for executing the functions and methods",
     )
 
+    stream_batch_size: int = Field(
+        1000,
+        description="The number of functions and methods loaded and executed at a time",
+    )
+
+    resume: bool = Field(
+        False,
+        description="Whether to skip the functions and methods already executed in a previous run",
+    )
+
+    retry_failed: bool = Field(
+        False,
+        description="Whether to resume and re-execute the functions and methods that errored",
+    )
+
+    containers_per_repo: int = Field(
+        1,
+        description="The number of warm containers kept per repo (0 starts a container per function)",
+    )
+
+    container_max_uses: int = Field(
+        20,
+        description="The number of functions and methods run in a container before it is recycled",
+    )
+
+    max_futs_per_run: int = Field(
+        8,
+        description="The maximum number of functions and methods of a file run in one test submission",
+    )
+
     port: int = Field(3006, description="The port to use for the execution service")
 
     timeout_per_task: int = Field(
-        180, description="The timeout for the execution service in seconds"
+        180,
+        description="The timeout for the execution service in seconds per function or method "
+        "(scaled for a group of them, see `max_futs_per_run`)",
     )
 
     image_name: str = Field(
-      "r2e:r2e_docker_v4", description="The name of the docker image in which to run the tests"
+        "r2e:r2e_docker_v4",
+        description="The name of the docker image in which to run the tests",
     )
@@ -0,0 +1,133 @@
+"""Host port allocation for the test servers of execution containers."""
+
+import os
+import socket
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_LOCK_DIR = Path(tempfile.gettempdir()) / "r2e_ports"
+
+
+class PortAllocator:
+    """Hands out host ports that are free and not reserved by other processes.
+
+    A port is reserved by atomically creating `<lock_dir>/<port>.lock`
+    (holding the owner's pid) so concurrent workers and runs on the same
+    host never pick the same port; locks of dead processes are reclaimed.
+    A reserved port is also checked to be bindable right now.
+
+    Args:
+        start (int): first port of the range
+        end (int): end of the range (exclusive)
+        lock_dir (str | Path): directory of the lock files
+    """
+
+    def __init__(
+        self,
+        start: int = 3000,
+        end: int = 10000,
+        lock_dir: str | Path = DEFAULT_LOCK_DIR,
+    ):
+        self.start = start
+        self.end = end
+        self.lock_dir = Path(lock_dir)
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        # start scanning at a per-process offset to avoid contention
+        self._next = start + (os.getpid() * 7) % max(1, end - start)
+        self.reserved: set[int] = set()
+
+    def allocate(self) -> int:
+        """Reserve a free port (raises RuntimeError if the range is exhausted)"""
+        num_ports = self.end - self.start
+        for i in range(num_ports):
+            port = self.start + (self._next - self.start + i) % num_ports
+            if self._try_lock(port):
+                if is_port_free(port):
+                    self._next = port + 1 if port + 1 < self.end else self.start
+                    self.reserved.add(port)
+                    return port
+                self._unlock(port)
+        raise RuntimeError(f"No free port in [{self.start}, {self.end})")
+
+    def release(self, port: int):
+        if port in self.reserved:
+            self.reserved.discard(port)
+            self._unlock(port)
+
+    def release_all(self):
+        for port in list(self.reserved):
+            self.release(port)
+
+    # helpers
+
+    def _lock_path(self, port: int) -> Path:
+        return self.lock_dir / f"{port}.lock"
+
+    def _try_lock(self, port: int) -> bool:
+        lock_path = self._lock_path(port)
+        if self._create_lock(lock_path):
+            return True
+        if not self._is_stale(lock_path):
+            return False
+
+        # reclaim the lock of a dead process (only one reclaimer wins)
+        try:
+            os.remove(lock_path)
+        except FileNotFoundError:
+            pass
+        return self._create_lock(lock_path)
+
+    @staticmethod
+    def _create_lock(lock_path: Path) -> bool:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+
+    def _unlock(self, port: int):
+        try:
+            os.remove(self._lock_path(port))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _is_stale(lock_path: Path) -> bool:
+        try:
+            pid = int(lock_path.read_text().strip())
+        except (OSError, ValueError):
+            # being written by its owner right now
+            return False
+        if pid == os.getpid():
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+        return False
+
+
+def is_port_free(port: int, host: str = "0.0.0.0") -> bool:
+    """Whether a TCP port can be bound on the host right now"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind((host, port))
+        except OSError:
+            return False
+    return True
+
+
+_port_allocator: Optional[PortAllocator] = None
+
+
+def get_port_allocator() -> PortAllocator:
+    """Get the process-wide port allocator."""
+    global _port_allocator
+    if _port_allocator is None:
+        _port_allocator = PortAllocator()
+    return _port_allocator
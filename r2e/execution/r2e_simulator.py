@@ -101,6 +101,26 @@ class DockerSimulator:
         #     self.stop_container()
         return
 
+    def reset_repo(self):
+        """Undo the changes made to the repo (e.g., by a FUT run): restore the
+        tracked files and remove the untracked ones (except the venv)"""
+        self.run_single_command(
+            "bash -c 'if [ -d .git ]; then git checkout -q -- . && git clean -fdq -e .venv; fi'"
+        )
+
+    def restart_server(self, port: int):
+        """Start a fresh test server (and repo state) in the running container"""
+        self.run_single_command("pkill -f r2e-test-server")
+        self.reset_repo()
+        self.start_server(self.repo_id, port)
+
+    def is_running(self) -> bool:
+        try:
+            self.container.reload()
+        except Exception:
+            return False
+        return self.container.status == "running"
+
     def stop_container(self):
         try:
             self.container.stop()
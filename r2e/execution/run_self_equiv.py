@@ -1,20 +1,36 @@
+import os
 import rpyc
-import random
+import queue
+import threading
 import traceback
 from pathlib import Path
+from typing import Callable, Iterator
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 import fire
+from tqdm import tqdm
 
 from r2e.paths import TESTGEN_DIR, EXECUTION_DIR
 from r2e.multiprocess import run_tasks_in_parallel_iter
 from r2e.execution.execution_args import ExecutionArgs
 from r2e.execution.r2e_simulator import DockerSimulator
-from r2e.execution.execute_futs import self_equiv_futs
+from r2e.execution.container_pool import ContainerPool
+from r2e.execution.ports import get_port_allocator
+from r2e.execution.execute_futs import plan_fut_groups, self_equiv_futs
 from r2e.models import FunctionUnderTest, MethodUnderTest
-from r2e.utils.data import load_functions_under_test, write_functions_under_test
+from r2e.utils.data import (
+    RecordWriter,
+    find_data_file,
+    iter_batches,
+    iter_functions_under_test,
+    iter_json_records,
+)
 
 
-def get_service(repo_id: str, port: int, image_name: str) -> tuple[DockerSimulator, rpyc.Connection]:
+def get_service(
+    repo_id: str, port: int, image_name: str
+) -> tuple[DockerSimulator, rpyc.Connection]:
     simulator = DockerSimulator(repo_id=repo_id, port=port, image_name=image_name)
     try:
         conn = rpyc.connect(
@@ -27,17 +43,20 @@ def get_service(repo_id: str, port: int, image_name: str) -> tuple[DockerSimulat
     return simulator, conn
 
 
-def run_fut_with_port(
-    fut: FunctionUnderTest | MethodUnderTest, port: int, image_name: str
-) -> tuple[bool, str, FunctionUnderTest | MethodUnderTest]:
+def run_futs_with_port(
+    futs: list[FunctionUnderTest | MethodUnderTest], port: int, image_name: str
+) -> list[FunctionUnderTest | MethodUnderTest]:
+    repo_id = futs[0].repo_id
     try:
-        simulator, conn = get_service(fut.repo_id, port, image_name)
+        simulator, conn = get_service(repo_id, port, image_name)
     except Exception as e:
-        print("Service error@", fut.repo_id, repr(e))
-        fut.test_history.update_exec_stats({"error": repr(e)})
-        return False, repr(e), fut
+        print("Service error@", repo_id, repr(e))
+        for fut in futs:
+            fut.test_history.update_exec_stats({"error": repr(e)})
+        return futs
     try:
-        return self_equiv_futs([fut], conn)
+        self_equiv_futs(futs, conn)
+        return futs
     except Exception as e:
         tb = traceback.format_exc()
         pass
@@ -45,49 +64,252 @@ def run_fut_with_port(
         simulator.stop_container()
         conn.close()
 
-    fut.test_history.update_exec_stats({"error": tb})
-    print(f"Error@{fut.repo_id}:\n{tb}")
-    return False, tb, fut
+    for fut in futs:
+        fut.test_history.update_exec_stats({"error": tb})
+    print(f"Error@{repo_id}:\n{tb}")
+    return futs
+
+
+def run_futs_with_pool(
+    futs: list[FunctionUnderTest | MethodUnderTest], pool: ContainerPool
+) -> list[FunctionUnderTest | MethodUnderTest]:
+    repo_id = futs[0].repo_id
+    try:
+        with pool.lease(repo_id) as conn:
+            self_equiv_futs(futs, conn)
+            return futs
+    except Exception as e:
+        tb = traceback.format_exc()
+
+    for fut in futs:
+        fut.test_history.update_exec_stats({"error": tb})
+    print(f"Error@{repo_id}:\n{tb}")
+    return futs
+
+
+def run_planned_futs(
+    futs: list[FunctionUnderTest | MethodUnderTest], run_futs: Callable
+) -> list[FunctionUnderTest | MethodUnderTest]:
+    """
+    Runs a group of FUTs (of one file) in one submission
+    if the group did not run (e.g., one FUT's tests break the setup)
+    its FUTs are re-run one at a time so they do not fail together
+    FUTs whose coverage could not be split from the group's are re-run too
+    """
+    run_futs(futs)
+    if len(futs) > 1:
+        if not any(is_executed(fut) for fut in futs):
+            rerun_futs = futs
+        else:
+            rerun_futs = [fut for fut in futs if has_unsplit_coverage(fut)]
+        for fut in rerun_futs:
+            run_futs([fut])
+    return futs
+
+
+def run_futs_mp(
+    args: tuple[list[FunctionUnderTest | MethodUnderTest], str]
+) -> list[FunctionUnderTest | MethodUnderTest]:
+    futs, image_name = args
+    port_allocator = get_port_allocator()
+    port = port_allocator.allocate()
+    try:
+        run_futs = lambda group: run_futs_with_port(group, port, image_name)
+        return run_planned_futs(futs, run_futs)
+    finally:
+        port_allocator.release(port)
 
-def run_fut_mp(args: tuple[FunctionUnderTest | MethodUnderTest, str]) -> tuple[bool, str, FunctionUnderTest | MethodUnderTest]:
-    fut, image_name = args
-    ## TODO: selected a random port, can collide with other processes!
-    port = random.randint(3000, 10000)
-    output = run_fut_with_port(fut, port, image_name)
-    return output
 
 def run_self_equiv(exec_args: ExecutionArgs):
-    futs = load_functions_under_test(TESTGEN_DIR / f"{exec_args.testgen_exp_id}.json")
+    in_file = find_data_file(TESTGEN_DIR, exec_args.testgen_exp_id)
+
+    # completed FUTs are appended to the output file as they finish
+    # so that it doubles as a checkpoint log for `--resume`
+    out_file = TESTGEN_DIR / f"{exec_args.testgen_exp_id}_out.jsonl"
+    resume = exec_args.resume or exec_args.retry_failed
+
+    done: dict[str, str] = {}
+    if resume and out_file.exists():
+        done = load_checkpoint(in_file, out_file, exec_args.retry_failed)
+        print(f"Resuming: skipping {len(done)} executed functions and methods")
+    elif out_file.exists():
+        print(f"Overwriting {out_file}. Use --resume to continue the run!")
+
+    futs = (
+        fut
+        for fut in iter_functions_under_test(in_file)
+        if done.get(fut.id) != fut.test_version
+    )
+
+    pool = None
+    if exec_args.containers_per_repo > 0:
+        pool = ContainerPool(
+            exec_args.image_name,
+            containers_per_repo=exec_args.containers_per_repo,
+            max_uses=exec_args.container_max_uses,
+        )
+
+    try:
+        with RecordWriter(out_file, append=resume) as writer:
+            for batch in iter_batches(futs, exec_args.stream_batch_size):
+                if pool is not None:
+                    results = iter_pooled_results(exec_args, batch, pool)
+                else:
+                    results = iter_self_equiv_results(exec_args, batch)
+                writer.write_many(results)
+    finally:
+        if pool is not None:
+            pool.close()
+
+
+def is_executed(fut: FunctionUnderTest | MethodUnderTest) -> bool:
+    """Whether the latest tests of the FUT ran (vs. a setup or service error)"""
+    exec_stats = fut.exec_stats
+    return exec_stats is not None and "run_tests_logs" in exec_stats
+
+
+def has_unsplit_coverage(fut: FunctionUnderTest | MethodUnderTest) -> bool:
+    """Whether the FUT ran in a group whose coverage could not be split"""
+    return is_executed(fut) and fut.exec_stats.get("coverage_logs") == []  # type: ignore
+
+
+def load_checkpoint(
+    in_file: Path, out_file: Path, retry_failed: bool
+) -> dict[str, str]:
+    """
+    Compacts the checkpoint log of a previous run and returns the FUTs to skip
+    Keeps the last record of each FUT that has exec stats for the current
+    test version of the FUT in `in_file` (and that ran if `retry_failed`)
+    Returns {fut_id -> test_version} of the kept records
+    """
+    versions = {fut.id: fut.test_version for fut in iter_functions_under_test(in_file)}
+
+    done: dict[str, str] = {}
+    keep: dict[str, int] = {}
+    for idx, fut in enumerate(iter_functions_under_test(out_file)):
+        if fut.exec_stats is None or versions.get(fut.id) != fut.test_version:
+            continue
+        if retry_failed and not is_executed(fut):
+            done.pop(fut.id, None)
+            keep.pop(fut.id, None)
+            continue
+        done[fut.id] = fut.test_version
+        keep[fut.id] = idx
+
+    keep_idxs = set(keep.values())
+    temp_file = out_file.with_suffix(f".{os.getpid()}.tmp.jsonl")
+    with RecordWriter(temp_file) as writer:
+        for idx, record in enumerate(iter_json_records(out_file)):
+            if idx in keep_idxs:
+                writer.write(record)
+    os.replace(temp_file, out_file)
+
+    return done
+
+
+def iter_pooled_results(
+    exec_args: ExecutionArgs,
+    futs: list[FunctionUnderTest | MethodUnderTest],
+    pool: ContainerPool,
+) -> Iterator[FunctionUnderTest | MethodUnderTest]:
+    """
+    Runs the FUTs on the warm containers of the pool (yielded as they finish)
+    The planned FUT groups of a repo are split into `containers_per_repo` lanes;
+    each lane runs sequentially (reusing a container) and lanes run in parallel threads
+    """
+    repo_groups: dict[str, list[list[FunctionUnderTest | MethodUnderTest]]] = {}
+    for group in plan_fut_groups(futs, exec_args.max_futs_per_run):
+        repo_groups.setdefault(group[0].repo_id, []).append(group)
+
+    lanes = []
+    for repo_id, groups in repo_groups.items():
+        num_lanes = min(exec_args.containers_per_repo, len(groups))
+        lanes.extend((repo_id, groups[i::num_lanes]) for i in range(num_lanes))
+    remaining_lanes = Counter(repo_id for repo_id, _ in lanes)
+
+    results: queue.Queue = queue.Queue()
+    lock = threading.Lock()
+    run_futs = lambda group: run_futs_with_pool(group, pool)
+
+    def run_lane(repo_id, groups):
+        try:
+            for group in groups:
+                for fut in run_planned_futs(group, run_futs):
+                    results.put(fut)
+        finally:
+            with lock:
+                remaining_lanes[repo_id] -= 1
+                repo_done = remaining_lanes[repo_id] == 0
+            if repo_done:
+                pool.close_repo(repo_id)
+
+    num_workers = max(1, exec_args.execution_multiprocess)
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        lane_futures = [executor.submit(run_lane, *lane) for lane in lanes]
+        for _ in tqdm(range(len(futs)), desc="Executing", dynamic_ncols=True):
+            yield results.get()
+        for lane_future in lane_futures:
+            lane_future.result()
+
+
+def iter_self_equiv_results(
+    exec_args: ExecutionArgs, futs: list[FunctionUnderTest | MethodUnderTest]
+) -> Iterator[FunctionUnderTest | MethodUnderTest]:
+    groups = plan_fut_groups(futs, exec_args.max_futs_per_run)
 
-    new_futs = []
     if exec_args.execution_multiprocess == 0:
-        for fut in futs:
-            port = exec_args.port
+        port = exec_args.port
+        run_futs = lambda group: run_futs_with_port(group, port, exec_args.image_name)
+        for group in groups:
             try:
-                output = run_fut_with_port(fut, port, exec_args.image_name)
+                yield from run_planned_futs(group, run_futs)
             except Exception as e:
-                print(f"Error@{fut.repo_id}:\n{repr(e)}")
+                print(f"Error@{group[0].repo_id}:\n{repr(e)}")
                 tb = traceback.format_exc()
                 print(tb)
-                continue
-            new_futs.append(output[2])
+                yield from set_group_error(group, tb)
     else:
-
+        # the tasks share one timeout: the one of the largest group
+        timeout = max(
+            (group_timeout(group, exec_args.timeout_per_task) for group in groups),
+            default=exec_args.timeout_per_task,
+        )
         outputs = run_tasks_in_parallel_iter(
-            run_fut_mp,
-            [(i, exec_args.image_name) for i in futs],
+            run_futs_mp,
+            [(group, exec_args.image_name) for group in groups],
             num_workers=exec_args.execution_multiprocess,
-            timeout_per_task=exec_args.timeout_per_task,
+            timeout_per_task=timeout,
             use_progress_bar=True,
         )
-        for x in outputs:
+        for group, x in zip(groups, outputs):
             if x.is_success():
-                new_futs.append(x.result[2])  # type: ignore
+                yield from x.result  # type: ignore
             else:
                 print(f"Error: {x.exception_tb}")
-    write_functions_under_test(
-        new_futs, TESTGEN_DIR / f"{exec_args.testgen_exp_id}_out.json"
-    )
+                error = x.exception_tb or f"Task {x.status.name.lower()}"
+                yield from set_group_error(group, error)
+
+
+def group_timeout(
+    group: list[FunctionUnderTest | MethodUnderTest], timeout_per_fut: int
+) -> int:
+    """
+    Timeout of a planned group (see `run_planned_futs`)
+    the tests of each FUT run in the group's submission and, if the group
+    falls back to one FUT at a time, once more in the FUT's own submission
+    """
+    if len(group) == 1:
+        return timeout_per_fut
+    return timeout_per_fut * 2 * len(group)
+
+
+def set_group_error(
+    group: list[FunctionUnderTest | MethodUnderTest], error: str
+) -> list[FunctionUnderTest | MethodUnderTest]:
+    """Records the error of a group that failed (or timed out) in its FUTs"""
+    for fut in group:
+        fut.test_history.update_exec_stats({"error": error})
+    return group
 
 
 if __name__ == "__main__":
@@ -3,4 +3,11 @@ from r2e.generators.context.full import FullContextCreator
 from r2e.generators.context.sliced import SlicedContextCreator
 from r2e.generators.context.format import ContextFormatter, ContextFormat
 from r2e.generators.context.manager import ContextManager
-from r2e.generators.context.utils import get_context_wrapper
+from r2e.generators.context.cache import ContextCache
+from r2e.generators.context.utils import (
+    get_context_wrapper,
+    get_contexts_wrapper,
+    group_by_repo,
+    dump_ast_cache,
+    generate_contexts,
+)
@@ -1,11 +1,14 @@
 import ast
+import copy
 import tiktoken
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Optional
 
 from r2e.models.function import Function
 from r2e.models.method import Method
 from r2e.models.context import Context
 from r2e.generators.context.format import ContextFormatter, ContextFormat
+from r2e.generators.context.truncation import TruncatableCode, find_truncation_step
 from r2e.pat.ast.transformer import (
     RemoveFunctionTransformer,
     RemoveLastNodeTransformer,
@@ -14,12 +17,20 @@ from r2e.pat.ast.transformer import (
 )
 
 
+@lru_cache(maxsize=None)
+def get_tokenizer(token_model: str) -> tiktoken.Encoding:
+    """Tokenizer of a model (loaded once per process)"""
+    return tiktoken.encoding_for_model(token_model)
+
+
 class ContextCreator:
     """Base class for creating context for a function or method
 
     Args:
         func_meth (Function | Method): Function or Method object
         max_context_size (int): Maximum context size in # of tokens
+        tokenizer (optional): tokenizer with an `encode` method
+            (defaults to the shared tokenizer of `token_model`)
     """
 
     def __init__(
@@ -27,6 +38,7 @@ class ContextCreator:
         func_meth: Function | Method,
         max_context_size: int | None = None,
         format: ContextFormat = ContextFormat.MARKDOWN_FILES,
+        tokenizer: Optional[Any] = None,
     ):
         self.func_meth = func_meth
         self.repo_path = self.func_meth.repo.repo_path
@@ -36,16 +48,26 @@ class ContextCreator:
         self.context = ""
         self.file2code = {}
 
-        # TODO: eventually make the tokenizer an arg.
         self.token_model = "gpt-3.5-turbo"
-        self.tokenizer = tiktoken.encoding_for_model(self.token_model)
+        self.tokenizer = tokenizer or get_tokenizer(self.token_model)
+        self._context_size: tuple[str, int] = ("", 0)
 
         self.format = format
 
+    def count_tokens(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, disallowed_special=()))
+
     @property
     def context_size(self) -> int:
         """Return the size of the current context"""
-        return len(self.tokenizer.encode(self.context, disallowed_special=()))
+        if self._context_size[0] is not self.context:
+            self._context_size = (self.context, self.count_tokens(self.context))
+        return self._context_size[1]
+
+    def context_files(self) -> list[str]:
+        """Relative paths of the files the context was created from"""
+        fut_rel_path = self.full_to_rel_path(self.func_meth.file_path)
+        return sorted(set(self.file2code) | {fut_rel_path})
 
     def get_context(self) -> Context:
         """Return the current context"""
@@ -106,24 +128,62 @@ class ContextCreator:
 
         assert self.max_context_size is not None
         # until context size reaches limit or all files are removed
-        while self.context_size > self.max_context_size and len(file2code_map) > 0:
-            last_file = list(file2code_map.keys())[0]
-            last_code = file2code_map[last_file]
-
-            # if file is empty, remove it
-            if ast.parse(last_code).body == []:
-                file2code_map.pop(last_file)
+        if self.context_size <= self.max_context_size or len(file2code_map) == 0:
+            return
+
+        # each step removes the last ast node of the first file
+        # or the (then empty) first file itself
+        rel_paths = list(file2code_map.keys())
+        files = [
+            TruncatableCode(code, self.count_tokens) for code in file2code_map.values()
+        ]
+        file_tokens = [
+            self.count_tokens(ContextFormatter.format(code, rel_path, self.format))
+            for rel_path, code in file2code_map.items()
+        ]
+        truncated_file_tokens = [
+            self.count_tokens(
+                ContextFormatter.format("\n\n# ...", rel_path, self.format)
+            )
+            for rel_path in rel_paths
+        ]
+        fut_context = ContextFormatter.format(fut_code, fut_rel_path, self.format)
+        fut_tokens = self.count_tokens(fut_context)
 
-            # else, remove the last ast node from file
-            else:
-                truncated_code = self._remove_last_ast_node(last_code)
-                file2code_map[last_file] = f"{truncated_code}\n\n# ..."
+        steps = [
+            (file_idx, num_removed)
+            for file_idx, file in enumerate(files)
+            for num_removed in range(1, file.num_steps + 2)
+        ]
 
-            self.context = ""
-            for rel_path, code in file2code_map.items():
-                self.context += ContextFormatter.format(code, rel_path, self.format)
+        estimates = []
+        for file_idx, num_removed in steps:
+            estimate = fut_tokens + sum(file_tokens[file_idx + 1 :])
+            if num_removed <= files[file_idx].num_steps:
+                estimate += truncated_file_tokens[file_idx]
+                estimate += files[file_idx].tokens_after(num_removed)
+            estimates.append(estimate)
+
+        def render(step: int) -> str:
+            file_idx, num_removed = steps[step - 1]
+            context = ""
+            if num_removed <= files[file_idx].num_steps:
+                truncated_code = files[file_idx].unparse(num_removed)
+                context += ContextFormatter.format(
+                    f"{truncated_code}\n\n# ...", rel_paths[file_idx], self.format
+                )
+            for rel_path in rel_paths[file_idx + 1 :]:
+                context += ContextFormatter.format(
+                    file2code_map[rel_path], rel_path, self.format
+                )
+            return context + fut_context
 
-            self.context += ContextFormatter.format(fut_code, fut_rel_path, self.format)
+        step = find_truncation_step(
+            estimates,
+            lambda step: self.count_tokens(render(step)),
+            self.max_context_size,
+        )
+        self.context = render(step)
 
     def truncate_file_context(self):
         """General truncation strategy for in-file context
@@ -149,23 +209,45 @@ class ContextCreator:
 
         assert self.max_context_size is not None
         # until context size reaches limit or all ast nodes are removed
-        while self.context_size > self.max_context_size and ast.parse(code).body != []:
-            code = self._remove_last_ast_node(code)  # remove last ast node
-
-            # if file is empty, use func_class_code as context
-            if ast.parse(code).body == []:
-                self.context = ""
-                self.context = ContextFormatter.format(
-                    func_class_code, fut_rel_path, self.format
-                )
-                break
-            else:
-                code += "\n\n# ..."
-
-            formatted_code = self._append_code(code, func_class_code)
-            self.context = ContextFormatter.format(
-                formatted_code, fut_rel_path, self.format
+        if self.context_size <= self.max_context_size:
+            return
+
+        # each step removes the last ast node of the in-file context;
+        # once it is empty, only the func_class_code is kept
+        truncatable = TruncatableCode(code, self.count_tokens)
+        num_steps = truncatable.num_steps
+        if num_steps == 0:
+            return
+
+        func_class_context = ContextFormatter.format(
+            func_class_code, fut_rel_path, self.format
+        )
+        fixed_tokens = self.count_tokens(
+            ContextFormatter.format(
+                self._append_code("\n\n# ...", func_class_code),
+                fut_rel_path,
+                self.format,
             )
+        )
+        estimates = [
+            fixed_tokens + truncatable.tokens_after(num_removed)
+            for num_removed in range(1, num_steps)
+        ]
+        estimates.append(self.count_tokens(func_class_context))
+
+        def render(step: int) -> str:
+            if step == num_steps:
+                return func_class_context
+            truncated_code = f"{truncatable.unparse(step)}\n\n# ..."
+            formatted_code = self._append_code(truncated_code, func_class_code)
+            return ContextFormatter.format(formatted_code, fut_rel_path, self.format)
+
+        step = find_truncation_step(
+            estimates,
+            lambda step: self.count_tokens(render(step)),
+            self.max_context_size,
+        )
+        self.context = render(step)
 
     # helpers
 
@@ -220,11 +302,7 @@ class ContextCreator:
         """Keep only the method in the class"""
         class_name = method.class_name
         method_name = method.name
-        file_path = method.file.file_path
-
-        with open(file_path, "r") as f:
-            code = f.read()
-            tree = ast.parse(code)
+        tree = method.file.file_ast
 
         class_node = None
         for node in ast.walk(tree):
@@ -235,6 +313,8 @@ class ContextCreator:
         if class_node is None:
             raise ValueError(f"Class {class_name} not found for method {method_name}")
 
+        # the cached tree is shared; only replace the body of a copy
+        class_node = copy.copy(class_node)
         class_node.body = [
             method
             for method in class_node.body
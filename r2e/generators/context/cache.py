@@ -0,0 +1,130 @@
+"""Content-addressed cache of function and method contexts."""
+
+import os
+import json
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+from r2e.models.function import Function
+from r2e.models.method import Method
+from r2e.models.context import Context
+from r2e.pat.ast.cache import AstCache
+from r2e.generators.context.format import ContextFormat
+from r2e.paths import CONTEXT_CACHE_PATH
+
+# bump when the context creators change what they produce
+CONTEXT_CACHE_VERSION = 1
+
+
+class ContextCache:
+    """sqlite cache of contexts keyed by the function or method, context type,
+    budget and format, and validated by the hashes of the files of its slice.
+
+    An entry records the content hash of every file the context was
+    created from; it is only reused while all those files are unchanged,
+    so re-running generation after, e.g., a prompt change skips slicing.
+
+    Args:
+        cache_path (str | Path): path of the sqlite file
+    """
+
+    def __init__(self, cache_path: str | Path = CONTEXT_CACHE_PATH):
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.cache_path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS contexts "
+            "(key TEXT PRIMARY KEY, files TEXT NOT NULL, context TEXT NOT NULL)"
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def context_key(
+        func_meth: Function | Method,
+        context_type: str,
+        max_context_size: int,
+        format: ContextFormat = ContextFormat.MARKDOWN_FILES,
+    ) -> str:
+        key_data = [
+            CONTEXT_CACHE_VERSION,
+            func_meth.repo_id,
+            func_meth.id,
+            context_type,
+            max_context_size,
+            format.value,
+        ]
+        return hashlib.sha256(json.dumps(key_data).encode()).hexdigest()
+
+    @staticmethod
+    def file_hashes(
+        func_meth: Function | Method, rel_paths: list[str]
+    ) -> Optional[dict[str, str]]:
+        """Content hashes of the files of a repo (None if a file is missing)"""
+        hashes = {}
+        for rel_path in rel_paths:
+            try:
+                with open(os.path.join(func_meth.repo.repo_path, rel_path)) as f:
+                    hashes[rel_path] = AstCache.content_hash(f.read())
+            except (OSError, UnicodeDecodeError):
+                return None
+        return hashes
+
+    def get(
+        self,
+        func_meth: Function | Method,
+        context_type: str,
+        max_context_size: int,
+        format: ContextFormat = ContextFormat.MARKDOWN_FILES,
+    ) -> Optional[Context]:
+        key = self.context_key(func_meth, context_type, max_context_size, format)
+        row = self.conn.execute(
+            "SELECT files, context FROM contexts WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is not None:
+            files: dict[str, str] = json.loads(row[0])
+            if self.file_hashes(func_meth, list(files)) == files:
+                self.hits += 1
+                return Context.model_validate_json(row[1])
+
+        self.misses += 1
+        return None
+
+    def put(
+        self,
+        func_meth: Function | Method,
+        context_type: str,
+        max_context_size: int,
+        context: Context,
+        rel_paths: list[str],
+        format: ContextFormat = ContextFormat.MARKDOWN_FILES,
+    ):
+        """Cache the context created from the files `rel_paths` of the repo"""
+        files = self.file_hashes(func_meth, rel_paths)
+        if files is None:
+            return
+        key = self.context_key(func_meth, context_type, max_context_size, format)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO contexts (key, files, context) VALUES (?, ?, ?)",
+            (key, json.dumps(files), context.model_dump_json()),
+        )
+
+    def save(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        return f"Context cache: {self.hits}/{total} hits ({self.hit_rate:.1%})"
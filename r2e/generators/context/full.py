@@ -66,8 +66,7 @@ class FullContextCreator(ContextCreator):
 
     def imported_files(self) -> set[str]:
         """Get the set of files that the func_meth's file imports"""
-        with open(self.func_meth.file_path, "r") as f:
-            tree = ast.parse(f.read())
+        tree = self.func_meth.file.file_ast
 
         imported_files = set()
         for node in ast.walk(tree):
@@ -83,8 +82,7 @@ class FullContextCreator(ContextCreator):
 
     def processed_fut_file(self) -> str:
         """Get the file containing the func_meth and returns in-file context"""
-        with open(self.func_meth.file_path, "r") as f:
-            code = f.read()
+        code = self.func_meth.file.file_content
 
         assert self.func_meth.name is not None, "Function name not available"
 
@@ -6,25 +6,41 @@ from r2e.generators.context import (
     FullContextCreator,
     SlicedContextCreator,
 )
+from r2e.generators.context.format import ContextFormat
 
 
 class ContextManager:
 
     @staticmethod
     def get_context(
-        context_type: str, func_meth: Function | Method, max_context_size: int
+        context_type: str,
+        func_meth: Function | Method,
+        max_context_size: int,
+        format: ContextFormat = ContextFormat.MARKDOWN_FILES,
     ) -> Context:
+        return ContextManager.get_context_creator(
+            context_type, func_meth, max_context_size, format
+        ).get_context()
+
+    @staticmethod
+    def get_context_creator(
+        context_type: str,
+        func_meth: Function | Method,
+        max_context_size: int,
+        format: ContextFormat = ContextFormat.MARKDOWN_FILES,
+    ) -> ContextCreator:
+        """The context creator (with its constructed context) of a context type"""
 
         if context_type == "naive":
-            nc = ContextCreator(func_meth, max_context_size)
+            nc = ContextCreator(func_meth, max_context_size, format)
             nc.construct_context()
-            return nc.get_context()
+            return nc
 
         elif context_type == "full":
-            return FullContextCreator(func_meth, max_context_size).get_context()
+            return FullContextCreator(func_meth, max_context_size, format)
 
         elif context_type == "sliced":
-            return SlicedContextCreator(func_meth, max_context_size).get_context()
+            return SlicedContextCreator(func_meth, max_context_size, format)
 
         else:
             raise ValueError(f"Invalid context type: {context_type}")
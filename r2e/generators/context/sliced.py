@@ -1,11 +1,13 @@
 import io
 import ast
 import contextlib
+from typing import Optional
 
 from r2e.models import Function, Method
 from r2e.generators.context.base import ContextCreator
 from r2e.generators.context.format import ContextFormat
 from r2e.pat.dependency_slicer import DependencySlicer, DependencySliceUnparseEnum
+from r2e.pat.dependency_slicer.dependency_graph import DependencyGraph
 
 
 class SlicedContextCreator(ContextCreator):
@@ -14,6 +16,8 @@ class SlicedContextCreator(ContextCreator):
     Args:
         func_meth (Function | Method): Function or Method object
         max_context_size (int): Maximum context size in # of tokens
+        dependency_graph (DependencyGraph, optional): precomputed slice of the
+            function or method (e.g., from `DependencySlicer.slice_many`)
     """
 
     def __init__(
@@ -21,25 +25,31 @@ class SlicedContextCreator(ContextCreator):
         func_meth: Function | Method,
         max_context_size: int | None = None,
         format: ContextFormat = ContextFormat.MARKDOWN_FILES,
+        dependency_graph: Optional[DependencyGraph] = None,
     ):
         super().__init__(func_meth, max_context_size, format)
         self.context_type = "sliced"
+        self.dependency_graph = dependency_graph
         self.construct_context()
 
     def construct_context(self):
         with contextlib.redirect_stdout(io.StringIO()):
-            if isinstance(self.func_meth, Method):
-                slicer = DependencySlicer.from_class_models(self.func_meth.parent_class)
-            elif isinstance(self.func_meth, Function):
-                slicer = DependencySlicer.from_function_models(self.func_meth)
-            else:
-                raise ValueError("Unknown input type")
-
-            slicer.run()
+            if self.dependency_graph is None:
+                if isinstance(self.func_meth, Method):
+                    slicer = DependencySlicer.from_class_models(
+                        self.func_meth.parent_class
+                    )
+                elif isinstance(self.func_meth, Function):
+                    slicer = DependencySlicer.from_function_models(self.func_meth)
+                else:
+                    raise ValueError("Unknown input type")
+
+                slicer.run()
+                self.dependency_graph = slicer.dependency_graph
 
             slice_format = DependencySliceUnparseEnum.MARKDOWN_FILES
-            self.context = slicer.dependency_graph.unparse(unparse_type=slice_format)
-            self.file2code = slicer.dependency_graph.unparse_by_file()
+            self.context = self.dependency_graph.unparse(unparse_type=slice_format)
+            self.file2code = self.dependency_graph.unparse_by_file()
 
         # trigger truncation if necessary
         if self.max_context_size and self.context_size > self.max_context_size:
@@ -0,0 +1,111 @@
+"""Incremental truncation of code contexts.
+
+Truncation repeatedly removes the last AST node of a file (see
+`RemoveLastNodeTransformer`) until the context fits its token budget.
+Instead of re-rendering and re-tokenizing the context after every
+removal, the code is parsed once, each removable node is tokenized
+once and the number of removals is found from running token counts;
+only the candidate contexts around that point are rendered and counted.
+"""
+
+import ast
+import copy
+from typing import Callable, Optional
+
+
+class TruncatableCode:
+    """Code whose last AST nodes are removed one at a time.
+
+    Removal step `k` follows `RemoveLastNodeTransformer`: the last
+    top-level node is removed, except for a class with more than one
+    statement, whose last statement is removed instead.
+
+    Args:
+        code (str): code to truncate
+        count_tokens (Callable): number of tokens of a string
+    """
+
+    def __init__(self, code: str, count_tokens: Callable[[str], int]):
+        self.body = ast.parse(code).body
+        # (number of kept top-level nodes, kept statements of the last class)
+        self.steps: list[tuple[int, Optional[int]]] = []
+        self.removed_tokens: list[int] = []
+
+        for idx in reversed(range(len(self.body))):
+            node = self.body[idx]
+            if not isinstance(node, ast.ClassDef):
+                self.steps.append((idx, None))
+                self.removed_tokens.append(count_tokens(ast.unparse(node)))
+                continue
+
+            stmt_tokens = [count_tokens(ast.unparse(stmt)) for stmt in node.body]
+            header_tokens = max(0, count_tokens(ast.unparse(node)) - sum(stmt_tokens))
+            for num_kept in range(len(node.body) - 1, 0, -1):
+                self.steps.append((idx + 1, num_kept))
+                self.removed_tokens.append(stmt_tokens[num_kept])
+            self.steps.append((idx, None))
+            self.removed_tokens.append(header_tokens + stmt_tokens[0])
+
+        self.total_tokens = sum(self.removed_tokens)
+        self._remaining_tokens = [self.total_tokens]
+        for tokens in self.removed_tokens:
+            self._remaining_tokens.append(self._remaining_tokens[-1] - tokens)
+
+    @property
+    def num_steps(self) -> int:
+        """Number of removals until the code is empty"""
+        return len(self.steps)
+
+    def tokens_after(self, num_steps: int) -> int:
+        """Estimated number of tokens of the code after `num_steps` removals"""
+        return self._remaining_tokens[num_steps]
+
+    def unparse(self, num_steps: int) -> str:
+        """Code after `num_steps` removals"""
+        if num_steps == 0:
+            body = self.body
+        else:
+            num_nodes, num_class_stmts = self.steps[num_steps - 1]
+            body = self.body[:num_nodes]
+            if num_class_stmts is not None:
+                # the parsed nodes are shared by all steps; truncate a copy
+                class_node = copy.copy(body[-1])
+                class_node.body = class_node.body[:num_class_stmts]  # type: ignore
+                body = body[:-1] + [class_node]
+        return ast.unparse(ast.Module(body=body, type_ignores=[]))
+
+
+def find_truncation_step(
+    estimates: list[int],
+    context_size: Callable[[int], int],
+    max_context_size: int,
+) -> int:
+    """First truncation step whose context fits `max_context_size` tokens.
+
+    Args:
+        estimates (list[int]): estimated context size after steps 1..n
+        context_size (Callable): exact context size after a step
+        max_context_size (int): maximum context size
+
+    Returns:
+        int: the step (the last step `n` if no context fits)
+    """
+    num_steps = len(estimates)
+    step = next(
+        (idx + 1 for idx, size in enumerate(estimates) if size <= max_context_size),
+        num_steps,
+    )
+
+    # estimates ignore tokens merged across node boundaries; correct exactly
+    sizes: dict[int, int] = {}
+
+    def exact(step: int) -> int:
+        if step not in sizes:
+            sizes[step] = context_size(step)
+        return sizes[step]
+
+    while step < num_steps and exact(step) > max_context_size:
+        step += 1
+    while step > 1 and exact(step - 1) <= max_context_size:
+        step -= 1
+    return step
@@ -1,8 +1,168 @@
+import io
+import traceback
+import contextlib
+from typing import Optional
+from collections import defaultdict
+
+from r2e.generators.context.cache import ContextCache
+from r2e.generators.context.format import ContextFormat
 from r2e.generators.context.manager import ContextManager
+from r2e.generators.context.sliced import SlicedContextCreator
+from r2e.models.function import Function
+from r2e.models.method import Method
 from r2e.models.context import Context
+from r2e.multiprocess import TaskResult, TaskRunStatus, run_tasks_in_parallel_iter
+from r2e.pat.ast import get_ast_cache, warm_start_ast_cache
+from r2e.pat.dependency_slicer import DependencySlicer
+from r2e.paths import AST_CACHE_PATH
 
 
 def get_context_wrapper(args) -> Context:
     """A wrapper over ContextManager.get_context to be used in parallel processing"""
     context_type, func_meth, max_context_size = args
     return ContextManager.get_context(context_type, func_meth, max_context_size)
+
+
+def get_contexts_wrapper(args) -> list[TaskResult]:
+    """A wrapper to get the contexts of a batch of functions/methods of the same repo
+    in a single parallel task (one `TaskResult` per function/method).
+    The result of a `TaskResult` is the context and the (relative) paths of
+    the files it was created from.
+
+    NOTE: sliced contexts of the batch are sliced together (see `DependencySlicer.slice_many`)
+    """
+    context_type, func_meths, max_context_size, format = args
+
+    dependency_graphs = {}
+    if context_type == "sliced":
+        with contextlib.redirect_stdout(io.StringIO()):
+            dependency_graphs = DependencySlicer.slice_many(
+                func_meths, skip_errors=True
+            )
+
+    results: list[TaskResult] = []
+    for func_meth in func_meths:
+        try:
+            if func_meth.id in dependency_graphs:
+                creator = SlicedContextCreator(
+                    func_meth,
+                    max_context_size,
+                    format,
+                    dependency_graph=dependency_graphs[func_meth.id],
+                )
+            else:
+                creator = ContextManager.get_context_creator(
+                    context_type, func_meth, max_context_size, format
+                )
+            result = (creator.get_context(), creator.context_files())
+            results.append(TaskResult(status=TaskRunStatus.SUCCESS, result=result))
+        except Exception:
+            results.append(
+                TaskResult(
+                    status=TaskRunStatus.EXCEPTION, exception_tb=traceback.format_exc()
+                )
+            )
+    return results
+
+
+def group_by_repo(
+    func_meths: list[Function | Method], max_batch_size: int = 64
+) -> list[list[int]]:
+    """Group the indices of functions/methods into batches of the same repo."""
+    repo_indices: dict[str, list[int]] = defaultdict(list)
+    for idx, func_meth in enumerate(func_meths):
+        repo_indices[func_meth.repo_id].append(idx)
+
+    batches: list[list[int]] = []
+    for indices in repo_indices.values():
+        for start in range(0, len(indices), max_batch_size):
+            batches.append(indices[start : start + max_batch_size])
+    return batches
+
+
+def dump_ast_cache(func_meths: list[Function | Method]):
+    """Parse the files of the functions once so that workers warm-start from disk"""
+    ast_cache = get_ast_cache()
+    for file_path in {func_meth.file.file_path for func_meth in func_meths}:
+        try:
+            ast_cache.get_ast(file_path)
+        except (OSError, SyntaxError, ValueError, UnicodeDecodeError):
+            continue
+    ast_cache.dump(AST_CACHE_PATH)
+
+
+def generate_contexts(
+    func_meths: list[Function | Method],
+    context_type: str,
+    max_context_size: int,
+    num_workers: int = 8,
+    format: ContextFormat = ContextFormat.MARKDOWN_FILES,
+    cache: Optional[ContextCache] = None,
+) -> list[TaskResult]:
+    """Get the contexts of functions/methods (one `TaskResult` per function/method)
+
+    Cached contexts are reused; the others are created in parallel tasks
+    (one per batch of functions/methods of the same repo) and cached.
+    """
+    results: list[Optional[TaskResult]] = [None] * len(func_meths)
+    missing: list[int] = []
+    for idx, func_meth in enumerate(func_meths):
+        context = None
+        if cache is not None:
+            context = cache.get(func_meth, context_type, max_context_size, format)
+        if context is not None:
+            results[idx] = TaskResult(status=TaskRunStatus.SUCCESS, result=context)
+        else:
+            missing.append(idx)
+
+    if missing:
+        missing_func_meths = [func_meths[idx] for idx in missing]
+        dump_ast_cache(missing_func_meths)
+
+        # one task per batch of functions of the same repo so that workers
+        # load a repo's call graph and slice its files once per batch
+        batches = [
+            [missing[idx] for idx in batch]
+            for batch in group_by_repo(missing_func_meths)
+        ]
+        context_gen_tasks = [
+            (context_type, [func_meths[idx] for idx in batch], max_context_size, format)
+            for batch in batches
+        ]
+        context_iter = run_tasks_in_parallel_iter(
+            get_contexts_wrapper,
+            context_gen_tasks,
+            num_workers=num_workers,
+            use_progress_bar=True,
+            progress_bar_desc="Generating contexts",
+            initializer=warm_start_ast_cache,
+            initargs=(AST_CACHE_PATH,),
+        )
+
+        for batch, batch_result in zip(batches, context_iter):
+            for i, idx in enumerate(batch):
+                if not batch_result.is_success():
+                    results[idx] = batch_result
+                    continue
+
+                task_result = batch_result.result[i]  # type: ignore
+                if task_result.is_success():
+                    context, rel_paths = task_result.result
+                    if cache is not None:
+                        cache.put(
+                            func_meths[idx],
+                            context_type,
+                            max_context_size,
+                            context,
+                            rel_paths,
+                            format,
+                        )
+                    task_result = TaskResult(
+                        status=TaskRunStatus.SUCCESS, result=context
+                    )
+                results[idx] = task_result
+
+    if cache is not None:
+        cache.save()
+        print(cache.stats())
+    return results  # type: ignore
@@ -31,7 +31,7 @@ class R2ESpecGenerator:
             codegen_probs.append(create_codegen_problem(func, spec))  # type: ignore
 
         write_codegen_problems(
-            codegen_probs, R2E_BUCKET_DIR / f"{args.exp_id}_specgen.json"
+            codegen_probs, R2E_BUCKET_DIR / f"{args.exp_id}_specgen.jsonl"
         )
 
     @staticmethod
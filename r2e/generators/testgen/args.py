@@ -15,6 +15,19 @@ class TestGenArgs(LLMArgs):
         6000,
         description="The maximum context size",
     )
+    context_workers: int = Field(
+        8,
+        description="The number of workers used to generate contexts",
+    )
+    use_context_cache: bool = Field(
+        True,
+        description="Whether to reuse contexts of unchanged files from the context cache",
+    )
+
+    stream_batch_size: int = Field(
+        1000,
+        description="The number of functions loaded and processed at a time",
+    )
 
     in_file: str = Field(
         None,
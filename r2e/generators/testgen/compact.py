@@ -0,0 +1,45 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+import fire
+
+from r2e.utils.data import iter_functions_under_test, write_functions_under_test
+from r2e.paths import TESTGEN_DIR
+
+
+def compact_test_histories(
+    in_file: str, out_file: Optional[str] = None, keep_exec_stats: bool = True
+) -> Path:
+    """Rewrite a FUT file with delta-encoded test histories.
+
+    Files written before test histories were delta-encoded store a full copy
+    of the tests of every version; they are converted on load, so rewriting
+    them is enough to compact them.
+
+    Args:
+        in_file (str): FUT file (relative to the testgen directory)
+        out_file (str, optional): output file (defaults to rewriting `in_file`)
+        keep_exec_stats (bool): keep the execution stats of the old versions
+            (only the latest ones are used by filtering and evaluation)
+    """
+    in_path = TESTGEN_DIR / in_file
+    out_path = TESTGEN_DIR / out_file if out_file else in_path
+    tmp_path = out_path.with_name(f"compact-tmp-{out_path.name}")
+    in_size = in_path.stat().st_size
+
+    def compacted_futs():
+        for fut in iter_functions_under_test(in_path):
+            fut.test_history.compact(keep_exec_stats=keep_exec_stats)
+            yield fut
+
+    write_functions_under_test(compacted_futs(), tmp_path)
+    os.replace(tmp_path, out_path)
+
+    out_size = out_path.stat().st_size
+    print(f"Compacted {in_path} ({in_size} bytes) to {out_path} ({out_size} bytes)")
+    return out_path
+
+
+if __name__ == "__main__":
+    fire.Fire(compact_test_histories)
@@ -8,16 +8,16 @@ from r2e.models import Function, Method, Context, Tests
 from r2e.models.fut import create_code_under_test
 
 from r2e.pat.ast.transformer import RemoveMethodsTransformer
-from r2e.generators.context import get_context_wrapper
+from r2e.generators.context import ContextCache, generate_contexts
 from r2e.generators.testgen import TestGenTask, TestGenArgs
 from r2e.llms.completions import LLMCompletions
 from r2e.generators.testgen.utils import get_generated_tests
-from r2e.multiprocess import run_tasks_in_parallel_iter
 from r2e.utils.data import (
-    load_functions,
+    RecordWriter,
+    iter_batches,
+    iter_functions,
+    iter_functions_under_test,
     load_functions_under_test,
-    write_functions,
-    write_functions_under_test,
 )
 from r2e.paths import EXTRACTED_DATA_DIR, TESTGEN_DIR, timestamp
 
@@ -27,15 +27,25 @@ class R2ETestGenerator:
     @staticmethod
     def generate(args):
         """Generate tests for functions"""
-        functions = load_functions(EXTRACTED_DATA_DIR / args.in_file)
+        functions = iter_functions(EXTRACTED_DATA_DIR / args.in_file)
 
-        tasks = R2ETestGenerator.prepare_tasks(functions)
+        TESTGEN_DIR.mkdir(parents=True, exist_ok=True)
+        out_file = TESTGEN_DIR / f"{args.exp_id}_generate.jsonl"
+
+        # functions are processed in batches to keep memory bounded
+        with RecordWriter(out_file) as writer:
+            for batch in iter_batches(functions, args.stream_batch_size):
+                writer.write_many(R2ETestGenerator.generate_batch(args, batch))
+
+    @staticmethod
+    def generate_batch(args, functions) -> list:
+        tasks = R2ETestGenerator.prepare_tasks(args, functions)
         payloads = [task.chat_messages for task in tasks]
 
         outputs = LLMCompletions.get_llm_completions(args, payloads)
 
         results = get_generated_tests(outputs)
-        futs = [create_code_under_test(func) for func in functions]
+        futs = [create_code_under_test(task.func_meth) for task in tasks]
 
         for fut, test in zip(futs, results):
             fut.update_history(
@@ -45,8 +55,7 @@ class R2ETestGenerator:
                     gen_date=timestamp(),
                 )
             )
-        TESTGEN_DIR.mkdir(parents=True, exist_ok=True)
-        write_functions_under_test(futs, TESTGEN_DIR / f"{args.exp_id}_generate.json")
+        return futs
 
     @staticmethod
     def execute(args):
@@ -62,48 +71,57 @@ class R2ETestGenerator:
     @staticmethod
     def filter(args):
         """Filter failing tests from the generated tests"""
-        futs = load_functions_under_test(TESTGEN_DIR / args.in_file)
-
-        for fut in tqdm(futs):
-            assert fut.exec_stats is not None
-            filtered_tests = {}
-
-            for sample_id, stats in fut.exec_stats.items():
-                failed_tests = stats.get("failed_names", [])
-                errored_tests = stats.get("errored_names", [])
-
-                tests_to_filter = failed_tests + errored_tests
-                test = fut.tests.get(sample_id, None)
-                assert test is not None
-
-                if tests_to_filter == []:
-                    filtered_tests[sample_id] = test
-                    continue
-
-                transformer = RemoveMethodsTransformer(ast.parse(test), tests_to_filter)
-                cleaned_test = ast.unparse(transformer.transform())
-                filtered_tests[sample_id] = cleaned_test
-
-            fut.update_history(
-                Tests(tests=filtered_tests, operation="filter", gen_date=timestamp())
-            )
-
-        write_functions_under_test(futs, TESTGEN_DIR / f"{args.exp_id}_filter.json")
+        futs = iter_functions_under_test(TESTGEN_DIR / args.in_file)
+        out_file = TESTGEN_DIR / f"{args.exp_id}_filter.jsonl"
+
+        with RecordWriter(out_file) as writer:
+            for fut in tqdm(futs):
+                assert fut.exec_stats is not None
+                filtered_tests = {}
+
+                for sample_id, stats in fut.exec_stats.items():
+                    failed_tests = stats.get("failed_names", [])
+                    errored_tests = stats.get("errored_names", [])
+
+                    tests_to_filter = failed_tests + errored_tests
+                    test = fut.tests.get(sample_id, None)
+                    assert test is not None
+
+                    if tests_to_filter == []:
+                        filtered_tests[sample_id] = test
+                        continue
+
+                    transformer = RemoveMethodsTransformer(
+                        ast.parse(test), tests_to_filter
+                    )
+                    cleaned_test = ast.unparse(transformer.transform())
+                    filtered_tests[sample_id] = cleaned_test
+
+                fut.update_history(
+                    Tests(
+                        tests=filtered_tests, operation="filter", gen_date=timestamp()
+                    )
+                )
+                writer.write(fut)
 
     @staticmethod
-    def prepare_tasks(functions) -> list[TestGenTask]:
-        context_gen_tasks = [(args.context_type, func, 6000) for func in functions]
-        context_iter = run_tasks_in_parallel_iter(
-            get_context_wrapper,
-            context_gen_tasks,
-            num_workers=8,
-            use_progress_bar=True,
-            progress_bar_desc="Generating contexts",
-        )
+    def prepare_tasks(args, functions) -> list[TestGenTask]:
+        cache = ContextCache() if args.use_context_cache else None
+        try:
+            task_results = generate_contexts(
+                functions,
+                args.context_type,
+                args.max_context_size,
+                num_workers=args.context_workers,
+                cache=cache,
+            )
+        finally:
+            if cache is not None:
+                cache.close()
 
         tasks = []
 
-        for func, task_result in zip(functions, context_iter):
+        for func, task_result in zip(functions, task_results):
             if task_result.is_success():
                 context = task_result.result
                 func.add_context(context)
@@ -38,7 +38,9 @@ class R2ETestOversample:
 
             tasks = R2ETestOversample.update_tasks(tasks, results)
 
-        write_functions_under_test(futs, TESTGEN_DIR / f"{args.exp_id}_oversample.json")
+        write_functions_under_test(
+            futs, TESTGEN_DIR / f"{args.exp_id}_oversample.jsonl"
+        )
 
     # task modifiers
 
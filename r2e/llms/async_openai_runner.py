@@ -0,0 +1,180 @@
+import os
+import asyncio
+from typing import Any, Callable, Optional
+
+import openai
+from tqdm import tqdm
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion
+
+from r2e.llms.llm_args import LLMArgs
+from r2e.llms.base_runner import BaseRunner
+from r2e.llms.language_model import LanguageModel
+from r2e.llms.rate_limit import (
+    RateLimiter,
+    backoff_delay,
+    estimate_tokens,
+    get_retry_after,
+)
+
+RETRY_STATUS_CODES = {408, 409, 429}
+
+
+def is_retryable(e: Exception) -> bool:
+    if isinstance(e, openai.APIConnectionError):  # includes timeouts
+        return True
+    if isinstance(e, openai.APIStatusError):
+        return e.status_code in RETRY_STATUS_CODES or e.status_code >= 500
+    return False
+
+
+class AsyncOpenAIRunner(BaseRunner):
+    """Runs the payloads of a batch concurrently from a single event loop.
+
+    At most `max_in_flight` requests are sent at a time and they are
+    paced by request and token buckets (learned from the rate limit
+    headers of the responses). Failed requests are retried with
+    exponential backoff and jitter.
+
+    NOTE: `run_main` sends all the payloads from one event loop (not in
+    `cache_batch_size` slices); `cache_batch_size` only sets how often the
+    completions are saved to the cache.
+    """
+
+    def __init__(self, args: LLMArgs, model: LanguageModel):
+        super().__init__(args, model)
+        self.client_kwargs: dict[str, Any] = {
+            "model": args.model_name,
+            "temperature": args.temperature,
+            "max_tokens": args.max_tokens,
+            "top_p": args.top_p,
+            "frequency_penalty": args.frequency_penalty,
+            "presence_penalty": args.presence_penalty,
+            "n": args.n,
+            "timeout": args.openai_timeout,
+        }
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=args.requests_per_minute,
+            tokens_per_minute=args.tokens_per_minute,
+        )
+
+    def _run_single(
+        self, payload: list[dict[str, str]], n: int | None = None
+    ) -> list[str]:
+        num_samples = self.args.n if n is None else n
+        (result,) = asyncio.run(self.run_batch_async([payload], [num_samples]))
+        return result if result is not None else [""] * num_samples
+
+    def run_batch(self, payloads: list) -> list[list[str]]:
+        return self.run_missing(payloads, save_every=None)
+
+    def run_main(self, payloads: list) -> list[list[str]]:
+        ## no per-`cache_batch_size` slices: a slice would be a barrier
+        ## waiting on its slowest request while the other slots stay idle
+        outputs = self.run_missing(payloads, save_every=self.args.cache_batch_size)
+        self.save_cache()
+        return outputs
+
+    def run_missing(
+        self, payloads: list, save_every: Optional[int] = None
+    ) -> list[list[str]]:
+        """Request the samples missing from the cache of all the payloads
+        from one event loop; each result is added to the cache as it
+        completes and the cache is saved every `save_every` results."""
+        outputs = self.get_cached_samples(payloads)
+        missing = self.get_missing_samples(outputs)
+        if not missing:
+            return outputs
+
+        num_done = 0
+
+        def on_result(position: int, result: Optional[list[str]]):
+            nonlocal num_done
+            index, num_samples = missing[position]
+            outputs[index] = self.add_samples(
+                payloads[index], outputs[index], result, num_samples
+            )
+            num_done += 1
+            if save_every and num_done % save_every == 0:
+                self.save_cache()
+
+        asyncio.run(
+            self.run_batch_async(
+                [payloads[index] for index, _ in missing],
+                [num_samples for _, num_samples in missing],
+                on_result=on_result,
+            )
+        )
+        return outputs
+
+    async def run_batch_async(
+        self,
+        payloads: list,
+        num_samples: list[int],
+        on_result: Optional[Callable[[int, Optional[list[str]]], None]] = None,
+    ) -> list[Optional[list[str]]]:
+        ## retries are handled by the runner (shared backoff and rate limits)
+        client = AsyncOpenAI(api_key=os.getenv("OPENAI_KEY"), max_retries=0)
+        semaphore = asyncio.Semaphore(self.args.max_in_flight)
+        progress_bar = tqdm(total=len(payloads))
+
+        async def run(position: int, payload, n: int) -> Optional[list[str]]:
+            async with semaphore:
+                result = await self.run_single_async(client, payload, n)
+            if on_result is not None:
+                on_result(position, result)
+            progress_bar.update(1)
+            return result
+
+        try:
+            return await asyncio.gather(
+                *(
+                    run(position, payload, n)
+                    for position, (payload, n) in enumerate(zip(payloads, num_samples))
+                )
+            )
+        finally:
+            progress_bar.close()
+            await client.close()
+
+    async def run_single_async(
+        self, client: AsyncOpenAI, payload: list[dict[str, str]], n: int
+    ) -> Optional[list[str]]:
+        assert isinstance(payload, list)
+        client_kwargs = {**self.client_kwargs, "n": n}
+        num_tokens = estimate_tokens(payload, self.args.max_tokens * n)
+
+        for attempt in range(self.args.max_retries + 1):
+            await self.rate_limiter.acquire(num_tokens)
+            try:
+                raw_response = await client.chat.completions.with_raw_response.create(
+                    messages=payload,  # type: ignore
+                    **client_kwargs,
+                )
+            except Exception as e:
+                if not is_retryable(e):
+                    print(f"Failed to run the model for {payload}!")
+                    print("Exception: ", repr(e))
+                    return None
+
+                response = getattr(e, "response", None)
+                headers = response.headers if response is not None else {}
+                self.rate_limiter.update_from_headers(headers)
+                delay = max(
+                    backoff_delay(
+                        attempt, self.args.backoff_base, self.args.backoff_max
+                    ),
+                    get_retry_after(headers),
+                )
+                if isinstance(e, openai.RateLimitError):
+                    self.rate_limiter.pause(delay)
+                print(f"Exception: {repr(e)}. Retrying in {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
+                continue
+
+            self.rate_limiter.update_from_headers(raw_response.headers)
+            completion: ChatCompletion = raw_response.parse()
+            return [c.message.content for c in completion.choices]  # type: ignore
+
+        print(f"Failed to run the model after {self.args.max_retries} retries!")
+        return None
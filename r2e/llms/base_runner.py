@@ -15,16 +15,62 @@ class BaseRunner(ABC):
         self.client_kwargs: dict[str, str] = {}
 
         if self.args.use_cache:
-            self.cache = Cache()
+            self.cache = Cache(self.cache_key_params())
         else:
             self.cache = None
 
+    def cache_key_params(self) -> dict:
+        """
+        Model and sampling params the cached completions depend on
+        `n` is not part of the key: cached samples are reused for any `n`
+        """
+        return {
+            "model": self.args.model_name,
+            "local_model_path": self.args.local_model_path,
+            "top_p": self.args.top_p,
+            "max_tokens": self.args.max_tokens,
+            "temperature": self.args.temperature,
+            "presence_penalty": self.args.presence_penalty,
+            "frequency_penalty": self.args.frequency_penalty,
+            "stop": self.args.stop,
+        }
+
     def save_cache(self):
         if self.cache is not None:
             self.cache.save_cache()
 
+    def get_cached_samples(self, payloads: list) -> list[list[str]]:
+        """Cached samples of each payload (at most `n`, possibly fewer)"""
+        if self.cache is None:
+            return [[] for _ in payloads]
+        return [self.cache.get_samples(payload)[: self.args.n] for payload in payloads]
+
+    def get_missing_samples(
+        self, cached_outputs: list[list[str]]
+    ) -> list[tuple[int, int]]:
+        """(index, number of samples to generate) of the payloads without `n` cached samples"""
+        return [
+            (index, self.args.n - len(cached))
+            for index, cached in enumerate(cached_outputs)
+            if len(cached) < self.args.n
+        ]
+
+    def add_samples(
+        self, payload, cached: list[str], samples: list[str] | None, num_samples: int
+    ) -> list[str]:
+        """
+        Completes the cached samples of the payload with the generated ones
+        and saves them to the cache (failed generations are not cached)
+        """
+        if samples is None:
+            return cached + [""] * num_samples
+        outputs = cached + samples
+        if self.cache is not None:
+            self.cache.add_to_cache(payload, outputs)
+        return outputs
+
     @abstractmethod
-    def _run_single(self, payload) -> list[str]:
+    def _run_single(self, payload, n: int | None = None) -> list[str]:
         return []
 
     @staticmethod
@@ -34,31 +80,27 @@ class BaseRunner(ABC):
         Static method to be used in multiprocessing
         Calls the _run_single method with the combined arguments
         """
-        cache: Cache | None
         call_method: callable  # type: ignore
-        payload, cache, args, call_method = combined_args
+        payload, num_samples, call_method = combined_args
 
-        if cache is not None:
-            cache_result = cache.get_from_cache(payload)
-            if cache_result is not None:
-                return cache_result
-
-        result = call_method(payload)
-        assert len(result) == args.n
+        result = call_method(payload, num_samples)
+        assert len(result) == num_samples
 
         return result
 
     def run_batch(self, payloads: list) -> list[list[str]]:
-        outputs = []
+        ## only the samples missing from the cache are generated
+        outputs = self.get_cached_samples(payloads)
+        missing = self.get_missing_samples(outputs)
         arguments = [
             (
-                payload,
-                self.cache,  ## pass the cache as argument for cache check
-                self.args,  ## pass the args as argument for cache check
+                payloads[index],
+                num_samples,
                 self._run_single,  ## pass the _run_single method as argument because of multiprocessing
             )
-            for payload in payloads
+            for index, num_samples in missing
         ]
+        results: list[list[str] | None] = []
         if self.args.multiprocess > 1:
             parallel_outputs = run_tasks_in_parallel(
                 self.run_single,
@@ -68,18 +110,19 @@ class BaseRunner(ABC):
             )
             for output in parallel_outputs:
                 if output.is_success():
-                    outputs.append(output.result)
+                    results.append(output.result)
                 else:
                     print("Failed to run the model for some payload")
                     print(output.status)
                     print(output.exception_tb)
-                    outputs.extend([""] * self.args.n)
+                    results.append(None)
         else:
-            outputs = [self.run_single(argument) for argument in tqdm(arguments)]
+            results = [self.run_single(argument) for argument in tqdm(arguments)]
 
-        if self.cache is not None:
-            for payload, output in zip(payloads, outputs):
-                self.cache.add_to_cache(payload, output)  ## save the output to cache
+        for (index, num_samples), result in zip(missing, results):
+            outputs[index] = self.add_samples(
+                payloads[index], outputs[index], result, num_samples
+            )
 
         return outputs
 
@@ -1,17 +1,56 @@
+"""Persistent cache of LLM completions."""
+
 import os
 import json
+import sqlite3
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from r2e.paths import LLM_CACHE_DIR
 
-from r2e.paths import CACHE_PATH, CACHE_DIR
+SQLITE_TIMEOUT = 60
 
 
 class Cache:
-    def __init__(self) -> None:
-        if os.path.exists(CACHE_PATH):
-            with open(CACHE_PATH) as f:
-                self.cache_dict = json.load(f)
-        else:
-            os.makedirs(CACHE_DIR, exist_ok=True)
-            self.cache_dict = {}
+    """Sharded sqlite store of LLM completions.
+
+    Entries are keyed by a stable hash of the model and sampling params
+    (`key_params`) and the payload, and spread over `num_shards` sqlite
+    files so that lookups and writes only touch one record of one shard.
+    An entry holds the samples generated for the payload so far, so the
+    number of samples `n` is not part of the key: a lookup for `n`
+    samples hits if at least `n` samples are cached (see `get_samples`
+    for partial hits).
+    Writes are buffered until `save_cache` and are safe for concurrent
+    writers across processes (WAL journal, busy timeout).
+
+    Args:
+        key_params (dict): model and sampling params the completions depend on
+        cache_dir (str | Path): directory of the shards
+        num_shards (int): number of sqlite files
+        max_pending (int): number of buffered writes that triggers a save
+    """
+
+    def __init__(
+        self,
+        key_params: Optional[dict[str, Any]] = None,
+        cache_dir: str | Path = LLM_CACHE_DIR,
+        num_shards: int = 16,
+        max_pending: int = 1000,
+    ) -> None:
+        self.key_params = key_params or {}
+        self.cache_dir = Path(cache_dir)
+        self.num_shards = num_shards
+        self.max_pending = max_pending
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._pending: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._connections: dict[int, sqlite3.Connection] = {}
+        self._pid = os.getpid()
 
     @staticmethod
     def process_payload(payload):
@@ -19,16 +58,133 @@ class Cache:
             return json.dumps(payload)
         return payload
 
-    def get_from_cache(self, payload):
-        payload_cache = self.process_payload(payload)
-        if payload_cache in self.cache_dict:
-            return self.cache_dict[payload_cache]
-        return None
+    def cache_key(self, payload) -> str:
+        key_data = {"params": self.key_params, "payload": payload}
+        key_str = json.dumps(key_data, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(key_str.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def get_from_cache(self, payload, n: Optional[int] = None):
+        """The first `n` cached samples of the payload (None unless all are cached)"""
+        samples = self.get_samples(payload)
+        if not samples or (n is not None and len(samples) < n):
+            return None
+        return samples[:n]
+
+    def get_samples(self, payload) -> list:
+        """All the cached samples of the payload (empty on a miss)"""
+        key = self.cache_key(payload)
+        with self._lock:
+            output = self._pending.get(key)
+            if output is None:
+                row = (
+                    self._connection(self._shard(key))
+                    .execute("SELECT output FROM completions WHERE key = ?", (key,))
+                    .fetchone()
+                )
+                output = row[0] if row is not None else None
+        if output is None:
+            return []
+        return json.loads(output)
 
     def add_to_cache(self, payload, output):
-        payload_cache = self.process_payload(payload)
-        self.cache_dict[payload_cache] = output
+        """Set the samples of the payload (including previously cached ones)"""
+        key = self.cache_key(payload)
+        with self._lock:
+            self._pending[key] = json.dumps(output)
+            num_pending = len(self._pending)
+        if num_pending >= self.max_pending:
+            self.save_cache()
 
     def save_cache(self):
-        with open(CACHE_PATH, "w") as f:
-            json.dump(self.cache_dict, f, indent=4)
+        """Write the buffered entries (one transaction per shard)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            shards: dict[int, list[tuple[str, str]]] = {}
+            for key, output in pending.items():
+                shards.setdefault(self._shard(key), []).append((key, output))
+            for shard, rows in shards.items():
+                with self._connection(shard) as conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO completions (key, output) VALUES (?, ?)",
+                        rows,
+                    )
+
+    def import_json_cache(self, file_path: str | Path) -> int:
+        """Add the entries of a legacy `cache.json` (payload -> completions).
+
+        NOTE: legacy entries were not keyed on the model or sampling params;
+        they are imported under the `key_params` of this cache.
+        """
+        with open(file_path) as f:
+            cache_dict: dict[str, Any] = json.load(f)
+        for payload_str, output in cache_dict.items():
+            try:
+                payload = json.loads(payload_str)
+            except json.JSONDecodeError:
+                payload = payload_str
+            self.add_to_cache(payload, output)
+        self.save_cache()
+        return len(cache_dict)
+
+    def close(self):
+        self.save_cache()
+        with self._lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # connections and locks are not shared with worker processes
+        state = self.__dict__.copy()
+        state["_pending"] = dict(self._pending)
+        state["_lock"] = None
+        state["_connections"] = {}
+        return state
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    # helpers
+
+    def _shard(self, key: str) -> int:
+        return int(key[:8], 16) % self.num_shards
+
+    def _connection(self, shard: int) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            # forked: the connections of the parent must not be used
+            self._connections = {}
+            self._pid = os.getpid()
+
+        conn = self._connections.get(shard)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.cache_dir / f"shard_{shard:03d}.sqlite",
+                timeout=SQLITE_TIMEOUT,
+                check_same_thread=False,
+            )
+            self._enable_wal(conn)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions "
+                "(key TEXT PRIMARY KEY, output TEXT NOT NULL)"
+            )
+            self._connections[shard] = conn
+        return conn
+
+    @staticmethod
+    def _enable_wal(conn: sqlite3.Connection):
+        """Switch a shard to WAL, retrying while another process holds it.
+
+        NOTE: sqlite does not apply the busy timeout to the journal mode
+        switch, so writers opening a new shard at once can get SQLITE_BUSY.
+        """
+        deadline = time.monotonic() + SQLITE_TIMEOUT
+        while True:
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                return
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) or time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
@@ -13,33 +13,22 @@ class LLMCompletions:
         assert len(matched_lang_model) == 1
         model = matched_lang_model[0]
 
-        if model.style == LanguageModelStyle.OpenAI:
-            from r2e.llms.openai_runner import OpenAIRunner
+        if model.style == LanguageModelStyle.OpenAI and args.use_batch_api:
+            from r2e.llms.openai_batch_runner import OpenAIBatchRunner
 
-            runner = OpenAIRunner(args, model)
+            runner = OpenAIBatchRunner(args, model)
             return runner.run_main(payloads)
 
-        raise ValueError(f"Unsupported model style: {model.style}")
-
-    # @staticmethod
-    # def get_llm_completions_async(args: LLMArgs, payloads: list) -> None:
-    #     model_name = args.model_name
-    #     matched_lang_model = [
-    #         model for model in LanguageModelList if model.model_name == model_name
-    #     ]
-    #     assert len(matched_lang_model) == 1
-    #     model = matched_lang_model[0]
-
-    #     assert model.style == LanguageModelStyle.OpenAI
+        if model.style == LanguageModelStyle.OpenAI and args.use_async_runner:
+            from r2e.llms.async_openai_runner import AsyncOpenAIRunner
 
-    #     from openai import OpenAI
+            runner = AsyncOpenAIRunner(args, model)
+            return runner.run_main(payloads)
 
-    #     client = OpenAI()
+        if model.style == LanguageModelStyle.OpenAI:
+            from r2e.llms.openai_runner import OpenAIRunner
 
-    #     client.files.create(file=open("mydata.jsonl", "rb"), purpose="batch completions")
+            runner = OpenAIRunner(args, model)
+            return runner.run_main(payloads)
 
-    #     client.batches.create(
-    #         input_file_id="file-abc123",
-    #         endpoint="/v1/chat/completions",
-    #         completion_window="24h",
-    #     )
+        raise ValueError(f"Unsupported model style: {model.style}")
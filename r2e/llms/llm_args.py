@@ -49,6 +49,52 @@ class LLMArgs(BaseModel):
         60,
         description="The timeout for the OpenAI API request",
     )
+    use_async_runner: bool = Field(
+        True,
+        description="Whether to send the OpenAI API requests concurrently from one process (asyncio); replaces the process-based runner, so `multiprocess` does not apply to OpenAI models",
+    )
+    max_in_flight: int = Field(
+        64,
+        description="The maximum number of concurrent requests of the async runner",
+    )
+    requests_per_minute: int | None = Field(
+        None,
+        description="The initial request rate limit (updated from the API response headers)",
+    )
+    tokens_per_minute: int | None = Field(
+        None,
+        description="The initial token rate limit (updated from the API response headers)",
+    )
+    max_retries: int = Field(
+        8,
+        description="The maximum number of retries of a failed request of the async runner",
+    )
+    backoff_base: float = Field(
+        1.0,
+        description="The base delay (seconds) of the exponential backoff between retries",
+    )
+    backoff_max: float = Field(
+        60.0,
+        description="The maximum delay (seconds) of the exponential backoff between retries",
+    )
+
+    ## openai batch api
+    use_batch_api: bool = Field(
+        False,
+        description="Whether to run the OpenAI requests offline through the batch API",
+    )
+    batch_max_requests: int = Field(
+        50000,
+        description="The maximum number of requests per submitted batch",
+    )
+    batch_poll_interval: int = Field(
+        60,
+        description="The interval (seconds) between polls of a submitted batch",
+    )
+    batch_dir: str | None = Field(
+        None,
+        description="The directory of the submitted batches (for resuming)",
+    )
 
     use_cache: bool = Field(
         True,
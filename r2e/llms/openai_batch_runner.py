@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from openai import OpenAI
+
+from r2e.paths import BATCH_API_DIR
+from r2e.llms.llm_args import LLMArgs
+from r2e.llms.base_runner import BaseRunner
+from r2e.llms.language_model import LanguageModel
+from r2e.utils.data import RecordWriter, iter_batches, load_json
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_DONE_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class OpenAIBatchRunner(BaseRunner):
+    """Runs the payloads offline through the OpenAI batch API.
+
+    The requests missing from the cache are written to a JSONL file,
+    uploaded and submitted as a batch which is polled until it finishes;
+    the results are mapped back to the payloads by their custom id and
+    written to the completion cache. Requests are split into batches of
+    `batch_max_requests` and the cache is saved after each batch.
+
+    A submitted batch is recorded in `batch_dir` (keyed by its requests)
+    so that an interrupted run resumes polling the same batch instead
+    of submitting (and paying for) it again.
+    """
+
+    def __init__(self, args: LLMArgs, model: LanguageModel):
+        super().__init__(args, model)
+        self.client_kwargs: dict[str, Any] = {
+            "model": args.model_name,
+            "temperature": args.temperature,
+            "max_tokens": args.max_tokens,
+            "top_p": args.top_p,
+            "frequency_penalty": args.frequency_penalty,
+            "presence_penalty": args.presence_penalty,
+        }
+        self.client = OpenAI(api_key=os.getenv("OPENAI_KEY"))
+        self.batch_dir = Path(args.batch_dir) if args.batch_dir else BATCH_API_DIR
+        self.batch_dir.mkdir(parents=True, exist_ok=True)
+
+    def _run_single(
+        self, payload: list[dict[str, str]], n: int | None = None
+    ) -> list[str]:
+        num_samples = self.args.n if n is None else n
+        result = self.run_requests([(payload, num_samples)])[0]
+        return result if result is not None else [""] * num_samples
+
+    def run_main(self, payloads: list) -> list[list[str]]:
+        ## a single pass: batches are not split by `cache_batch_size`
+        outputs = self.run_batch(payloads)
+        self.save_cache()
+        return outputs
+
+    def run_batch(self, payloads: list) -> list[list[str]]:
+        outputs = self.get_cached_samples(payloads)
+        missing = self.get_missing_samples(outputs)
+
+        for missing_batch in iter_batches(missing, self.args.batch_max_requests):
+            requests = [(payloads[index], n) for index, n in missing_batch]
+
+            def add_results(results, missing_batch=missing_batch):
+                for (index, num_samples), result in zip(missing_batch, results):
+                    outputs[index] = self.add_samples(
+                        payloads[index], outputs[index], result, num_samples
+                    )
+                self.save_cache()
+
+            self.run_requests(requests, on_results=add_results)
+        return outputs
+
+    def run_requests(
+        self,
+        requests: list[tuple[list[dict[str, str]], int]],
+        on_results: Optional[Callable[[list[Optional[list[str]]]], None]] = None,
+    ) -> list[Optional[list[str]]]:
+        """Run (payload, n) requests as one batch (None for failed requests)
+
+        `on_results` is called with the results (e.g., to cache them) before
+        the batch is forgotten, so an interrupted run resumes the batch
+        until its results are stored.
+        """
+        bodies = [
+            {"messages": payload, **self.client_kwargs, "n": n}
+            for payload, n in requests
+        ]
+        custom_ids = [self.custom_id(body) for body in bodies]
+        batch_key = hashlib.sha256("\n".join(custom_ids).encode()).hexdigest()[:32]
+        state_file = self.batch_dir / f"{batch_key}.json"
+
+        if state_file.exists():
+            batch_id = load_json(state_file)["batch_id"]  # type: ignore
+            print(f"Resuming batch {batch_id}")
+        else:
+            batch_id = self.submit(batch_key, custom_ids, bodies)
+            temp_file = state_file.with_suffix(".tmp")
+            with open(temp_file, "w") as f:
+                json.dump({"batch_id": batch_id, "num_requests": len(bodies)}, f)
+            os.replace(temp_file, state_file)
+
+        batch = self.wait_for_batch(batch_id)
+        results_by_id = self.download_results(batch)
+        results = [results_by_id.get(custom_id) for custom_id in custom_ids]
+        if on_results is not None:
+            on_results(results)
+        # finished batches are not resumed (their failed requests are resubmitted)
+        state_file.unlink()
+        return results
+
+    @staticmethod
+    def custom_id(body: dict[str, Any]) -> str:
+        body_str = json.dumps(body, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(body_str.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def submit(
+        self, batch_key: str, custom_ids: list[str], bodies: list[dict[str, Any]]
+    ) -> str:
+        input_file = self.batch_dir / f"{batch_key}_input.jsonl"
+        with RecordWriter(input_file) as writer:
+            # duplicate payloads are requested once
+            for custom_id, body in dict(zip(custom_ids, bodies)).items():
+                writer.write(
+                    {
+                        "custom_id": custom_id,
+                        "method": "POST",
+                        "url": BATCH_ENDPOINT,
+                        "body": body,
+                    }
+                )
+
+        with open(input_file, "rb") as f:
+            uploaded_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        input_file.unlink()
+        print(f"Submitted batch {batch.id} with {writer.count} requests")
+        return batch.id
+
+    def wait_for_batch(self, batch_id: str):
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in BATCH_DONE_STATUSES:
+                print(f"Batch {batch_id} {batch.status}")
+                return batch
+            counts = batch.request_counts
+            if counts is not None:
+                print(
+                    f"Batch {batch_id} {batch.status}: "
+                    f"{counts.completed}/{counts.total} requests completed"
+                )
+            time.sleep(self.args.batch_poll_interval)
+
+    def download_results(self, batch) -> dict[str, list[str]]:
+        """Completions of the successful requests of a batch by custom id"""
+        results: dict[str, list[str]] = {}
+        if not batch.output_file_id:
+            return results
+
+        content = self.client.files.content(batch.output_file_id).text
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                print(f"Failed request {record['custom_id']}: {record.get('error')}")
+                continue
+            choices = response["body"]["choices"]
+            results[record["custom_id"]] = [c["message"]["content"] for c in choices]
+        return results
@@ -29,13 +29,18 @@ class OpenAIRunner(BaseRunner):
             "timeout": args.openai_timeout,
         }
 
-    def _run_single(self, payload: list[dict[str, str]]) -> list[str]:
+    def _run_single(
+        self, payload: list[dict[str, str]], n: int | None = None
+    ) -> list[str]:
         assert isinstance(payload, list)
+        client_kwargs = dict(self.client_kwargs)
+        if n is not None:
+            client_kwargs["n"] = n
 
         try:
             response: ChatCompletion = OpenAIRunner.client.chat.completions.create(
                 messages=payload,  # type: ignore
-                **self.client_kwargs,
+                **client_kwargs,
             )
         except (
             openai.APIError,
@@ -51,7 +56,7 @@ class OpenAIRunner(BaseRunner):
             print("Sleeping for 30 seconds...")
             print("Consider reducing the number of parallel processes.")
             sleep(30)
-            return self._run_single(payload)
+            return self._run_single(payload, n)
         except Exception as e:
             print(f"Failed to run the model for {payload}!")
             print("Exception: ", repr(e))
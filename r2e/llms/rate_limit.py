@@ -0,0 +1,163 @@
+"""Client-side rate limiting of LLM API requests (for asyncio runners)."""
+
+import re
+import time
+import random
+import asyncio
+from typing import Mapping, Optional
+
+DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(duration: Optional[str]) -> Optional[float]:
+    """Parse a rate limit reset duration (e.g., `20ms`, `1s`, `6m0s`) in seconds"""
+    if not duration:
+        return None
+    matches = DURATION_PATTERN.findall(duration)
+    if not matches:
+        try:
+            return float(duration)
+        except ValueError:
+            return None
+    return sum(float(value) * DURATION_UNITS[unit] for value, unit in matches)
+
+
+def parse_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value)  # type: ignore
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Exponential backoff with full jitter for the `attempt`-th retry"""
+    return random.uniform(0, min(maximum, base * 2**attempt))
+
+
+def estimate_tokens(payload: list[dict[str, str]] | str, completion_tokens: int) -> int:
+    """Rough token count of a request (~4 characters per prompt token)"""
+    if isinstance(payload, str):
+        num_chars = len(payload)
+    else:
+        num_chars = sum(len(str(message.get("content", ""))) for message in payload)
+    return num_chars // 4 + completion_tokens
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `limit` tokens per minute.
+
+    The bucket does not limit until its limit is known (given or
+    learned from the rate limit headers of the responses).
+    """
+
+    def __init__(self, limit: Optional[float] = None):
+        self.limit = limit
+        self.tokens = limit or 0.0
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        if self.limit:
+            refilled = (now - self.updated) * self.limit / 60
+            self.tokens = min(self.limit, self.tokens + refilled)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they are)"""
+        self.refill()
+        if not self.limit:
+            return 0.0
+        amount = min(amount, self.limit)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * 60 / self.limit
+
+    def consume(self, amount: float):
+        if self.limit:
+            self.tokens -= min(amount, self.limit)
+
+    def update(self, limit: Optional[int], remaining: Optional[int]):
+        """Sync the bucket with the limit and remaining tokens reported by the API"""
+        self.refill()
+        if limit:
+            if not self.limit:
+                self.tokens = limit
+            self.limit = limit
+        if remaining is not None and self.limit:
+            self.tokens = min(self.tokens, remaining)
+
+
+class RateLimiter:
+    """Request- and token-per-minute buckets shared by concurrent requests.
+
+    The limits are updated from the `x-ratelimit-*` headers of the API
+    responses, and all the requests are paused after a rate limit error.
+
+    Args:
+        requests_per_minute (int): initial request limit (learned if None)
+        tokens_per_minute (int): initial token limit (learned if None)
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # the limiter outlives the event loop of a batch
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    async def acquire(self, num_tokens: int):
+        """Wait until a request of `num_tokens` tokens can be sent (FIFO)"""
+        async with self.lock:
+            while True:
+                wait = max(
+                    self.paused_until - time.monotonic(),
+                    self.requests.wait_time(1),
+                    self.tokens.wait_time(num_tokens),
+                )
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            self.requests.consume(1)
+            self.tokens.consume(num_tokens)
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        self.requests.update(
+            parse_int(headers.get("x-ratelimit-limit-requests")),
+            parse_int(headers.get("x-ratelimit-remaining-requests")),
+        )
+        self.tokens.update(
+            parse_int(headers.get("x-ratelimit-limit-tokens")),
+            parse_int(headers.get("x-ratelimit-remaining-tokens")),
+        )
+
+
+def get_retry_after(headers: Mapping[str, str]) -> float:
+    """Seconds to wait before retrying, as reported by the API (0 if unknown)"""
+    retry_after = parse_duration(headers.get("retry-after-ms"))
+    if retry_after is not None:
+        return retry_after / 1000
+    retry_after = parse_duration(headers.get("retry-after"))
+    if retry_after is not None:
+        return retry_after
+    resets = [
+        parse_duration(headers.get("x-ratelimit-reset-requests")),
+        parse_duration(headers.get("x-ratelimit-reset-tokens")),
+    ]
+    return max([reset for reset in resets if reset is not None], default=0.0)
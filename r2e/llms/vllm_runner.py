@@ -22,8 +22,11 @@ class VLLMRunner(BaseRunner):
             disable_custom_all_reduce=False,
         )
 
-        self.sampling_params = SamplingParams(
-            n=self.args.n,
+        self.sampling_params = self.get_sampling_params(self.args.n)
+
+    def get_sampling_params(self, n: int) -> SamplingParams:
+        return SamplingParams(
+            n=n,
             max_tokens=self.args.max_tokens,
             temperature=self.args.temperature,
             top_p=self.args.top_p,
@@ -32,32 +35,30 @@ class VLLMRunner(BaseRunner):
             stop=self.args.stop,
         )
 
-    def _run_single(self, payload):  # type: ignore
+    def _run_single(self, payload, n=None):  # type: ignore
         pass
 
     def run_batch(self, payloads: list[str]) -> list[list[str]]:
-        outputs: list[list[str]] = [None for _ in payloads]  # type: ignore
-        remaining_payloads = []
-        remaining_indices = []
-        for payload_index, payload in enumerate(payloads):
-            if self.cache is not None:
-                cache_result = self.cache.get_from_cache(payload)
-                if cache_result is not None:
-                    outputs[payload_index] = cache_result
-                    continue
-            remaining_payloads.append(payload)
-            remaining_indices.append(payload_index)
-        if remaining_payloads:
-            vllm_outputs = self.llm.generate(remaining_payloads, self.sampling_params)
-            if self.cache is not None:
-                assert len(remaining_payloads) == len(vllm_outputs)
-                for index, remaining_payload, vllm_output in zip(
-                    remaining_indices, remaining_payloads, vllm_outputs
-                ):
-                    output_texts = [o.text for o in vllm_output.outputs]
-                    self.cache.add_to_cache(remaining_payload, output_texts)
-                    outputs[index] = output_texts
-            else:
-                for index, vllm_output in zip(remaining_indices, vllm_outputs):
-                    outputs[index] = [o.text for o in vllm_output.outputs]
+        ## only the samples missing from the cache are generated
+        outputs = self.get_cached_samples(payloads)
+        missing = self.get_missing_samples(outputs)
+        if not missing:
+            return outputs
+
+        remaining_payloads = [payloads[index] for index, _ in missing]
+        sampling_params = [
+            (
+                self.sampling_params
+                if num_samples == self.args.n
+                else self.get_sampling_params(num_samples)
+            )
+            for _, num_samples in missing
+        ]
+        vllm_outputs = self.llm.generate(remaining_payloads, sampling_params)
+        assert len(remaining_payloads) == len(vllm_outputs)
+        for (index, num_samples), vllm_output in zip(missing, vllm_outputs):
+            output_texts = [o.text for o in vllm_output.outputs]
+            outputs[index] = self.add_samples(
+                payloads[index], outputs[index], output_texts, num_samples
+            )
         return outputs
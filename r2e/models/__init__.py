@@ -7,4 +7,4 @@ from r2e.models.function import Function
 from r2e.models.classes import Class
 from r2e.models.method import Method
 from r2e.models.fut import FunctionUnderTest, MethodUnderTest
-from r2e.models.tests import Tests, TestHistory
+from r2e.models.tests import Tests, TestsDelta, TestHistory
@@ -1,10 +1,17 @@
+import os
 import json
-from typing import Optional
-from pydantic import BaseModel
+import mmap
+import struct
+from array import array
+from typing import TYPE_CHECKING, Optional, Sequence
+from pydantic import BaseModel, PrivateAttr
 from enum import Enum, auto
 
 from r2e.models.identifier import Identifier
 
+if TYPE_CHECKING:
+    from r2e.models.identifier_trie import IdentifierTrie
+
 
 class CodeElemType(Enum):
     """Enum for code elements."""
@@ -17,15 +24,223 @@ class CodeElemType(Enum):
     OTHER = auto()
 
 
+class ReachabilityIndex:
+    """Callers and transitive reachability of a call graph.
+
+    Node names are interned into ints with forward and reverse adjacency
+    lists. Strongly connected components (e.g., mutual recursion) are
+    condensed, and each component stores the components it reaches as a
+    bitset (a Python int). `reaches` is then a bit test, and
+    `reachable_from` expands a bitset instead of walking the graph. The
+    depth-limited queries and `reaching` (transitive callers) are BFS
+    over the adjacency lists.
+
+    A node reaches itself only if it is on a cycle. The queries return
+    node names (sorted); unknown names have no callers or callees.
+
+    Args:
+        names (list[str]): node names (the node ids are their positions)
+        succ (list[Sequence[int]]): callee node ids of every node
+    """
+
+    def __init__(self, names: list[str], succ: list[Sequence[int]]):
+        self.names = names
+        self.node_ids = {name: node for node, name in enumerate(names)}
+        self.succ = succ
+        self.pred = [array("I") for _ in names]
+        for node, callees in enumerate(succ):
+            for callee in callees:
+                self.pred[callee].append(node)
+
+        self.component, self.members = self._components()
+        self.reach = self._reach_bitsets()
+
+    @classmethod
+    def from_dict(cls, graph: dict[str, list[str]]) -> "ReachabilityIndex":
+        names = set(graph)
+        for callees in graph.values():
+            names.update(callees)
+        names = sorted(names)
+        node_ids = {name: node for node, name in enumerate(names)}
+        succ = [
+            array("I", (node_ids[callee] for callee in graph.get(name, [])))
+            for name in names
+        ]
+        return cls(names, succ)
+
+    def _components(self) -> tuple[list[int], list[list[int]]]:
+        """Tarjan's SCCs (iterative); components are numbered in reverse
+        topological order, i.e., a component only reaches lower numbers."""
+        num_nodes = len(self.names)
+        index = [-1] * num_nodes
+        low = [0] * num_nodes
+        on_stack = [False] * num_nodes
+        component = [-1] * num_nodes
+        members: list[list[int]] = []
+        stack: list[int] = []
+        counter = 0
+
+        for root in range(num_nodes):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, 0)]
+
+            while work:
+                node, i = work[-1]
+                callees = self.succ[node]
+                if i < len(callees):
+                    work[-1] = (node, i + 1)
+                    callee = callees[i]
+                    if index[callee] == -1:
+                        index[callee] = low[callee] = counter
+                        counter += 1
+                        stack.append(callee)
+                        on_stack[callee] = True
+                        work.append((callee, 0))
+                    elif on_stack[callee]:
+                        low[node] = min(low[node], index[callee])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    scc = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = len(members)
+                        scc.append(member)
+                        if member == node:
+                            break
+                    members.append(scc)
+
+        return component, members
+
+    def _reach_bitsets(self) -> list[int]:
+        reach: list[int] = []
+        for c, scc in enumerate(self.members):
+            bits = 0
+            for node in scc:
+                for callee in self.succ[node]:
+                    d = self.component[callee]
+                    if d == c:
+                        bits |= 1 << c  # on a cycle
+                    else:
+                        bits |= reach[d] | (1 << d)
+            reach.append(bits)
+        return reach
+
+    def _bfs(self, node: int, adjacency, max_depth: Optional[int]) -> list[int]:
+        seen = {node}
+        found = set()
+        frontier = [node]
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for current in frontier:
+                for neighbor in adjacency[current]:
+                    found.add(neighbor)
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return sorted(found)
+
+    def _node(self, key) -> Optional[int]:
+        name = key.identifier if isinstance(key, Identifier) else str(key)
+        return self.node_ids.get(name)
+
+    def callees(self, key) -> list[str]:
+        node = self._node(key)
+        if node is None:
+            return []
+        return [self.names[callee] for callee in sorted(set(self.succ[node]))]
+
+    def callers(self, key) -> list[str]:
+        node = self._node(key)
+        if node is None:
+            return []
+        return [self.names[caller] for caller in sorted(set(self.pred[node]))]
+
+    def reaches(self, source, target) -> bool:
+        """Whether `source` (transitively) calls `target`"""
+        source_node, target_node = self._node(source), self._node(target)
+        if source_node is None or target_node is None:
+            return False
+        bits = self.reach[self.component[source_node]]
+        return bool(bits >> self.component[target_node] & 1)
+
+    def reachable_from(self, key, max_depth: Optional[int] = None) -> list[str]:
+        """Transitive callees of `key` (within `max_depth` calls)"""
+        node = self._node(key)
+        if node is None:
+            return []
+        if max_depth is not None:
+            return [self.names[n] for n in self._bfs(node, self.succ, max_depth)]
+
+        bits = self.reach[self.component[node]]
+        nodes = []
+        for c, bit in enumerate(reversed(bin(bits)[2:])):
+            if bit == "1":
+                nodes.extend(self.members[c])
+        return [self.names[n] for n in sorted(nodes)]
+
+    def reaching(self, key, max_depth: Optional[int] = None) -> list[str]:
+        """Transitive callers of `key` (within `max_depth` calls)"""
+        node = self._node(key)
+        if node is None:
+            return []
+        return [self.names[n] for n in self._bfs(node, self.pred, max_depth)]
+
+
 class CallGraph(BaseModel):
     graph: dict[Identifier, list[Identifier]]
     id2type: Optional[dict[Identifier, CodeElemType]] = None
+    _callee_counts: Optional[dict[str, int]] = PrivateAttr(None)
+    _reachability: Optional[ReachabilityIndex] = PrivateAttr(None)
+    _trie: Optional["IdentifierTrie"] = PrivateAttr(None)
 
     def get(self, key, default=None):
         if default is None:
             default = []
         return self.graph.get(key, default)
 
+    def callee_count(self, key) -> int:
+        """Number of callees of an `Identifier` (or str) from a degree table
+        built on first use (0 if it is not a caller)."""
+        if self._callee_counts is None:
+            self._callee_counts = {
+                caller.identifier: len(callees)
+                for caller, callees in self.graph.items()
+            }
+        name = key.identifier if isinstance(key, Identifier) else str(key)
+        return self._callee_counts.get(name, 0)
+
+    @property
+    def reachability(self) -> ReachabilityIndex:
+        """Callers and transitive reachability index (built on first use)"""
+        if self._reachability is None:
+            self._reachability = ReachabilityIndex.from_dict(self.to_dict())
+        return self._reachability
+
+    @property
+    def trie(self) -> "IdentifierTrie":
+        """Trie of the typed ids (built on first use)"""
+        from r2e.models.identifier_trie import IdentifierTrie
+
+        if self._trie is None:
+            self._trie = IdentifierTrie.from_types(
+                (k.identifier, v) for k, v in (self.id2type or {}).items()
+            )
+        return self._trie
+
     def get_type(self, key):
         if self.id2type is None:
             return CodeElemType.OTHER
@@ -51,9 +266,13 @@ class CallGraph(BaseModel):
 
     def __delitem__(self, key):
         del self.graph[key]
+        self._callee_counts = None
+        self._reachability = None
 
     def __setitem__(self, key, value):
         self.graph[key] = value
+        self._callee_counts = None
+        self._reachability = None
 
     # helpers
 
@@ -87,3 +306,286 @@ class CallGraph(BaseModel):
         return {
             k.identifier: [v.identifier for v in vs] for k, vs in self.graph.items()
         }
+
+
+class CompactCallGraph:
+    """Read-only call graph backed by a memory-mapped binary file.
+
+    Node ids are interned into a sorted (UTF-8) string table so that
+    lookups are binary searches on the mapped file; edges are stored in
+    CSR form (`row_ptr`, `col_idx`) and types in a `uint8` column.
+    Nothing is materialized on open, and `Identifier`s are only created
+    for the nodes that are queried.
+
+    File layout (native byte order)::
+
+        header    : MAGIC, num_nodes (u64), num_edges (u64), names_size (u64)
+        name_ptr  : u64[num_nodes + 1]  offsets of node names in `names`
+        row_ptr   : u64[num_nodes + 1]  offsets of node callees in `col_idx`
+        col_idx   : u32[num_edges]      callee node ids
+        types     : u8[num_nodes]       `CodeElemType` value (0 = unknown)
+        is_caller : u8[num_nodes]       whether the node is a key of the graph
+        names     : bytes[names_size]   concatenated UTF-8 node names
+    """
+
+    MAGIC = b"R2ECG001"
+    HEADER = struct.Struct("=8sQQQ")
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._open()
+
+    def _open(self):
+        with open(self.file_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, num_nodes, num_edges, names_size = self.HEADER.unpack_from(self._mmap)
+        if magic != self.MAGIC:
+            raise ValueError(f"Not a compact call graph: {self.file_path}")
+
+        self.num_nodes = num_nodes
+        self.num_edges = num_edges
+
+        view = memoryview(self._mmap)
+        offset = self.HEADER.size
+        sections = []
+        for fmt, size, count in [
+            ("Q", 8, num_nodes + 1),
+            ("Q", 8, num_nodes + 1),
+            ("I", 4, num_edges),
+            ("B", 1, num_nodes),
+            ("B", 1, num_nodes),
+            ("B", 1, names_size),
+        ]:
+            sections.append(view[offset : offset + size * count].cast(fmt))
+            offset += size * count
+
+        (
+            self._name_ptr,
+            self._row_ptr,
+            self._col_idx,
+            self._types,
+            self._is_caller,
+            self._names,
+        ) = sections
+
+        self._node_ids: dict[str, int] = {}
+        self._identifiers: dict[int, Identifier] = {}
+        self._id2type: Optional[dict[Identifier, CodeElemType]] = None
+        self._reachability: Optional[ReachabilityIndex] = None
+        self._trie: Optional["IdentifierTrie"] = None
+
+    # dict-like API (same as `CallGraph`)
+
+    def get(self, key, default=None):
+        if default is None:
+            default = []
+        node = self._lookup(key)
+        if node is None or not self._is_caller[node]:
+            return default
+        return self._callees(node)
+
+    def callee_count(self, key) -> int:
+        """Number of callees of an `Identifier` (or str) (0 if it is not a caller)"""
+        node = self._lookup(key)
+        if node is None:
+            return 0
+        return self._row_ptr[node + 1] - self._row_ptr[node]
+
+    @property
+    def reachability(self) -> ReachabilityIndex:
+        """Callers and transitive reachability index (built on first use)
+
+        NOTE: the node ids are those of the file; the callee lists are
+        views of the mapped `col_idx` section.
+        """
+        if self._reachability is None:
+            self._reachability = ReachabilityIndex(
+                [self._name(node) for node in range(self.num_nodes)],
+                [self._callee_nodes(node) for node in range(self.num_nodes)],
+            )
+        return self._reachability
+
+    @property
+    def trie(self) -> "IdentifierTrie":
+        """Trie of the typed ids (built on first use)"""
+        from r2e.models.identifier_trie import IdentifierTrie
+
+        if self._trie is None:
+            self._trie = IdentifierTrie.from_types(
+                (self._name(node), CodeElemType(self._types[node]))
+                for node in range(self.num_nodes)
+                if self._types[node] != 0
+            )
+        return self._trie
+
+    def get_type(self, key):
+        node = self._lookup(key)
+        if node is None or self._types[node] == 0:
+            return CodeElemType.OTHER
+        return CodeElemType(self._types[node])
+
+    def keys(self):
+        return (self._identifier(node) for node in self._callers())
+
+    def values(self):
+        return (self._callees(node) for node in self._callers())
+
+    def items(self):
+        return (
+            (self._identifier(node), self._callees(node)) for node in self._callers()
+        )
+
+    def __contains__(self, key):
+        node = self._lookup(key)
+        return node is not None and bool(self._is_caller[node])
+
+    def __getitem__(self, key):
+        node = self._lookup(key)
+        if node is None or not self._is_caller[node]:
+            raise KeyError(key)
+        return self._callees(node)
+
+    def __len__(self):
+        return sum(self._is_caller)
+
+    @property
+    def id2type(self) -> dict[Identifier, CodeElemType]:
+        """All the typed ids (materialized on first access)."""
+        if self._id2type is None:
+            self._id2type = {
+                self._identifier(node): CodeElemType(self._types[node])
+                for node in range(self.num_nodes)
+                if self._types[node] != 0
+            }
+        return self._id2type
+
+    def to_dict(self) -> dict[str, list[str]]:
+        return {
+            self._name(node): [
+                self._name(callee) for callee in self._callee_nodes(node)
+            ]
+            for node in self._callers()
+        }
+
+    # helpers
+
+    def _name(self, node: int) -> str:
+        start, end = self._name_ptr[node], self._name_ptr[node + 1]
+        return bytes(self._names[start:end]).decode("utf-8")
+
+    def _identifier(self, node: int) -> Identifier:
+        if node not in self._identifiers:
+            self._identifiers[node] = Identifier(identifier=self._name(node))
+        return self._identifiers[node]
+
+    def _callee_nodes(self, node: int):
+        return self._col_idx[self._row_ptr[node] : self._row_ptr[node + 1]]
+
+    def _callees(self, node: int) -> list[Identifier]:
+        return [self._identifier(callee) for callee in self._callee_nodes(node)]
+
+    def _callers(self):
+        return (node for node in range(self.num_nodes) if self._is_caller[node])
+
+    def _lookup(self, key) -> Optional[int]:
+        """Node id of an `Identifier` (or str) by binary search on the names."""
+        name = key.identifier if isinstance(key, Identifier) else str(key)
+        if name in self._node_ids:
+            return self._node_ids[name]
+
+        target = name.encode("utf-8")
+        lo, hi = 0, self.num_nodes
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start, end = self._name_ptr[mid], self._name_ptr[mid + 1]
+            if bytes(self._names[start:end]) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        node = None
+        if lo < self.num_nodes:
+            start, end = self._name_ptr[lo], self._name_ptr[lo + 1]
+            if bytes(self._names[start:end]) == target:
+                node = lo
+
+        if node is not None:
+            self._node_ids[name] = node
+        return node
+
+    def __getstate__(self):
+        # the mapping is re-opened on unpickling (e.g., in pool workers)
+        return {"file_path": self.file_path}
+
+    def __setstate__(self, state):
+        self.file_path = state["file_path"]
+        self._open()
+
+    # serialization
+
+    @classmethod
+    def write(
+        cls, file_path: str, graph: dict[str, list[str]], types: dict[str, str]
+    ) -> None:
+        """Write a `caller -> [callee]` graph and `id -> type name` map to disk."""
+        names = set(graph) | set(types)
+        for callees in graph.values():
+            names.update(callees)
+
+        encoded = sorted(name.encode("utf-8") for name in names)
+        node_ids = {name.decode("utf-8"): i for i, name in enumerate(encoded)}
+
+        name_ptr = array("Q", [0])
+        for name in encoded:
+            name_ptr.append(name_ptr[-1] + len(name))
+
+        row_ptr = array("Q", [0])
+        col_idx = array("I")
+        type_col = array("B")
+        is_caller = array("B")
+        for name in encoded:
+            name_str = name.decode("utf-8")
+            callees = graph.get(name_str)
+            col_idx.extend(node_ids[callee] for callee in callees or [])
+            row_ptr.append(len(col_idx))
+            type_name = types.get(name_str)
+            type_col.append(CodeElemType[type_name].value if type_name else 0)
+            is_caller.append(callees is not None)
+
+        names_blob = b"".join(encoded)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(
+                cls.HEADER.pack(cls.MAGIC, len(encoded), len(col_idx), len(names_blob))
+            )
+            for section in (name_ptr, row_ptr, col_idx, type_col, is_caller):
+                section.tofile(f)
+            f.write(names_blob)
+        os.replace(temp_path, file_path)
+
+    @classmethod
+    def from_json(cls, json_path: str, file_path: str) -> "CompactCallGraph":
+        """Convert a JSON call graph (see `CallGraph.from_json`) and open it."""
+        with open(json_path, "r") as f:
+            data = json.load(f)
+
+        if "graph" not in data:
+            cls.write(file_path, data, {})
+        else:
+            cls.write(file_path, data.get("graph", {}), data.get("id2type", {}))
+        return cls(file_path)
+
+    @staticmethod
+    def is_up_to_date(file_path: str, json_path: str) -> bool:
+        """Whether the binary file exists and is not older than the JSON graph."""
+        try:
+            bin_mtime = os.stat(file_path).st_mtime
+        except OSError:
+            return False
+
+        try:
+            return bin_mtime >= os.stat(json_path).st_mtime
+        except OSError:
+            return True
@@ -6,7 +6,7 @@ from r2e.models.file import File
 from r2e.models.identifier import Identifier
 from r2e.models.repo import Repo
 from r2e.models.module import Module
-from r2e.utils.models import get_module_from_identifier
+from r2e.utils.models import get_method_ids, get_module_from_identifier
 from r2e.pat.callgraph.explorer import CallGraphExplorer
 
 
@@ -49,30 +49,8 @@ class Class(BaseModel):
 
     @property
     def method_ids(self) -> list[Identifier]:
-        # methods of class are the ids w/ the prefix `class_id.`
-        # and same number of dots as the `class_id.`
-
-        if self._method_ids is not None:
-            return self._method_ids
-
-        if self.repo.callgraph is None:
-            raise ValueError("Callgraph not found in the repo")
-
-        if self.repo.callgraph.id2type is None:
-            raise ValueError("Callgraph id2type not found in the repo")
-
-        cgraph_ids = [k.identifier for k in self.repo.callgraph.id2type.keys()]
-        class_id_str = self.class_id.identifier
-        prefix = class_id_str + "."
-
-        method_ids = [
-            Identifier(identifier=id_str)
-            for id_str in cgraph_ids
-            if id_str.startswith(prefix) and id_str.count(".") == prefix.count(".")
-        ]
-
-        self._method_ids = method_ids
-
+        if self._method_ids is None:
+            self._method_ids = get_method_ids(self.class_id, self.repo)
         return self._method_ids
 
     # helpers
@@ -1,4 +1,5 @@
 from r2e.models.fut import FunctionUnderTest, MethodUnderTest
+from r2e.utils.models import construct_from
 
 
 class CodeGenProblem:
@@ -10,17 +11,13 @@ class CodeGenProblem:
 class CodeGenProblemFunction(CodeGenProblem, FunctionUnderTest):
     @classmethod
     def from_fut_and_spec(cls, fut: FunctionUnderTest, spec: str):
-        fut_dump = fut.model_dump()
-        fut_dump.update({"spec": spec})
-        return cls(**fut_dump)
+        return construct_from(cls, fut, spec=spec)
 
 
 class CodeGenProblemMethod(CodeGenProblem, MethodUnderTest):
     @classmethod
     def from_mut_and_spec(cls, mut: MethodUnderTest, spec: str):
-        mut_dump = mut.model_dump()
-        mut_dump.update({"spec": spec})
-        return cls(**mut_dump)
+        return construct_from(cls, mut, spec=spec)
 
 
 def create_codegen_problem(obj: FunctionUnderTest | MethodUnderTest, spec: str):
@@ -1,9 +1,11 @@
+import ast
 from pydantic import BaseModel
 from typing import Optional
 
 from r2e.models.module import Module
 from r2e.models.repo import Repo
 from r2e.paths import REPOS_DIR
+from r2e.pat.ast.cache import get_ast_cache
 
 
 class File(BaseModel):
@@ -41,8 +43,16 @@ class File(BaseModel):
                 self._file_content = file.read()
         return self._file_content
 
+    @property
+    def file_ast(self) -> ast.Module:
+        """AST of the file from the shared AST cache; do not mutate."""
+        return get_ast_cache().get_ast(self.file_path, self.file_content)
+
     def __hash__(self) -> int:
-        return hash((self.file_path, self._repo_name, self.file_content))
+        # NOTE: the content is not hashed (it would be read from disk); equal
+        # files have the same module id and repo so the hash is consistent
+        # with `__eq__` (and the path is not built on every hash)
+        return hash((self.file_module.module_id, self.repo_id, self._repo_name))
 
     @classmethod
     def from_file_path(cls, file_path: str, repo: Repo | None) -> "File":
@@ -1,9 +1,12 @@
+import json
+import hashlib
 from typing import Any, Optional
 
 from pydantic import BaseModel
 
 from r2e.models import Function, Method
 from r2e.models.tests import TestHistory, Tests
+from r2e.utils.models import construct_from
 
 
 class BaseUnderTest(BaseModel):
@@ -37,6 +40,15 @@ class BaseUnderTest(BaseModel):
         """Returns True if the latest tests are passing"""
         return self.test_history.is_passing
 
+    @property
+    def test_version(self) -> str:
+        """Identifies the latest tests (changes when tests are added or edited)"""
+        if len(self.test_history) == 0:
+            return "0"
+        tests = json.dumps(self.tests, sort_keys=True)
+        tests_hash = hashlib.sha1(tests.encode("utf-8", "surrogatepass")).hexdigest()
+        return f"{len(self.test_history)}:{tests_hash[:16]}"
+
 
 class FunctionUnderTest(BaseUnderTest, Function):
     @classmethod
@@ -45,9 +57,7 @@ class FunctionUnderTest(BaseUnderTest, Function):
     ):
         if history is None:
             history = TestHistory()
-        function_dump = function.model_dump()
-        function_dump.update({"test_history": history})
-        return cls(**function_dump)
+        return construct_from(cls, function, test_history=history)
 
     @classmethod
     def from_function(cls, function: Function):
@@ -65,9 +75,7 @@ class MethodUnderTest(BaseUnderTest, Method):
     ):
         if history is None:
             history = TestHistory()
-        method_dump = method.model_dump()
-        method_dump.update({"test_history": history})
-        return cls(**method_dump)
+        return construct_from(cls, method, test_history=history)
 
     @classmethod
     def from_method(cls, method: Method):
@@ -76,7 +84,7 @@ class MethodUnderTest(BaseUnderTest, Method):
     @property
     def execution_fut_data(self) -> tuple[str, str]:
         return (
-            f"{self.parent_class.class_name}.{self.name}",
+            f"{self.class_name}.{self.name}",
             self.file.relative_file_path,
         )
 
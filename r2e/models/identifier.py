@@ -1,8 +1,32 @@
-from pydantic import BaseModel
+import sys
+from typing import Any
 
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import core_schema
+
+
+class Identifier:
+    """Dotted id of a code element (e.g., `pkg.module.Class.method`).
+
+    NOTE: a slotted, immutable record (not a pydantic model) since ids are
+    built and hashed on hot paths (call graph lookups, loaders); the id string
+    is interned and its hash is computed once. In pydantic models identifiers
+    are (de)serialized as `{"identifier": ...}`.
+    """
+
+    __slots__ = ("identifier", "_hash")
 
-class Identifier(BaseModel):
     identifier: str
+    _hash: int
+
+    def __new__(cls, identifier: str) -> "Identifier":
+        if not isinstance(identifier, str):
+            raise TypeError(f"identifier must be a str, got {type(identifier)}")
+        obj = super().__new__(cls)
+        identifier = sys.intern(identifier)
+        object.__setattr__(obj, "identifier", identifier)
+        object.__setattr__(obj, "_hash", hash(identifier))
+        return obj
 
     @classmethod
     def from_relative_path(cls, relative_path: str) -> "Identifier":
@@ -23,11 +47,44 @@ class Identifier(BaseModel):
         relative_path = absolute_path.replace(repo_path, "")
         return cls.from_relative_path(relative_path)
 
+    def to_dict(self) -> dict[str, str]:
+        return {"identifier": self.identifier}
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        from_dict = core_schema.no_info_after_validator_function(
+            lambda data: cls(data["identifier"]),
+            core_schema.typed_dict_schema(
+                {"identifier": core_schema.typed_dict_field(core_schema.str_schema())}
+            ),
+        )
+        return core_schema.json_or_python_schema(
+            json_schema=from_dict,
+            python_schema=core_schema.union_schema(
+                [core_schema.is_instance_schema(cls), from_dict]
+            ),
+            serialization=core_schema.plain_serializer_function_ser_schema(cls.to_dict),
+        )
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (type(self), (self.identifier,))
+
     def __str__(self):
         return self.identifier
 
+    def __repr__(self):
+        return f"Identifier(identifier={self.identifier!r})"
+
     def __hash__(self):
-        return hash(self.identifier)
+        return self._hash
 
     def __eq__(self, other):
         if isinstance(other, Identifier):
@@ -0,0 +1,106 @@
+from typing import Iterable, Optional
+
+from r2e.models.callgraph import CodeElemType
+
+
+class TrieNode:
+    __slots__ = ("children", "elem_type", "is_module")
+
+    def __init__(self):
+        self.children: dict[str, "TrieNode"] = {}
+        self.elem_type: Optional[CodeElemType] = None
+        self.is_module = False
+
+
+class IdentifierTrie:
+    """Trie of dotted identifiers (`module -> class -> method`).
+
+    Every part of an identifier is a node; the nodes of identifiers carry
+    their `CodeElemType` and the nodes of module ids are flagged. Lookups
+    (type, children, module) walk the parts of one identifier, so they cost
+    O(depth) instead of a scan of all the ids of a repo.
+    """
+
+    def __init__(self):
+        self.root = TrieNode()
+
+    def _path(self, identifier: str) -> list[TrieNode]:
+        """Nodes of the longest prefix of `identifier` in the trie (root first)"""
+        node = self.root
+        path = [node]
+        for part in identifier.split("."):
+            child = node.children.get(part)
+            if child is None:
+                break
+            node = child
+            path.append(node)
+        return path
+
+    def _find(self, identifier: str) -> Optional[TrieNode]:
+        node = self.root
+        for part in identifier.split("."):
+            node = node.children.get(part)  # type: ignore
+            if node is None:
+                return None
+        return node
+
+    def _insert(self, identifier: str) -> TrieNode:
+        node = self.root
+        for part in identifier.split("."):
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = TrieNode()
+            node = child
+        return node
+
+    def add(self, identifier: str, elem_type: CodeElemType):
+        self._insert(identifier).elem_type = elem_type
+
+    def add_module(self, module_id: str):
+        self._insert(module_id).is_module = True
+
+    def __contains__(self, identifier: str) -> bool:
+        node = self._find(identifier)
+        return node is not None and node.elem_type is not None
+
+    def is_module(self, module_id: str) -> bool:
+        node = self._find(module_id)
+        return node is not None and node.is_module
+
+    def get_type(self, identifier: str) -> Optional[CodeElemType]:
+        """Type of an identifier (None if it was not added)"""
+        node = self._find(identifier)
+        return None if node is None else node.elem_type
+
+    def children(
+        self, prefix: str, elem_type: Optional[CodeElemType] = None
+    ) -> list[str]:
+        """Identifiers one part below `prefix` (of type `elem_type` if given)"""
+        node = self._find(prefix)
+        if node is None:
+            return []
+        return [
+            f"{prefix}.{name}"
+            for name, child in node.children.items()
+            if child.elem_type is not None
+            and (elem_type is None or child.elem_type == elem_type)
+        ]
+
+    def resolve_module_id(self, identifier: str) -> Optional[str]:
+        """Module id of a function/class (`mod.name`) or method (`mod.Class.name`)"""
+        parts = identifier.split(".")
+        path = self._path(identifier)
+        for depth in (len(parts) - 1, len(parts) - 2):
+            if 0 < depth < len(path) and path[depth].is_module:
+                return ".".join(parts[:depth])
+        return None
+
+    # helpers
+
+    @classmethod
+    def from_types(cls, id2type: Iterable[tuple[str, CodeElemType]]):
+        """Trie of `(identifier, type)` pairs (e.g., the ids of a call graph)"""
+        trie = cls()
+        for identifier, elem_type in id2type:
+            trie.add(identifier, elem_type)
+        return trie
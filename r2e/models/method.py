@@ -21,6 +21,8 @@ class Method(BaseModel):
     parent_class_id: Optional[Identifier] = None
     context: Optional[Context] = None
 
+    _parent_class: Optional[Class] = None
+
     @property
     def file_path(self) -> str:
         return self.file.file_path
@@ -121,11 +123,18 @@ class Method(BaseModel):
     @property
     def parent_class(self) -> Class:
         assert self.parent_class_id is not None
-        return Class.from_id_and_repo(
-            class_id=self.parent_class_id,
-            repo=self.repo,
-        )
+        if (
+            self._parent_class is None
+            or self._parent_class.class_id != self.parent_class_id
+        ):
+            self._parent_class = Class.from_id_and_repo(
+                class_id=self.parent_class_id,
+                repo=self.repo,
+            )
+        return self._parent_class
 
     @property
     def class_name(self) -> str | None:
-        return self.parent_class.class_name
+        # same as `parent_class.class_name` without finding the class module
+        assert self.parent_class_id is not None
+        return self.parent_class_id.identifier.split(".")[-1]
@@ -5,7 +5,8 @@ from pydantic import BaseModel
 
 from r2e.paths import REPOS_DIR, GRAPHS_DIR
 from r2e.models.identifier import Identifier
-from r2e.models.callgraph import CallGraph
+from r2e.models.callgraph import CallGraph, CompactCallGraph
+from r2e.models.symbol_index import SymbolIndex, get_symbol_index
 
 
 class Repo(BaseModel):
@@ -14,12 +15,21 @@ class Repo(BaseModel):
     repo_id: str
     local_repo_path: str
 
-    _cached_callgraph: Optional[CallGraph] = None
+    _cached_callgraph: Optional[CallGraph | CompactCallGraph] = None
+    _cached_symbol_index: Optional[SymbolIndex] = None
 
     @property
     def callgraph_path(self) -> str:
         return os.path.join(GRAPHS_DIR, self.repo_id + "_cgraph.json")
 
+    @property
+    def callgraph_bin_path(self) -> str:
+        return os.path.join(GRAPHS_DIR, self.repo_id + "_cgraph.bin")
+
+    @property
+    def symbol_index_path(self) -> str:
+        return os.path.join(GRAPHS_DIR, self.repo_id + "_symbols.json")
+
     @classmethod
     def from_file_path(cls, file_path: Path | str) -> "Repo":
         if isinstance(file_path, Path):
@@ -44,11 +54,29 @@ class Repo(BaseModel):
         return os.path.join(REPOS_DIR, self.repo_id)
 
     @property
-    def callgraph(self) -> CallGraph:
+    def callgraph(self) -> CallGraph | CompactCallGraph:
+        """Call graph of the repo.
+
+        NOTE: the (read-only) memory-mapped binary graph is used when it
+        is up to date; otherwise the JSON graph is loaded.
+        """
         if self._cached_callgraph is None:
-            self._cached_callgraph = CallGraph.from_json(self.callgraph_path)
+            if CompactCallGraph.is_up_to_date(
+                self.callgraph_bin_path, self.callgraph_path
+            ):
+                self._cached_callgraph = CompactCallGraph(self.callgraph_bin_path)
+            else:
+                self._cached_callgraph = CallGraph.from_json(self.callgraph_path)
         return self._cached_callgraph
 
+    @property
+    def symbol_index(self) -> SymbolIndex:
+        if self._cached_symbol_index is None:
+            self._cached_symbol_index = get_symbol_index(
+                self.symbol_index_path, self.repo_path
+            )
+        return self._cached_symbol_index
+
     def __hash__(self) -> int:
         return hash(self.repo_id)
 
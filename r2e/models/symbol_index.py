@@ -0,0 +1,224 @@
+import os
+import ast
+import json
+from typing import Optional
+from pydantic import BaseModel
+
+from r2e.models.callgraph import CodeElemType
+from r2e.models.identifier_trie import IdentifierTrie
+
+
+class FileSymbols(BaseModel):
+    """Top-level functions, classes and methods defined in a single file.
+
+    `symbols` maps `name -> CodeElemType.name` for top-level functions and
+    classes and `ClassName.method_name -> "METHOD"` for methods.
+    """
+
+    mtime: float
+    symbols: dict[str, str] = {}
+
+
+class SymbolIndex(BaseModel):
+    """Per-repo index from module ids to the symbols defined in them.
+
+    Built once per repo (and refreshed only for files whose mtime changed)
+    so that identifier resolution does not need to probe the filesystem
+    or re-parse modules for every identifier.
+    """
+
+    modules: dict[str, FileSymbols] = {}
+
+    _path_parts: Optional[set[str]] = None
+    _trie: Optional[IdentifierTrie] = None
+
+    def is_empty(self) -> bool:
+        return len(self.modules) == 0
+
+    def has_module(self, module_id: str) -> bool:
+        return module_id in self.modules
+
+    def resolve_module_id(self, identifier: str) -> Optional[str]:
+        """Module id of a function/class (`mod.name`) or method (`mod.Class.name`)."""
+        return self.trie.resolve_module_id(identifier)
+
+    def get_type(self, identifier: str) -> CodeElemType:
+        """Type of a code element (see `get_type_from_identifier`)."""
+        module_id = self.trie.resolve_module_id(identifier)
+        if module_id is not None:
+            elem_type = self.trie.get_type(identifier)
+            if identifier.count(".") == module_id.count(".") + 1:
+                allowed_types = (CodeElemType.FUNCTION, CodeElemType.CLASS)
+            else:
+                allowed_types = (CodeElemType.METHOD,)
+            if elem_type in allowed_types:
+                return elem_type  # type: ignore
+            return CodeElemType.OTHER
+
+        if identifier.split(".", 1)[0] not in self.path_parts:
+            return CodeElemType.API
+
+        return CodeElemType.OTHER
+
+    def method_ids(self, class_id: str) -> Optional[list[str]]:
+        """Ids of the methods of a class; None if the class module is unknown."""
+        module_id = class_id.rpartition(".")[0]
+        if not self.trie.is_module(module_id):
+            return None
+        return self.trie.children(class_id, CodeElemType.METHOD)
+
+    @property
+    def path_parts(self) -> set[str]:
+        """Directory names and module names of all the files in the repo."""
+        if self._path_parts is None:
+            self._path_parts = set()
+            for module_id in self.modules:
+                self._path_parts.update(module_id.split("."))
+        return self._path_parts
+
+    @property
+    def trie(self) -> IdentifierTrie:
+        """Trie of the module ids and the symbols defined in them."""
+        if self._trie is None:
+            self._trie = IdentifierTrie()
+            for module_id, file_symbols in self.modules.items():
+                self._trie.add_module(module_id)
+                for name, elem_type in file_symbols.symbols.items():
+                    self._trie.add(f"{module_id}.{name}", CodeElemType[elem_type])
+        return self._trie
+
+    # helpers
+
+    def refresh(self, repo_path: str) -> bool:
+        """Re-index the files of the repo that changed since the last refresh.
+
+        Returns:
+            bool: whether the index changed
+        """
+        seen: set[str] = set()
+        changed = False
+
+        for root, dirs, files in os.walk(repo_path):
+            # hidden directories never map to valid module ids
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for file in files:
+                if not file.endswith(".py"):
+                    continue
+                file_path = os.path.join(root, file)
+                rel_path = os.path.relpath(file_path, repo_path)
+                module_id = rel_path[:-3].replace(os.sep, ".")
+                seen.add(module_id)
+
+                try:
+                    mtime = os.stat(file_path).st_mtime
+                except OSError:
+                    continue
+
+                entry = self.modules.get(module_id)
+                if entry is not None and entry.mtime == mtime:
+                    continue
+
+                self.modules[module_id] = FileSymbols(
+                    mtime=mtime, symbols=SymbolIndex.index_file(file_path)
+                )
+                changed = True
+
+        for module_id in set(self.modules) - seen:
+            del self.modules[module_id]
+            changed = True
+
+        if changed:
+            self._path_parts = None
+            self._trie = None
+        return changed
+
+    @staticmethod
+    def index_file(file_path: str) -> dict[str, str]:
+        """Collect the top-level functions, classes and methods of a file."""
+        try:
+            with open(file_path, "r") as f:
+                file_ast = ast.parse(f.read())
+        except (SyntaxError, ValueError, UnicodeDecodeError):
+            return {}
+
+        symbols: dict[str, str] = {}
+        for node in file_ast.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                symbols.setdefault(node.name, CodeElemType.FUNCTION.name)
+            elif isinstance(node, ast.ClassDef):
+                symbols.setdefault(node.name, CodeElemType.CLASS.name)
+                for n in node.body:
+                    if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                        symbols[f"{node.name}.{n.name}"] = CodeElemType.METHOD.name
+        return symbols
+
+    @classmethod
+    def build(cls, repo_path: str) -> "SymbolIndex":
+        index = cls()
+        index.refresh(repo_path)
+        return index
+
+    @classmethod
+    def from_json(cls, file_path: str) -> "SymbolIndex":
+        with open(file_path, "r") as f:
+            data = json.load(f)
+
+        if not isinstance(data, dict) or "modules" not in data:
+            raise ValueError(f"Not a symbol index: {file_path}")
+
+        return cls(**data)
+
+    def to_json(self, file_path: str) -> None:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(self.model_dump_json())
+        os.replace(temp_path, file_path)
+
+    @classmethod
+    def load_or_build(cls, file_path: str, repo_path: str) -> "SymbolIndex":
+        """Load the on-disk index and refresh it against the repo.
+
+        The (refreshed) index is written back only if some file changed.
+        """
+        index = None
+        if os.path.exists(file_path):
+            try:
+                index = cls.from_json(file_path)
+            except (ValueError, TypeError):
+                index = None
+
+        if index is None:
+            index = cls()
+
+        changed = index.refresh(repo_path)
+        if changed and not index.is_empty():
+            index.to_json(file_path)
+
+        return index
+
+
+# one index per repo and process; `Repo` objects are re-created
+# for every deserialized code element so we share them here
+_loaded_indexes: dict[str, SymbolIndex] = {}
+
+
+def get_symbol_index(file_path: str, repo_path: str) -> SymbolIndex:
+    """Get the (process-wide) symbol index of a repo."""
+    if repo_path not in _loaded_indexes:
+        _loaded_indexes[repo_path] = SymbolIndex.load_or_build(file_path, repo_path)
+    return _loaded_indexes[repo_path]
+
+
+def refresh_symbol_index(file_path: str, repo_path: str) -> SymbolIndex:
+    """Refresh the (process-wide) symbol index of a repo against its files.
+
+    The index is written back if some file changed since it was loaded.
+    """
+    if repo_path not in _loaded_indexes:
+        return get_symbol_index(file_path, repo_path)
+
+    index = _loaded_indexes[repo_path]
+    if index.refresh(repo_path) and not index.is_empty():
+        index.to_json(file_path)
+    return index
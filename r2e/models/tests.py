@@ -1,5 +1,7 @@
-from typing import Any, Optional
-from pydantic import BaseModel
+import hashlib
+from functools import cached_property
+from typing import Any, Iterator, Optional
+from pydantic import BaseModel, model_validator
 
 
 class Tests(BaseModel):
@@ -18,40 +20,143 @@ class Tests(BaseModel):
         self.exec_stats = stats
 
 
+class TestsDelta(BaseModel):
+    """The changes of a version of the tests w.r.t. the previous version.
+
+    `updated` maps the added or modified test ids to the content hashes of
+    the tests (see `TestHistory.blobs`); `removed` lists the removed test ids.
+    """
+
+    updated: dict[str, str] = {}
+    removed: list[str] = []
+    operation: str = "generate"
+    gen_model: Optional[str] = None
+    gen_date: Optional[str] = None
+    exec_stats: Optional[dict[str, Any]] = None
+
+
+def hash_test(test: str) -> str:
+    return hashlib.sha1(test.encode("utf-8", "surrogatepass")).hexdigest()[:16]
+
+
 class TestHistory(BaseModel):
-    history: list[Tests] = []
+    """Versions of the tests of a function stored as deltas.
+
+    Each version only records the tests it adds, modifies or removes; the
+    test contents are stored once in `blobs` (keyed by content hash) and
+    shared by all the versions. The tests of a version are materialized on
+    demand (and cached for the latest version).
+
+    NOTE: histories serialized with full copies of the tests of every
+    version (`{"history": [...]}`) are converted on load.
+    """
+
+    deltas: list[TestsDelta] = []
+    blobs: dict[str, str] = {}
+
+    @model_validator(mode="before")
+    @classmethod
+    def from_full_history(cls, data: Any) -> Any:
+        if isinstance(data, dict) and "history" in data:
+            history = cls()
+            for tests in data["history"]:
+                history.add(
+                    tests if isinstance(tests, Tests) else Tests.model_validate(tests)
+                )
+            return {"deltas": history.deltas, "blobs": history.blobs}
+        return data
+
+    def __len__(self) -> int:
+        return len(self.deltas)
 
     def add(self, tests: Tests):
-        """Add tests to the history"""
-        self.history.append(tests)
+        """Add tests to the history (only the changes to the latest tests are stored)"""
+        latest = self._latest_tests if self.deltas else {}
+        updated = {}
+        for test_id, test in tests.tests.items():
+            if latest.get(test_id) != test:
+                updated[test_id] = hash_test(test)
+                self.blobs.setdefault(updated[test_id], test)
+
+        self.deltas.append(
+            TestsDelta(
+                updated=updated,
+                removed=[test_id for test_id in latest if test_id not in tests.tests],
+                operation=tests.operation,
+                gen_model=tests.gen_model,
+                gen_date=tests.gen_date,
+                exec_stats=tests.exec_stats,
+            )
+        )
+        self.__dict__["_latest_tests"] = dict(tests.tests)
 
     def update_exec_stats(self, stats: dict[str, Any]):
         """Update the stats of the latest tests"""
-        self.history[-1].update_stats(stats)
+        self.deltas[-1].exec_stats = stats
+
+    def versions(self) -> Iterator[Tests]:
+        """Materialize the tests of every version"""
+        tests: dict[str, str] = {}
+        for delta in self.deltas:
+            tests = self.apply(tests, delta)
+            yield Tests(
+                tests=tests,
+                operation=delta.operation,
+                gen_model=delta.gen_model,
+                gen_date=delta.gen_date,
+                exec_stats=delta.exec_stats,
+            )
+
+    @property
+    def history(self) -> list[Tests]:
+        """Tests of every version (materialized; prefer `versions` or `latest_*`)"""
+        return list(self.versions())
+
+    def apply(self, tests: dict[str, str], delta: TestsDelta) -> dict[str, str]:
+        tests = {k: v for k, v in tests.items() if k not in delta.removed}
+        for test_id, blob_hash in delta.updated.items():
+            tests[test_id] = self.blobs[blob_hash]
+        return tests
+
+    def compact(self, keep_exec_stats: bool = True):
+        """Drop the blobs no version refers to and, unless `keep_exec_stats`,
+        the execution stats of all but the latest version"""
+        used = {h for delta in self.deltas for h in delta.updated.values()}
+        self.blobs = {h: test for h, test in self.blobs.items() if h in used}
+        if not keep_exec_stats:
+            for delta in self.deltas[:-1]:
+                delta.exec_stats = None
+
+    @cached_property
+    def _latest_tests(self) -> dict[str, str]:
+        tests: dict[str, str] = {}
+        for delta in self.deltas:
+            tests = self.apply(tests, delta)
+        return tests
 
     @property
     def latest_operation(self) -> str:
-        return self.history[-1].operation
+        return self.deltas[-1].operation
 
     @property
     def latest_tests(self) -> dict[str, str]:
-        return self.history[-1].tests
+        return dict(self._latest_tests)
 
     @property
     def latest_exec_stats(self) -> Optional[dict[str, Any]]:
-        return self.history[-1].exec_stats
+        return self.deltas[-1].exec_stats
 
     @property
     def is_passing(self) -> bool:
         """Returns True if the latest tests are passing"""
-        if len(self.history) == 0:
+        if len(self.deltas) == 0:
             return False
-        last_tests = self.history[-1]
-        if last_tests.exec_stats is None:
+        last_exec_stats = self.deltas[-1].exec_stats
+        if last_exec_stats is None:
             return False
-        if "run_tests_logs" not in last_tests.exec_stats:
+        if "run_tests_logs" not in last_exec_stats:
             return False
-        last_tests_logs = last_tests.exec_stats["run_tests_logs"]
+        last_tests_logs = last_exec_stats["run_tests_logs"]
         last_tests_valid = all(logs["valid"] for logs in last_tests_logs.values())
 
         return last_tests_valid
@@ -108,6 +108,8 @@ def run_tasks_in_parallel_iter(
     max_tasks_per_worker: None | int = None,
     use_spawn: bool = True,
     max_mem: int = 1024 * 1024 * 1024 * 4,
+    initializer: Optional[Callable] = None,
+    initargs: tuple = (),
 ) -> Iterator[TaskResult]:
     """
     Args:
@@ -121,6 +123,9 @@ def run_tasks_in_parallel_iter(
         to a single process / worker. None means infinite.
             Use 1 to force a restart.
         use_spawn: The 'spawn' multiprocess context is used. 'fork' otherwise.
+        initializer: Function run once in every worker on start-up,
+            e.g. to warm-start worker caches. Default None.
+        initargs: Arguments of the initializer.
     Returns:
         A list of TaskResult objects, one per task.
     """
@@ -132,6 +137,8 @@ def run_tasks_in_parallel_iter(
         max_workers=num_workers,
         max_tasks=0 if max_tasks_per_worker is None else max_tasks_per_worker,
         context=mp.get_context(mode),
+        initializer=initializer,
+        initargs=initargs,
         # initargs=None,#(max_mem,) if platform.system() != "Darwin" else None,  # type: ignore
     ) as pool:
         future = pool.map(func, tasks, timeout=timeout_per_task)
@@ -203,6 +210,8 @@ def run_tasks_in_parallel(
     progress_bar_desc: None | str = None,
     max_tasks_per_worker: None | int = None,
     use_spawn: bool = True,
+    initializer: Optional[Callable] = None,
+    initargs: tuple = (),
 ) -> list[TaskResult]:
     """
     Args:
@@ -216,6 +225,8 @@ def run_tasks_in_parallel(
         process / worker. None means infinite.
             Use 1 to force a restart.
         use_spawn: The 'spawn' multiprocess context is used. 'fork' otherwise.
+        initializer: Function run once in every worker on start-up. Default None.
+        initargs: Arguments of the initializer.
     Returns:
         A list of TaskResult objects, one per task.
     """
@@ -230,6 +241,8 @@ def run_tasks_in_parallel(
             progress_bar_desc=progress_bar_desc,
             max_tasks_per_worker=max_tasks_per_worker,
             use_spawn=use_spawn,
+            initializer=initializer,
+            initargs=initargs,
         )
     )
 
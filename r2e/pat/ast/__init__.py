@@ -5,3 +5,4 @@ from r2e.pat.ast.explorer import (
     find_function_in_ast,
 )
 from r2e.pat.ast.unparser import unparse_ast_stmt_with_comments
+from r2e.pat.ast.cache import AstCache, get_ast_cache, warm_start_ast_cache
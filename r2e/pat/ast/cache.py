@@ -0,0 +1,160 @@
+"""Process-wide cache of parsed file ASTs."""
+
+import os
+import ast
+import pickle
+import hashlib
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Callable, Optional, TypeVar
+
+from r2e.pat.ast.explorer import build_ast
+
+T = TypeVar("T")
+
+
+class AstCacheEntry:
+    """A parsed file AST and the objects derived from it (e.g., `AstStatements`)"""
+
+    def __init__(self, tree: ast.Module):
+        self.tree = tree
+        self.derived: dict[str, Any] = {}
+
+
+class AstCache:
+    """Size-bounded LRU cache of parsed file ASTs keyed by path and content hash.
+
+    NOTE: cached ASTs (with parent info) are shared by all consumers
+    and must not be mutated; copy the nodes you need to change.
+
+    Args:
+        max_entries (int): maximum number of files kept in the cache
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], AstCacheEntry] = OrderedDict()
+        self._latest_keys: dict[str, tuple[str, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        return hashlib.sha1(content.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def get_ast(self, file_path: str, content: Optional[str] = None) -> ast.Module:
+        """Get the (shared) AST of a file.
+
+        Args:
+            file_path (str): path of the file
+            content (str, optional): content of the file if already read
+
+        Returns:
+            ast.Module: the AST with parent information
+        """
+        return self._get_entry(file_path, content).tree
+
+    def get_derived(
+        self,
+        file_path: str,
+        name: str,
+        builder: Callable[[ast.Module], T],
+        content: Optional[str] = None,
+    ) -> T:
+        """Get an object derived from the AST of a file, building it on a miss.
+
+        Args:
+            file_path (str): path of the file
+            name (str): name of the derived object (e.g., "ast_statements")
+            builder (Callable): builds the object from the file's AST
+            content (str, optional): content of the file if already read
+        """
+        entry = self._get_entry(file_path, content)
+        if name not in entry.derived:
+            entry.derived[name] = builder(entry.tree)
+        return entry.derived[name]
+
+    def clear(self):
+        self._entries.clear()
+        self._latest_keys.clear()
+
+    # persistence
+
+    def dump(self, file_path: str | Path):
+        """Write the cached ASTs (not the derived objects) to disk."""
+        trees = {key: entry.tree for key, entry in self._entries.items()}
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(trees, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, file_path)
+
+    def load(self, file_path: str | Path) -> int:
+        """Add ASTs written by `dump` to the cache.
+
+        Returns:
+            int: number of ASTs loaded
+        """
+        with open(file_path, "rb") as f:
+            trees: dict[tuple[str, str], ast.Module] = pickle.load(f)
+
+        for key, tree in list(trees.items())[-self.max_entries :]:
+            self._add_entry(key, AstCacheEntry(tree))
+        return min(len(trees), self.max_entries)
+
+    # helpers
+
+    def _get_entry(self, file_path: str, content: Optional[str]) -> AstCacheEntry:
+        if content is None:
+            with open(file_path, "r") as f:
+                content = f.read()
+
+        key = (file_path, self.content_hash(content))
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = AstCacheEntry(build_ast(content))
+        self._add_entry(key, entry)
+        return entry
+
+    def _add_entry(self, key: tuple[str, str], entry: AstCacheEntry):
+        # a file only keeps the entry for its latest content
+        stale_key = self._latest_keys.get(key[0])
+        if stale_key is not None and stale_key != key:
+            self._entries.pop(stale_key, None)
+
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._latest_keys[key[0]] = key
+
+        while len(self._entries) > self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            if self._latest_keys.get(evicted_key[0]) == evicted_key:
+                del self._latest_keys[evicted_key[0]]
+
+
+_ast_cache = AstCache()
+
+
+def get_ast_cache() -> AstCache:
+    """Get the process-wide AST cache."""
+    return _ast_cache
+
+
+def warm_start_ast_cache(file_path: str | Path):
+    """Load a dumped AST cache into the process-wide cache (if it exists).
+
+    NOTE: meant to be used as a pool `initializer`.
+    """
+    if os.path.exists(file_path):
+        try:
+            _ast_cache.load(file_path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
@@ -1,4 +1,5 @@
 import typing_extensions
+from typing import Optional
 
 from r2e.models.identifier import Identifier
 from r2e.models.repo import Repo
@@ -8,7 +9,7 @@ from r2e.models.repo import Repo
 # from r2e.models.classes import Class
 from r2e.models.callgraph import CodeElemType
 from r2e.models.file import File
-from r2e.models.callgraph import CallGraph
+from r2e.models.callgraph import CallGraph, CompactCallGraph
 
 from r2e.logger import logger
 
@@ -18,7 +19,7 @@ from r2e.logger import logger
 class CallGraphExplorer:
     def __init__(self, repo: Repo):
         self.repo = repo
-        self.callgraph: CallGraph = repo.callgraph
+        self.callgraph: CallGraph | CompactCallGraph = repo.callgraph
 
     def merge_callgraphs(self, callers: list[Identifier]) -> list[Identifier]:
         merged_callgraph = set()
@@ -29,43 +30,73 @@ class CallGraphExplorer:
         return list(merged_callgraph)
 
     def get_callees_from_identifier(self, caller_id: str) -> list:
-        from r2e.models import Function, Method, Class
+        from r2e.utils.models import get_method_ids
 
         caller_identifier = Identifier(identifier=caller_id)
         caller_type = self.callgraph.get_type(caller_identifier)
         callees_ids = self.callgraph.get(caller_identifier, [])
 
         if caller_type == CodeElemType.CLASS:
-            class_ = Class.from_id_and_repo(caller_identifier, self.repo)
-            class_methods_ids = class_.method_ids
+            class_methods_ids = get_method_ids(caller_identifier, self.repo)
             callees_ids = self.merge_callgraphs([caller_identifier] + class_methods_ids)
 
-        callees: list = []
-        for cid in callees_ids:
+        return self.to_models(callees_ids)
+
+    def to_models(self, ids: list[Identifier] | list[str]) -> list:
+        """Functions, methods and classes of the ids (skipping unresolved ids)"""
+        from r2e.models import Function, Method, Class
+
+        models: list = []
+        for cid in ids:
+            if not isinstance(cid, Identifier):
+                cid = Identifier(identifier=cid)
             callee_type = self.callgraph.get_type(cid)
             try:
                 if callee_type == CodeElemType.METHOD:
-                    callee = Method.from_id_and_repo(cid, self.repo)
+                    model = Method.from_id_and_repo(cid, self.repo)
 
                 elif callee_type == CodeElemType.CLASS:
-                    callee = Class.from_id_and_repo(cid, self.repo)
+                    model = Class.from_id_and_repo(cid, self.repo)
 
                 else:
-                    callee = Function.from_id_and_repo(cid, self.repo)
+                    model = Function.from_id_and_repo(cid, self.repo)
 
-                callees.append(callee)
+                models.append(model)
             except ValueError as e:
                 # logger.warning(e)
                 ## TODO : handle this and add counts...
                 pass
 
-        return callees
+        return models
 
     def get_callee_count(self, caller_id: str) -> int:
-        caller_identifier = Identifier(identifier=caller_id)
-        caller_type = self.callgraph.get_type(caller_identifier)
-        callees_ids = self.callgraph.get(caller_identifier, [])
-        return len(callees_ids)
+        return self.callgraph.callee_count(caller_id)
+
+    # reachability queries (ids unless `as_models`)
+
+    def callers(self, callee_id: str, as_models: bool = False) -> list:
+        """Direct callers of `callee_id`"""
+        callers = self.callgraph.reachability.callers(callee_id)
+        return self.to_models(callers) if as_models else callers
+
+    def reachable_from(
+        self, caller_id: str, max_depth: Optional[int] = None, as_models: bool = False
+    ) -> list:
+        """Transitive callees of `caller_id` (within `max_depth` calls)"""
+        callees = self.callgraph.reachability.reachable_from(caller_id, max_depth)
+        return self.to_models(callees) if as_models else callees
+
+    def reaching(
+        self, callee_id: str, max_depth: Optional[int] = None, as_models: bool = False
+    ) -> list:
+        """Transitive callers of `callee_id` (within `max_depth` calls), e.g.,
+        the functions whose behavior a change of `callee_id` can affect"""
+        callers = self.callgraph.reachability.reaching(callee_id, max_depth)
+        return self.to_models(callers) if as_models else callers
+
+    def reaches(self, caller_id: str, callee_id: str) -> bool:
+        """Whether `caller_id` (transitively) calls `callee_id`"""
+        return self.callgraph.reachability.reaches(caller_id, callee_id)
 
     def get_callees(self, file: File, function_name: str) -> list:
         module_id = file.file_module.module_id
@@ -9,8 +9,11 @@ In 43rd International Conference on Software Engineering, ICSE '21, 25–28 May
 """
 
 import os
+import ast
 import sys
 import shutil
+import hashlib
+from typing import Optional
 
 try:
     import PyCG as pycg
@@ -28,14 +31,34 @@ from r2e.pat.imports.transformer import ImportTransformer
 
 class CallGraphGenerator:
     @staticmethod
-    def construct_call_graph(repo_path: str, max_iter: int = -1) -> dict:
+    def construct_call_graph(
+        repo_path: str, max_iter: int = -1, entry_points: Optional[list[str]] = None
+    ) -> dict:
+        """Construct the call graph of a repo with PyCG.
+
+        Args:
+            repo_path (str): path of the repo
+            max_iter (int): max number of PyCG iterations (-1 means until fixpoint)
+            entry_points (list[str], optional): paths (relative to `repo_path`)
+                of the files to analyze; all the python files if None.
+                NOTE: PyCG also reports the callers of the modules they import.
+
+        Returns:
+            dict: the call graph `caller -> [callee]`
+        """
         repo_path = ImportTransformer.transform_repo(repo_path)
 
-        entry_points = []
-        for root, dirs, files in os.walk(repo_path):
-            for file in files:
-                if file.endswith(".py"):
-                    entry_points.append(os.path.abspath(os.path.join(root, file)))
+        if entry_points is None:
+            entry_points = []
+            for root, dirs, files in os.walk(repo_path):
+                for file in files:
+                    if file.endswith(".py"):
+                        entry_points.append(os.path.abspath(os.path.join(root, file)))
+        else:
+            entry_points = [
+                os.path.abspath(os.path.join(repo_path, file_path))
+                for file_path in entry_points
+            ]
 
         cg_generator = CallGraphGeneratorPyCG(
             entry_points, repo_path, max_iter, operation="call-graph"
@@ -45,3 +68,138 @@ class CallGraphGenerator:
 
         shutil.rmtree(repo_path)
         return cgraph
+
+    # incremental updates
+
+    @staticmethod
+    def get_file_infos(repo_path: str) -> dict[str, dict]:
+        """Content hash and imported modules of every python file in the repo.
+
+        Returns:
+            dict: `relative file path -> {"hash": str, "imports": [module ids]}`
+        """
+        file_infos: dict[str, dict] = {}
+        for root, dirs, files in os.walk(repo_path):
+            for file in files:
+                if not file.endswith(".py"):
+                    continue
+                file_path = os.path.join(root, file)
+                rel_path = os.path.relpath(file_path, repo_path)
+                with open(file_path, "rb") as f:
+                    content = f.read()
+
+                file_infos[rel_path] = {
+                    "hash": hashlib.sha1(content).hexdigest(),
+                    "imports": CallGraphGenerator.get_imported_modules(
+                        rel_path, content
+                    ),
+                }
+        return file_infos
+
+    @staticmethod
+    def get_imported_modules(rel_path: str, content: bytes) -> list[str]:
+        """Absolute ids of the modules (and members) imported by a file."""
+        try:
+            tree = ast.parse(content)
+        except (SyntaxError, ValueError):
+            return []
+
+        module_id = CallGraphGenerator.module_id_from_path(rel_path)
+        package_parts = module_id.split(".") if module_id else []
+        if not rel_path.endswith("__init__.py"):
+            package_parts = package_parts[:-1]
+
+        imported: set[str] = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imported.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.level > 0:
+                    base_parts = package_parts[: len(package_parts) - node.level + 1]
+                    base = ".".join(base_parts + (node.module or "").split("."))
+                    base = base.strip(".")
+                else:
+                    base = node.module or ""
+                imported.add(base)
+                imported.update(
+                    f"{base}.{alias.name}".strip(".") for alias in node.names
+                )
+        return sorted(imported)
+
+    @staticmethod
+    def get_changed_files(
+        old_infos: dict[str, dict], new_infos: dict[str, dict]
+    ) -> tuple[set[str], set[str]]:
+        """Files to re-analyze after a repo changed.
+
+        Returns:
+            tuple: (the changed/added files and the files importing a changed,
+                added or removed module, the removed files)
+        """
+        changed = {
+            file_path
+            for file_path, info in new_infos.items()
+            if old_infos.get(file_path, {}).get("hash") != info["hash"]
+        }
+        removed = set(old_infos) - set(new_infos)
+        if not changed and not removed:
+            return set(), set()
+
+        changed_modules = {
+            CallGraphGenerator.module_id_from_path(file_path)
+            for file_path in changed | removed
+        }
+        importers = {
+            file_path
+            for file_path, info in new_infos.items()
+            if changed_modules.intersection(info["imports"])
+        }
+        return changed | importers, removed
+
+    @staticmethod
+    def splice_call_graph(
+        old_cgraph: dict[str, list[str]],
+        new_cgraph: dict[str, list[str]],
+        stale_modules: set[str],
+        module_ids: set[str],
+    ) -> dict[str, list[str]]:
+        """Replace the callers of the stale modules with the re-analyzed ones.
+
+        Args:
+            old_cgraph (dict): the previous call graph
+            new_cgraph (dict): the call graph of the re-analyzed files
+            stale_modules (set[str]): ids of the modules that were re-analyzed or removed
+            module_ids (set[str]): ids of all (old and new) modules of the repo
+        """
+        get_module = CallGraphGenerator.get_caller_module
+        cgraph = {
+            caller: callees
+            for caller, callees in old_cgraph.items()
+            if get_module(caller, module_ids) not in stale_modules
+        }
+        cgraph.update(
+            (caller, callees)
+            for caller, callees in new_cgraph.items()
+            if get_module(caller, module_ids) in stale_modules
+        )
+        return cgraph
+
+    @staticmethod
+    def module_id_from_path(rel_path: str) -> str:
+        """Module id (as named by PyCG) of a file path relative to the repo."""
+        module_id = os.path.splitext(rel_path)[0].replace(os.sep, ".")
+        if module_id == "__init__":
+            return ""
+        if module_id.endswith(".__init__"):
+            module_id = module_id[: -len(".__init__")]
+        return module_id
+
+    @staticmethod
+    def get_caller_module(caller: str, module_ids: set[str]) -> Optional[str]:
+        """Id of the module defining a caller (longest module id prefix)."""
+        parts = caller.split(".")
+        for i in range(len(parts), 0, -1):
+            prefix = ".".join(parts[:i])
+            if prefix in module_ids:
+                return prefix
+        return None
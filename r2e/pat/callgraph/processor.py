@@ -44,6 +44,8 @@ class CallGraphProcessor:
             unresolved_callees = CallGraphProcessor.get_unresolvable_ids(callees, repo)
             stats["retained"].update(set(callees) - set(unresolved_callees))
 
+            # identifiers are immutable: normalized ids replace the callees
+            normalized_ids: dict[Identifier, Identifier] = {}
             for callee in unresolved_callees:
                 callee_parts = callee.identifier.split(".")
                 module_parts, function_name = callee_parts[:-1], callee_parts[-1]
@@ -60,17 +62,23 @@ class CallGraphProcessor:
                     module_notation = relative_module_path.replace(os.sep, ".")[:-3]
 
                     # verify that the callee is now resolvable (if not flagged as in_init_file)
+                    normalized_id = Identifier(
+                        identifier=f"{module_notation}.{function_name}"
+                    )
+                    normalized_ids[callee] = normalized_id
                     try:
-                        callee.identifier = f"{module_notation}.{function_name}"
-                        get_module_from_identifier(callee, repo)
-                        stats["normalized"].add(callee)
+                        get_module_from_identifier(normalized_id, repo)
+                        stats["normalized"].add(normalized_id)
                     except ValueError as e:
-                        stats["unnormalized"].add(callee)
+                        stats["unnormalized"].add(normalized_id)
                         pass
 
                 else:
                     stats["unresolved_import"].add(callee)
 
+            if normalized_ids:
+                callees[:] = [normalized_ids.get(callee, callee) for callee in callees]
+
         return stats
 
     @staticmethod
@@ -5,7 +5,7 @@ from collections import defaultdict
 
 from r2e.models import File
 from r2e.pat.imports import ImportTransformer
-from r2e.pat.ast import build_ast, unparse_ast_stmt_with_comments
+from r2e.pat.ast import AstCache, get_ast_cache, unparse_ast_stmt_with_comments
 
 
 class AstStatement:
@@ -53,10 +53,21 @@ class AstStatement:
 class AstStatements:
     def __init__(self, file: File) -> None:
         self.file = file
+        self.file_hash = AstCache.content_hash(file.file_content)
         self.statements_list = self.build_statements_list()
         self.var_to_stmt_idxs: dict[str, list[int]] = self.build_var_to_stmt_idxs()
         self.wildcard_idxs: list[int] = self.find_wildcard_imports()
 
+    @classmethod
+    def from_file(cls, file: File) -> "AstStatements":
+        """Get the statements of a file, shared through the AST cache."""
+        return get_ast_cache().get_derived(
+            file.file_path,
+            "ast_statements",
+            lambda _: cls(file),
+            content=file.file_content,
+        )
+
     def create_fake_import_aststmt(
         self, import_stmt: ast.Import | ast.ImportFrom
     ) -> AstStatement:
@@ -156,7 +167,7 @@ class AstStatements:
             return [stmt]
 
     def build_statements_list(self) -> list[AstStatement]:
-        file_ast = build_ast(self.file.file_content)
+        file_ast = self.file.file_ast
         statement_list: list[AstStatement] = []
 
         for stmt_idx, stmt in enumerate(file_ast.body):
@@ -4,18 +4,11 @@ import builtins
 from r2e.pat.dependency_slicer.globals_finder.type_annotation_globals import (
     astnode_to_type_annotation_globals,
 )
-from r2e.pat.dependency_slicer.globals_finder.bytecode_globals import (
-    get_funclass_globals,
+from r2e.pat.dependency_slicer.globals_finder.scope_globals import (
+    get_stmt_scope_globals,
 )
 
-
-def create_fake_function(node: ast.stmt) -> ast.AsyncFunctionDef:
-    node_unparse = ast.unparse(node)
-    wrapped_func_code = "async def fake_func():\n"
-    for line in node_unparse.split("\n"):
-        wrapped_func_code += "    " + line + "\n"
-    wrapped_func_node = ast.parse(wrapped_func_code).body[0]
-    return wrapped_func_node  # type: ignore
+BUILTIN_NAMES = frozenset(dir(builtins))
 
 
 def find_dependency_globals(astnode: ast.stmt, unique: bool = True) -> list[str]:
@@ -26,16 +19,15 @@ def find_dependency_globals(astnode: ast.stmt, unique: bool = True) -> list[str]
     :return: list[str] - list of global symbols
     """
 
-    fake_function_node = create_fake_function(astnode)
-
     all_type_annotation_globals = astnode_to_type_annotation_globals(astnode)
 
-    all_globals = get_funclass_globals(fake_function_node)
+    # the node is analyzed as the body of a (fake) function
+    all_globals = get_stmt_scope_globals(astnode)
 
     all_globals.extend(all_type_annotation_globals)
 
     # filter out builtins
-    all_globals = [g for g in all_globals if g not in dir(builtins)]
+    all_globals = [g for g in all_globals if g not in BUILTIN_NAMES]
 
     # filter __name__, __file__, __str__ etc
     all_globals = [
@@ -0,0 +1,529 @@
+import ast
+from typing import Optional
+
+
+class ScopeError(Exception):
+    """Raised for code that does not compile (the globals are then unknown)."""
+
+
+class Scope:
+    """Symbol table of a single scope (function, lambda, comprehension or class).
+
+    Loads are recorded in bytecode order together with whether the name was
+    already stored in the scope, which is all we need to tell the names read
+    before assignment apart once the scope is fully visited.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        parent: Optional["Scope"],
+        params: Optional[set[str]] = None,
+    ):
+        self.kind = kind  # "module" | "function" | "comprehension" | "class"
+        self.parent = parent
+        self.params = params or set()
+        self.bound: set[str] = set(self.params)
+        self.globals: set[str] = set()
+        self.nonlocals: set[str] = set()
+        self.cells: set[str] = set()
+        self.seen: set[str] = set()
+        self.stored: set[str] = set()
+        self.loads: list[tuple[str, bool]] = []
+        self.children: list["Scope"] = []
+        # private names in (and under) class bodies are mangled (`_Class__name`)
+        self.mangles = kind == "class" or (parent is not None and parent.mangles)
+        if parent is not None:
+            parent.children.append(self)
+
+    @property
+    def is_function(self) -> bool:
+        return self.kind in ("function", "comprehension")
+
+    def find_binding(self, name: str) -> Optional["Scope"]:
+        """Nearest enclosing function scope binding `name` (class scopes are skipped)."""
+        scope = self.parent
+        while scope is not None:
+            if scope.is_function and name in scope.bound and name not in scope.globals:
+                return scope
+            scope = scope.parent
+        return None
+
+
+class ScopeGlobalsVisitor(ast.NodeVisitor):
+    """Single-pass scope analyzer finding the global names read by code.
+
+    Mirrors how CPython compiles the code: a name is reported if it is
+    loaded as a global (`LOAD_GLOBAL`), by name in a class body (`LOAD_NAME`)
+    or as a function local before any store to it (`LOAD_FAST`). Names bound
+    in an enclosing function (closures) are not reported and neither are the
+    parameters of the enclosing functions. Code the compiler drops as
+    unreachable is skipped.
+    """
+
+    def __init__(self, root: Scope):
+        self.scope = root
+        self.reachable = True
+
+    # names
+
+    def load(self, name: str):
+        self.scope.seen.add(name)
+        # `__debug__` is a compile-time constant
+        if name == "__debug__":
+            return
+        if self.reachable and self.scope.kind != "module":
+            self.scope.loads.append((name, name in self.scope.stored))
+
+    def store(self, name: str):
+        self.scope.seen.add(name)
+        self.scope.bound.add(name)
+        if self.reachable:
+            self.scope.stored.add(name)
+
+    def visit_Name(self, node: ast.Name):
+        if isinstance(node.ctx, ast.Load):
+            self.load(node.id)
+        elif isinstance(node.ctx, ast.Store):
+            self.store(node.id)
+        else:
+            self.scope.seen.add(node.id)
+            self.scope.bound.add(node.id)
+
+    def visit_Global(self, node: ast.Global):
+        self.declare(node.names, self.scope.globals)
+
+    def visit_Nonlocal(self, node: ast.Nonlocal):
+        if not self.scope.is_function or self.scope.parent is None:
+            raise ScopeError("nonlocal declaration not allowed at module level")
+        self.declare(node.names, self.scope.nonlocals)
+
+    def declare(self, names: list[str], declared: set[str]):
+        for name in names:
+            if name in self.scope.seen or name in self.scope.params:
+                raise ScopeError(f"name '{name}' is used prior to declaration")
+            declared.add(name)
+
+    # statements
+
+    def visit_body(self, stmts: list[ast.stmt]):
+        reachable = self.reachable
+        for stmt in stmts:
+            self.visit(stmt)
+            if self.terminates(stmt):
+                self.reachable = False
+        self.reachable = reachable
+
+    @staticmethod
+    def constant_test(test: ast.expr) -> Optional[bool]:
+        """Truth value of a test the compiler folds (None if not constant)."""
+        if isinstance(test, ast.Constant):
+            return bool(test.value)
+        if isinstance(test, ast.Name) and test.id == "__debug__":
+            return True
+        return None
+
+    @staticmethod
+    def terminates(stmt: ast.stmt) -> bool:
+        """Whether the statements following `stmt` in its block are unreachable."""
+        if isinstance(stmt, (ast.Return, ast.Raise, ast.Break, ast.Continue)):
+            return True
+        if isinstance(stmt, ast.If):
+            constant = ScopeGlobalsVisitor.constant_test(stmt.test)
+            body_terminates = any(map(ScopeGlobalsVisitor.terminates, stmt.body))
+            orelse_terminates = any(map(ScopeGlobalsVisitor.terminates, stmt.orelse))
+            if constant is True:
+                return body_terminates
+            if constant is False:
+                return orelse_terminates
+            return body_terminates and orelse_terminates
+        return False
+
+    def visit_FunctionDef(self, node: ast.FunctionDef | ast.AsyncFunctionDef):
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        self.visit_arguments_defaults(node.args)
+        for arg in self.all_args(node.args):
+            if arg.annotation is not None:
+                self.visit(arg.annotation)
+        if node.returns is not None:
+            self.visit(node.returns)
+
+        self.visit_scope(node.body, "function", self.arg_names(node.args))
+        self.store(node.name)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        for base in node.bases:
+            self.visit(base)
+        for keyword in node.keywords:
+            self.visit(keyword.value)
+
+        self.visit_scope(node.body, "class")
+        self.store(node.name)
+
+    def visit_scope(self, body: list[ast.stmt], kind: str, params=None):
+        parent = self.scope
+        self.scope = Scope(kind, parent, params)
+        self.visit_body(body)
+        self.scope = parent
+
+    def visit_Assign(self, node: ast.Assign):
+        self.visit(node.value)
+        for target in node.targets:
+            self.visit(target)
+
+    def visit_AugAssign(self, node: ast.AugAssign):
+        if isinstance(node.target, ast.Name):
+            self.load(node.target.id)
+            self.visit(node.value)
+            self.store(node.target.id)
+        else:
+            self.visit_target_loads(node.target)
+            self.visit(node.value)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign):
+        if node.value is not None:
+            self.visit(node.value)
+            self.visit(node.target)
+        elif isinstance(node.target, ast.Name):
+            self.scope.seen.add(node.target.id)
+            self.scope.bound.add(node.target.id)
+        else:
+            self.visit_target_loads(node.target)
+
+        # annotations are only evaluated in class bodies
+        if self.scope.kind == "class":
+            self.visit(node.annotation)
+
+    def visit_target_loads(self, target: ast.expr):
+        """Visit the loads of an attribute/subscript target (e.g., `a[i]` in `a[i] += 1`)"""
+        if isinstance(target, ast.Attribute):
+            self.visit(target.value)
+        elif isinstance(target, ast.Subscript):
+            self.visit(target.value)
+            self.visit(target.slice)
+        else:
+            self.visit(target)
+
+    def visit_For(self, node: ast.For | ast.AsyncFor):
+        self.visit(node.iter)
+        self.visit(node.target)
+        self.visit_body(node.body)
+        self.visit_body(node.orelse)
+
+    visit_AsyncFor = visit_For
+
+    def visit_While(self, node: ast.While):
+        constant = self.constant_test(node.test)
+        reachable = self.reachable
+
+        if constant is not False:
+            self.visit(node.test)
+        else:
+            self.reachable = False
+        self.visit_body(node.body)
+
+        self.reachable = reachable and constant is not True
+        self.visit_body(node.orelse)
+
+        self.reachable = reachable
+        has_break = any(isinstance(n, ast.Break) for n in self.loop_nodes(node.body))
+        if constant is True and not has_break:
+            self.reachable = False
+        # NOTE: `visit_body` of the enclosing block restores reachability
+
+    @staticmethod
+    def loop_nodes(stmts: list[ast.stmt]):
+        """Nodes of a loop body excluding nested loops and scopes"""
+        stack: list[ast.AST] = list(stmts)
+        while stack:
+            node = stack.pop()
+            yield node
+            if isinstance(
+                node,
+                (
+                    ast.For,
+                    ast.AsyncFor,
+                    ast.While,
+                    ast.FunctionDef,
+                    ast.AsyncFunctionDef,
+                    ast.ClassDef,
+                ),
+            ):
+                # a `break` in the `else` of a nested loop breaks our loop
+                if isinstance(node, (ast.For, ast.AsyncFor, ast.While)):
+                    stack.extend(node.orelse)
+                continue
+            stack.extend(
+                child
+                for child in ast.iter_child_nodes(node)
+                if isinstance(child, ast.stmt)
+            )
+            if isinstance(node, (ast.Try, ast.TryStar)):
+                for handler in node.handlers:
+                    stack.extend(handler.body)
+            if isinstance(node, ast.Match):
+                for case in node.cases:
+                    stack.extend(case.body)
+
+    def visit_If(self, node: ast.If):
+        constant = self.constant_test(node.test)
+        reachable = self.reachable
+
+        if constant is None:
+            self.visit(node.test)
+
+        self.reachable = reachable and constant is not False
+        self.visit_body(node.body)
+        self.reachable = reachable and constant is not True
+        self.visit_body(node.orelse)
+        self.reachable = reachable
+
+    def visit_With(self, node: ast.With | ast.AsyncWith):
+        for item in node.items:
+            self.visit(item.context_expr)
+            if item.optional_vars is not None:
+                self.visit(item.optional_vars)
+        self.visit_body(node.body)
+
+    visit_AsyncWith = visit_With
+
+    def visit_Try(self, node: ast.Try | ast.TryStar):
+        # same layout as the bytecode: body, else, handlers, finally
+        self.visit_body(node.body)
+        self.visit_body(node.orelse)
+        for handler in node.handlers:
+            if handler.type is not None:
+                self.visit(handler.type)
+            if handler.name is not None:
+                self.store(handler.name)
+            self.visit_body(handler.body)
+        self.visit_body(node.finalbody)
+
+    visit_TryStar = visit_Try
+
+    def visit_Match(self, node: ast.Match):
+        self.visit(node.subject)
+        for case in node.cases:
+            self.visit(case.pattern)
+            if case.guard is not None:
+                self.visit(case.guard)
+            self.visit_body(case.body)
+
+    def visit_MatchAs(self, node: ast.MatchAs):
+        if node.pattern is not None:
+            self.visit(node.pattern)
+        if node.name is not None:
+            self.store(node.name)
+
+    def visit_MatchStar(self, node: ast.MatchStar):
+        if node.name is not None:
+            self.store(node.name)
+
+    def visit_MatchMapping(self, node: ast.MatchMapping):
+        for key in node.keys:
+            self.visit(key)
+        for pattern in node.patterns:
+            self.visit(pattern)
+        if node.rest is not None:
+            self.store(node.rest)
+
+    def visit_Import(self, node: ast.Import | ast.ImportFrom):
+        for alias in node.names:
+            if alias.name == "*":
+                raise ScopeError("import * only allowed at module level")
+            self.store(alias.asname or alias.name.split(".")[0])
+
+    visit_ImportFrom = visit_Import
+
+    # expressions
+
+    def visit_Dict(self, node: ast.Dict):
+        for key, value in zip(node.keys, node.values):
+            if key is not None:
+                self.visit(key)
+            self.visit(value)
+
+    def visit_IfExp(self, node: ast.IfExp):
+        constant = self.constant_test(node.test)
+        reachable = self.reachable
+
+        if constant is None:
+            self.visit(node.test)
+        self.reachable = reachable and constant is not False
+        self.visit(node.body)
+        self.reachable = reachable and constant is not True
+        self.visit(node.orelse)
+        self.reachable = reachable
+
+    def visit_NamedExpr(self, node: ast.NamedExpr):
+        self.visit(node.value)
+
+        # the target of `:=` in a comprehension is bound in the enclosing scope
+        name = node.target.id
+        if self.scope.kind == "comprehension":
+            scope = self.scope
+            while scope.kind == "comprehension":
+                scope.nonlocals.add(name)
+                scope = scope.parent  # type: ignore
+            if scope.kind == "class":
+                raise ScopeError("assignment expression within a comprehension")
+            scope.seen.add(name)
+            scope.bound.add(name)
+        else:
+            self.store(name)
+
+    def visit_Lambda(self, node: ast.Lambda):
+        self.visit_arguments_defaults(node.args)
+
+        parent = self.scope
+        self.scope = Scope("function", parent, self.arg_names(node.args))
+        self.visit(node.body)
+        self.scope = parent
+
+    def visit_comprehension_scope(
+        self, generators: list[ast.comprehension], elts: list[ast.expr]
+    ):
+        # the first iterable is evaluated in the enclosing scope
+        self.visit(generators[0].iter)
+
+        parent = self.scope
+        self.scope = Scope("comprehension", parent, {".0"})
+        for idx, generator in enumerate(generators):
+            if idx > 0:
+                self.visit(generator.iter)
+            self.visit(generator.target)
+            for if_expr in generator.ifs:
+                self.visit(if_expr)
+        for elt in elts:
+            self.visit(elt)
+        self.scope = parent
+
+    def visit_ListComp(self, node: ast.ListComp | ast.SetComp | ast.GeneratorExp):
+        self.visit_comprehension_scope(node.generators, [node.elt])
+
+    visit_SetComp = visit_ListComp
+    visit_GeneratorExp = visit_ListComp
+
+    def visit_DictComp(self, node: ast.DictComp):
+        self.visit_comprehension_scope(node.generators, [node.key, node.value])
+
+    # arguments
+
+    @staticmethod
+    def all_args(args: ast.arguments) -> list[ast.arg]:
+        all_args = args.posonlyargs + args.args
+        if args.vararg is not None:
+            all_args.append(args.vararg)
+        all_args.extend(args.kwonlyargs)
+        if args.kwarg is not None:
+            all_args.append(args.kwarg)
+        return all_args
+
+    @staticmethod
+    def arg_names(args: ast.arguments) -> set[str]:
+        return {arg.arg for arg in ScopeGlobalsVisitor.all_args(args)}
+
+    def visit_arguments_defaults(self, args: ast.arguments):
+        for default in args.defaults:
+            self.visit(default)
+        for default in args.kw_defaults:
+            if default is not None:
+                self.visit(default)
+
+
+def resolve_scope_globals(scope: Scope) -> list[str]:
+    """Global names read by a visited scope and its nested scopes."""
+
+    # closures: names read from an enclosing function are cells there
+    # (only locals that are not cells are `LOAD_FAST`ed)
+    def mark_cells(scope: Scope):
+        for name in scope.seen | scope.nonlocals:
+            if name in scope.globals:
+                continue
+            if (
+                scope.is_function
+                and name in scope.bound
+                and name not in scope.nonlocals
+            ):
+                continue
+            if scope.kind == "class" and name in scope.bound:
+                continue
+            binding = scope.find_binding(name)
+            if binding is not None:
+                binding.cells.add(name)
+            elif name in scope.nonlocals and scope.kind != "comprehension":
+                raise ScopeError(f"no binding for nonlocal '{name}' found")
+        for child in scope.children:
+            mark_cells(child)
+
+    def is_global_load(scope: Scope, name: str, stored_before: bool) -> bool:
+        if name in scope.globals:
+            return True
+        if name in scope.nonlocals:
+            return False
+        if scope.kind == "class":
+            return name in scope.bound or scope.find_binding(name) is None
+        if name in scope.bound:
+            return name not in scope.cells and not stored_before
+        return scope.find_binding(name) is None
+
+    def is_private(name: str) -> bool:
+        return name.startswith("__") and not name.endswith("__")
+
+    def collect(scope: Scope, enclosing_params: set[str]) -> list[str]:
+        params = enclosing_params | scope.params
+        globals = [
+            name
+            for name, stored_before in scope.loads
+            if is_global_load(scope, name, stored_before)
+            and name not in params
+            and not (scope.mangles and is_private(name))
+        ]
+        for child in scope.children:
+            globals.extend(collect(child, params))
+        return globals
+
+    mark_cells(scope)
+    return collect(scope, set())
+
+
+def get_scope_globals(
+    func_class_ast: ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef,
+) -> list[str]:
+    """
+    extract all the global variables accessed in the function or class body
+    (a drop-in replacement of `get_funclass_globals` without compiling the code)
+    NOTE: decorators, defaults, annotations and bases are evaluated outside
+    the function/class and are not included
+    :param func_class_ast: ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef
+    :return: list[str] - list of global variables accessed
+    """
+    module_scope = Scope("module", None)
+    try:
+        ScopeGlobalsVisitor(module_scope).visit(func_class_ast)
+        global_access_symbols = resolve_scope_globals(module_scope)
+    except ScopeError:
+        return []
+
+    function_name = func_class_ast.name
+    return [symbol for symbol in global_access_symbols if symbol != function_name]
+
+
+def get_stmt_scope_globals(stmt: ast.stmt) -> list[str]:
+    """
+    extract all the global variables accessed in a statement as if it were
+    the body of a function (the fake function of `find_dependency_globals`)
+    :param stmt: ast.stmt
+    :return: list[str] - list of global variables accessed
+    """
+    function_scope = Scope("function", Scope("module", None))
+    try:
+        ScopeGlobalsVisitor(function_scope).visit_body([stmt])
+        return resolve_scope_globals(function_scope)
+    except ScopeError:
+        return []
@@ -1,8 +1,8 @@
 import ast
 
 from r2e.pat.dependency_slicer.globals_finder.expr_globals import get_expr_globals
-from r2e.pat.dependency_slicer.globals_finder.bytecode_globals import (
-    get_funclass_globals,
+from r2e.pat.dependency_slicer.globals_finder.scope_globals import (
+    get_scope_globals,
 )
 from r2e.pat.dependency_slicer.globals_finder.type_annotation_globals import (
     astnode_to_type_annotation_globals,
@@ -167,7 +167,7 @@ class StmtGlobalVariablesVisitor(ast.NodeVisitor):
         # @cache -> cache is a global
         all_globals += get_decorator_globals(node)
         # def f(): a=b --> b is a global in the body
-        all_globals += get_funclass_globals(node)
+        all_globals += get_scope_globals(node)
         return all_globals
 
     def for_handler(self, node: ast.For | ast.AsyncFor) -> list[str]:
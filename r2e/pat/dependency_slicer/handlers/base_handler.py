@@ -1,9 +1,10 @@
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from r2e.logger import slicer_logger
 from r2e.pat.dependency_slicer.globals_finder import find_dependency_globals
 from r2e.pat.dependency_slicer.ast_statements import AstStatement, AstStatements
+from r2e.pat.dependency_slicer.slice_memo import SliceMemo, SliceStep
 
 if TYPE_CHECKING:
     from r2e.pat.dependency_slicer.slicer_main import DependencySlicer
@@ -22,6 +23,7 @@ class BaseHandler:
         self.index = self.ast_statement.idx
         self.search_key = search_key
         self.slicer = slicer
+        self.steps: list[SliceStep] = []
 
     def add_self_to_recursion_stack(self):
         """Add the current function to the recursion stack"""
@@ -67,18 +69,48 @@ class BaseHandler:
         symbol: str,
         ast_statements: AstStatements | None = None,
     ):
-        ## add to dependency
-        self.slicer.dependency_graph.add_edge(
-            self.ast_statement,
-            past_statement,
-            symbol,
-        )
-
-        ## visit the past statement
         if ast_statements is None:
-            self.slicer.visit(past_statement, self.ast_statements, symbol)
+            ast_statements = self.ast_statements
+
+        self._visit_dependency(past_statement, ast_statements, symbol, add_edge=True)
+
+    def _visit_dependency(
+        self,
+        statement: AstStatement,
+        ast_statements: AstStatements,
+        symbol: str,
+        add_edge: bool,
+    ):
+        """Visit a dependency of the statement and record it for the slice memo"""
+        if statement.idx < 0:
+            target = statement
         else:
-            self.slicer.visit(past_statement, ast_statements, symbol)
+            target = (statement.file_path, ast_statements.file_hash, statement.idx)
+        self.steps.append(SliceStep(target, symbol, add_edge))
+
+        ## add to dependency
+        if add_edge:
+            self.slicer.dependency_graph.add_edge(self.ast_statement, statement, symbol)
+
+        ## visit the statement
+        self.slicer.visit(statement, ast_statements, symbol)
+
+    def _resolve_steps(
+        self, steps: list[SliceStep]
+    ) -> Optional[list[tuple[AstStatement, AstStatements, SliceStep]]]:
+        """Statements of memoized steps; None if one of their files changed"""
+        resolved = []
+        for step in steps:
+            if isinstance(step.target, AstStatement):
+                resolved.append((step.target, self.ast_statements, step))
+                continue
+
+            file_path, file_hash, idx = step.target
+            ast_statements = self.slicer.get_file_ast_stmts(file_path)
+            if ast_statements.file_hash != file_hash:
+                return None
+            resolved.append((ast_statements.statements_list[idx], ast_statements, step))
+        return resolved
 
     def _add_globals(self):
         # visit all the global accesses
@@ -113,16 +145,38 @@ class BaseHandler:
         if exit:
             return
 
-        # find all globals
-        self.global_access_symbols = find_dependency_globals(
-            self.ast_statement.stmt, unique=True
-        )
+        # replay the dependencies resolved by an earlier slice of the repo
+        memo = self.slicer.slice_memo
+        memo_key = None
+        resolved_steps = None
+        if memo is not None:
+            memo_key = SliceMemo.key(
+                self.ast_statement, self.ast_statements.file_hash, self.search_key
+            )
+        if memo is not None and memo_key is not None:
+            memo_steps = memo.get(memo_key)
+            if memo_steps is not None:
+                resolved_steps = self._resolve_steps(memo_steps)
+
+        if resolved_steps is not None:
+            for statement, ast_statements, step in resolved_steps:
+                self._visit_dependency(
+                    statement, ast_statements, step.symbol, step.add_edge
+                )
+        else:
+            # find all globals
+            self.global_access_symbols = find_dependency_globals(
+                self.ast_statement.stmt, unique=True
+            )
+
+            # recurse and add to dependency graph
+            self._add_globals()
 
-        # recurse and add to dependency graph
-        self._add_globals()
+            # ast type specific handling details
+            self._handle()
 
-        # ast type specific handling details
-        self._handle()
+            if memo is not None and memo_key is not None:
+                memo.put(memo_key, self.steps)
 
         # add to visited set
         self._postprocess()
@@ -0,0 +1,104 @@
+import os
+import ast
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, Optional
+
+from r2e.pat.dependency_slicer.ast_statements import AstStatement
+
+
+class SliceStep(NamedTuple):
+    """A dependency resolved while handling a statement.
+
+    `target` is (file path, file hash, statement idx) for statements of
+    a file and the statement itself for fake (idx -1) import statements.
+    """
+
+    target: tuple[str, str, int] | AstStatement
+    symbol: str
+    add_edge: bool
+
+
+class SliceMemo:
+    """Repo-level memo of the dependencies resolved for each statement.
+
+    The handling of a statement (resolving its globals, callees and
+    internal imports) depends only on the statement and the call graph, so
+    its steps are recorded once per (file path, file hash, statement idx)
+    and replayed by every later slice of the repo (with the same call graph,
+    see `get_slice_memo`) instead of being recomputed.
+    """
+
+    def __init__(self):
+        self._steps: dict[tuple[str, str, int, str], list[SliceStep]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._steps)
+
+    @staticmethod
+    def key(
+        stmt: AstStatement, file_hash: str, search_key: str
+    ) -> Optional[tuple[str, str, int, str]]:
+        """Memo key of a statement; None for fake statements (not memoized)."""
+        if stmt.idx < 0:
+            return None
+        # imports resolve a different symbol for every search key
+        if not isinstance(stmt.stmt, (ast.Import, ast.ImportFrom)):
+            search_key = ""
+        return (stmt.file_path, file_hash, stmt.idx, search_key)
+
+    def get(self, key: tuple[str, str, int, str]) -> Optional[list[SliceStep]]:
+        steps = self._steps.get(key)
+        if steps is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return steps
+
+    def put(self, key: tuple[str, str, int, str], steps: list[SliceStep]):
+        self._steps[key] = steps
+
+    def clear(self):
+        self._steps.clear()
+
+
+def callgraph_identity(callgraph_explorer: Any) -> Optional[Hashable]:
+    """Identity of the call graph used by a slicer (None without a call graph).
+
+    The call graph files are identified by their mtime and size so that
+    rebuilding the call graph of a repo does not replay stale steps.
+    """
+    if callgraph_explorer is None:
+        return None
+    repo = callgraph_explorer.repo
+    for path in [repo.callgraph_path, repo.callgraph_bin_path]:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            return (path, stat.st_mtime_ns, stat.st_size)
+    return ("in-memory", id(callgraph_explorer.callgraph))
+
+
+# process-wide memos (shared by all the slicers of a repo and call graph)
+# the least recently used memos are dropped beyond `MAX_SLICE_MEMOS`
+MAX_SLICE_MEMOS = 8
+_slice_memos: OrderedDict[tuple[str, Optional[Hashable]], SliceMemo] = OrderedDict()
+
+
+def get_slice_memo(repo_id: str, callgraph_id: Optional[Hashable] = None) -> SliceMemo:
+    """Get the (process-wide) slice memo of a repo and call graph identity."""
+    key = (repo_id, callgraph_id)
+    if key in _slice_memos:
+        _slice_memos.move_to_end(key)
+    else:
+        _slice_memos[key] = SliceMemo()
+        while len(_slice_memos) > MAX_SLICE_MEMOS:
+            _slice_memos.popitem(last=False)
+    return _slice_memos[key]
+
+
+def clear_slice_memos(repo_id: Optional[str] = None):
+    """Drop the slice memos of a repo (of all the repos if None)."""
+    for key in list(_slice_memos):
+        if repo_id is None or key[0] == repo_id:
+            del _slice_memos[key]
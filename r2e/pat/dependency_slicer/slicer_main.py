@@ -1,10 +1,18 @@
 import ast
-from typing import Type
+import logging
+import traceback
+from typing import Optional, Sequence, Type
 
-from r2e.models import Repo, File, Function, Class
+from r2e.logger import slicer_logger
+from r2e.models import Repo, File, Function, Class, Method
 from r2e.pat.callgraph import CallGraphExplorer
 from r2e.pat.dependency_slicer.dependency_graph import DependencyGraph
 from r2e.pat.dependency_slicer.ast_statements import AstStatement, AstStatements
+from r2e.pat.dependency_slicer.slice_memo import (
+    SliceMemo,
+    callgraph_identity,
+    get_slice_memo,
+)
 from r2e.pat.dependency_slicer.handlers import (
     BaseHandler,
     ClassFunctionHandler,
@@ -27,9 +35,13 @@ class DependencySlicer:
     It keeps track of all the metadata required during the slicing process
         - initial function details for starting the slicing process
         - file_ast_cache to keep track of the AST of all the files visited
+          (backed by the process-wide AST cache shared across slicers)
         - recursion stack to keep track of the current class/function being visited
         - visited set to keep track of all the classes/functions already visited
         - the two allow handing recursion and caching
+        - slice memo with the dependencies of every statement resolved
+          by earlier slices of the same repo and call graph
+          (disable with `use_slice_memo`)
         - dependency graph data structure
     All this information is filled in by the handlers during the slicing process.
     """
@@ -39,18 +51,27 @@ class DependencySlicer:
         repo: Repo,
         ast_stmt_list: list[AstStatement],
         file_ast_cache: dict[str, AstStatements],
+        use_slice_memo: bool = True,
+        callgraph_explorer: Optional[CallGraphExplorer] = None,
     ):
         self.repo = repo
         self.ast_stmt_list = ast_stmt_list
         self.file_ast_cache = file_ast_cache
-        try:
-            self.callgraph_explorer = CallGraphExplorer(self.repo)
-        except Exception as e:
-            print(repr(e))
-            self.callgraph_explorer = None
+        self.callgraph_explorer = callgraph_explorer
+        if self.callgraph_explorer is None:
+            try:
+                self.callgraph_explorer = CallGraphExplorer(self.repo)
+            except Exception as e:
+                print(repr(e))
+                self.callgraph_explorer = None
 
         self.recursion_stack: list[AstStatement] = []
         self.visited_set: set[AstStatement] = set()
+        self.slice_memo: SliceMemo | None = (
+            get_slice_memo(repo.repo_id, callgraph_identity(self.callgraph_explorer))
+            if use_slice_memo
+            else None
+        )
 
         self.dependency_graph = DependencyGraph(self.ast_stmt_list)
 
@@ -73,7 +94,7 @@ class DependencySlicer:
             if function.file_path in file_ast_cache:
                 ast_stmts = file_ast_cache[function.file_path]
             else:
-                ast_stmts = AstStatements(function.file)
+                ast_stmts = AstStatements.from_file(function.file)
                 file_ast_cache[function.file_path] = ast_stmts
 
             resolved_function = ast_stmts.find_function_stmt_with_name(
@@ -103,7 +124,7 @@ class DependencySlicer:
             if class_model.file_path in file_ast_cache:
                 ast_stmts = file_ast_cache[class_model.file_path]
             else:
-                ast_stmts = AstStatements(class_model.file)
+                ast_stmts = AstStatements.from_file(class_model.file)
                 file_ast_cache[class_model.file_path] = ast_stmts
 
             resolved_class = ast_stmts.find_class_stmt_with_name(class_model.class_name)
@@ -112,6 +133,95 @@ class DependencySlicer:
 
         return cls(repo, ast_stmt_list, file_ast_cache)
 
+    @classmethod
+    def slice_many(
+        cls,
+        code_elements: Sequence[Function | Method],
+        skip_errors: bool = False,
+    ) -> dict[str, DependencyGraph]:
+        """Slice many functions/methods of the same repo.
+
+        The file statements, call graph explorer and slice memo are shared
+        by all the slices, so the dependencies of every statement of the repo
+        are resolved once and each slice is a traversal of the memoized
+        dependencies. Methods are sliced through their parent class
+        (as in `SlicedContextCreator`).
+
+        Args:
+            code_elements (Sequence[Function | Method]): elements of one repo
+            skip_errors (bool): leave out (and log) the elements that cannot
+                be sliced instead of raising
+
+        Returns:
+            dict[str, DependencyGraph]: dependency graph of each element by id
+        """
+        if len(code_elements) == 0:
+            return {}
+
+        assert (
+            len(set([e.repo for e in code_elements])) == 1
+        ), f"{[e.repo for e in code_elements]} are not the same repos"
+
+        repo = code_elements[0].repo
+
+        try:
+            callgraph_explorer = CallGraphExplorer(repo)
+        except Exception as e:
+            print(repr(e))
+            callgraph_explorer = None
+
+        file_ast_cache: dict[str, AstStatements] = {}
+        graphs_by_stmt: dict[AstStatement, DependencyGraph] = {}
+        dependency_graphs: dict[str, DependencyGraph] = {}
+
+        for code_element in code_elements:
+            try:
+                if isinstance(code_element, Method):
+                    sliced_element = code_element.parent_class
+                else:
+                    sliced_element = code_element
+
+                if sliced_element.file_path not in file_ast_cache:
+                    file_ast_cache[sliced_element.file_path] = AstStatements.from_file(
+                        sliced_element.file
+                    )
+                ast_stmts = file_ast_cache[sliced_element.file_path]
+
+                if isinstance(sliced_element, Class):
+                    assert sliced_element.class_name is not None
+                    ast_stmt = ast_stmts.find_class_stmt_with_name(
+                        sliced_element.class_name
+                    )
+                else:
+                    assert sliced_element.function_name is not None
+                    ast_stmt = ast_stmts.find_function_stmt_with_name(
+                        sliced_element.function_name
+                    )
+                assert ast_stmt is not None, f"Cannot find {code_element.id}"
+
+                # methods of the same class share the slice of the class
+                if ast_stmt not in graphs_by_stmt:
+                    slicer = cls(
+                        repo,
+                        [ast_stmt],
+                        file_ast_cache,
+                        callgraph_explorer=callgraph_explorer,
+                    )
+                    slicer.run()
+                    graphs_by_stmt[ast_stmt] = slicer.dependency_graph
+
+                dependency_graphs[code_element.id] = graphs_by_stmt[ast_stmt]
+
+            except Exception:
+                if not skip_errors:
+                    raise
+                slicer_logger.log(
+                    logging.WARNING,
+                    f"Cannot slice {code_element.id}:\n{traceback.format_exc()}",
+                )
+
+        return dependency_graphs
+
     def run(self):
         for ast_stmt in self.ast_stmt_list:
             self.visit(ast_stmt, self.file_ast_cache[ast_stmt.file_path])
@@ -137,6 +247,6 @@ class DependencySlicer:
             return self.file_ast_cache[file_path]
 
         file_obj = File.from_file_path(file_path, self.repo)
-        ast_stmts = AstStatements(file_obj)
+        ast_stmts = AstStatements.from_file(file_obj)
         self.file_ast_cache[file_path] = ast_stmts
         return ast_stmts
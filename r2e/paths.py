@@ -24,6 +24,10 @@ SPECGEN_DIR = R2E_BUCKET_DIR / "specgen"
 EXTRACTED_DATA_DIR = R2E_BUCKET_DIR / "extracted_data"
 
 CACHE_PATH = CACHE_DIR / "cache.json"
+LLM_CACHE_DIR = CACHE_DIR / "llm_cache"
+BATCH_API_DIR = CACHE_DIR / "openai_batches"
+AST_CACHE_PATH = CACHE_DIR / "ast_cache.pkl"
+CONTEXT_CACHE_PATH = CACHE_DIR / "context_cache.sqlite"
 EXTRACTION_DIR = R2E_BUCKET_DIR / "extracted_data"
 
 PDM_BIN_DIR = "/home/naman_jain/.local/bin:$PATH"
@@ -1,216 +1,226 @@
+import re
 import ast
+from typing import Optional, Iterable
+from functools import cached_property
+
+BAD_DOC_SUBSTRINGS = {
+    "test",
+    "transformer",
+    "training",
+    "https",
+    "http",
+    "todo",
+}
+
+BAD_BODY_SUBSTRINGS = {
+    "demo",
+    "gcp",
+    "s3",
+    "openai",
+    "aws",
+    "cuda",
+    "tensorflow",
+    "triton",
+    "gpu",
+    "nvidia",
+    "scheduler",
+    "async",
+    "job",
+    "do_not_import",
+    "do_not_run",
+    "do_not_call",
+    "plt",
+    "plot",
+    "matplotlib",
+    "seaborn",
+    "plotly",
+    "argparse",
+    "main",
+    "cuda_visible_devices",
+    "multiprocess",
+    "multiprocessing",
+    "pool",
+    "processpool",
+    "threadpool",
+    "joblib",
+    "pebble",
+}
+
+BAD_CODE_SUBSTRINGS = {
+    "cuda",
+    "gpu",
+    "nvidia",
+    "triton",
+    "tensorflow",
+    "multiprocess",
+    "pool",
+    "processpool",
+    "threadpool",
+    "joblib",
+    "mp.",
+}
+
+BAD_FUNCTION_NAME_PREFIXES = (
+    "test",
+    "train_",
+    "main",
+    "demo",
+    "example",
+    "render_pep",
+    "_init",
+)
+
+## word boundaries of the (treebank) tokenizer previously used for docstrings:
+## a word is split from the surrounding quotes, brackets and punctuation, but
+## not from `.`, `-`, `/`, `=` inside a token (e.g., `test.py`, `test-case`)
+_SPLIT_CHARS = r"\s()\[\]{}<>\"`«»“”‘’„?!;@#$%&*‒-―"
+_TOKEN_START = rf"(?:^|(?<=[{_SPLIT_CHARS}:,])|(?<=\.\.)|(?<=--)|(?<=(?<!\w)'))"
+_TOKEN_END = (
+    rf"(?=$|[{_SPLIT_CHARS}]|[:,](?:\D|$)|\.\.|--"
+    r"|'(?:[sSmMdD]|ll|LL|re|RE|ve|VE)?(?:\W|$)"
+    r"|\.[\]\)}>\"'»”’]*(?:\s|$))"
+)
+
+
+def compile_keyword_matcher(keywords: Iterable[str]) -> re.Pattern:
+    """Case-insensitive matcher of the keywords occurring as whole tokens.
+
+    NOTE: the keywords are compiled into a single alternation so that a
+    text is scanned once for all of them.
+    """
+    alternation = "|".join(
+        re.escape(k) for k in sorted(keywords, key=lambda k: (-len(k), k))
+    )
+    return re.compile(rf"{_TOKEN_START}(?:{alternation}){_TOKEN_END}", re.IGNORECASE)
+
+
+def compile_substring_matcher(substrings: Iterable[str]) -> re.Pattern:
+    """Matcher of any of the substrings (a single scan of the text)"""
+    alternation = "|".join(re.escape(s) for s in sorted(substrings))
+    return re.compile(alternation)
+
+
+BAD_DOC_MATCHER = compile_keyword_matcher(BAD_DOC_SUBSTRINGS)
+BAD_CODE_MATCHER = compile_substring_matcher(BAD_CODE_SUBSTRINGS)
+
+
+def decorator_name(decorator: ast.expr) -> str:
+    """Source of a decorator (`ast.unparse` only for calls and other expressions)"""
+    if isinstance(decorator, ast.Name):
+        return decorator.id
+    if isinstance(decorator, ast.Attribute):
+        parts = [decorator.attr]
+        value = decorator.value
+        while isinstance(value, ast.Attribute):
+            parts.append(value.attr)
+            value = value.value
+        if isinstance(value, ast.Name):
+            parts.append(value.id)
+            return ".".join(reversed(parts))
+    return ast.unparse(decorator)
+
+
+class FunctionFeatures:
+    """The features of a function or method AST used by the extraction filters.
+
+    The cheap features are read from the top-level statements; the tokens
+    of the body are collected in a single walk of the AST on first use.
+    """
+
+    def __init__(self, function_ast: ast.FunctionDef):
+        self.function_ast = function_ast
+        self.name = function_ast.name
+        self.num_stmts = len(function_ast.body)
 
-import nltk
+        body0_node = function_ast.body[0]
+        self.docstring: Optional[str] = None
+        if (
+            isinstance(body0_node, ast.Expr)
+            and isinstance(body0_node.value, ast.Constant)
+            and isinstance(body0_node.value.value, str)
+        ):
+            self.docstring = body0_node.value.value
+
+        ## whether each top-level return is a literal
+        self.literal_returns = [
+            isinstance(node.value, ast.Constant)
+            for node in function_ast.body
+            if isinstance(node, ast.Return)
+        ]
 
-nltk.download("punkt", quiet=True)
+    @property
+    def num_args(self) -> int:
+        args = self.function_ast.args
+        return (
+            len(args.args)
+            + len(args.kwonlyargs)
+            + len(args.posonlyargs)
+            + (0 if args.kwarg is None else 1)
+            + (0 if args.vararg is None else 1)
+        )
 
+    @property
+    def decorators(self) -> list[str]:
+        return [decorator_name(x) for x in self.function_ast.decorator_list]
 
-class FileBaseExtractor:
+    @cached_property
+    def body_tokens(self) -> set[str]:
+        """Lowered names and constants of the function"""
+        tokens = set()
+        for node in ast.walk(self.function_ast):
+            if isinstance(node, ast.Name):
+                tokens.add(node.id.lower())
+            elif isinstance(node, ast.Constant):
+                tokens.add(str(node.value).lower())
+        return tokens
 
-    @staticmethod
-    def filter_dunder_methods(
-        function_asts: list[ast.FunctionDef],
-    ) -> list[ast.FunctionDef]:
-        return [
-            function_ast
-            for function_ast in function_asts
-            if not function_ast.name.startswith("__")
-        ]
 
-    @staticmethod
-    def filter_keep_docstring(
-        function_asts: list[ast.FunctionDef],
-    ) -> list[ast.FunctionDef]:
-        return [
-            function_ast
-            for function_ast in function_asts
-            if FileBaseExtractor.has_docstring(function_ast)
-        ]
+class FileBaseExtractor:
 
     @staticmethod
-    def has_docstring(
-        function_ast: ast.FunctionDef,
-    ) -> bool:
-        return ast.get_docstring(function_ast) is not None
+    def is_dunder(features: FunctionFeatures) -> bool:
+        return features.name.startswith("__")
 
     @staticmethod
-    def filter_literal_returns(
-        function_asts: list[ast.FunctionDef],
-    ) -> list[ast.FunctionDef]:
-        return [
-            function_ast
-            for function_ast in function_asts
-            if not FileBaseExtractor.has_literal_return(function_ast)
-        ]
+    def has_docstring(features: FunctionFeatures) -> bool:
+        return features.docstring is not None
 
     @staticmethod
-    def has_literal_return(
-        function_ast: ast.FunctionDef,
-    ) -> bool:
-        is_constant_return = [
-            isinstance(node.value, ast.Constant)
-            for node in function_ast.body
-            if isinstance(node, ast.Return)
-        ]
+    def has_literal_return(features: FunctionFeatures) -> bool:
+        is_constant_return = features.literal_returns
         return sum(is_constant_return) > 2 / 3 * len(
             is_constant_return
         )  ## 2/3 is an arbitrary threshold
 
     @staticmethod
-    def filter_with_decorator(
-        function_asts: list[ast.FunctionDef],
-        allowed_decorators: list[str] = [],
-    ) -> list[ast.FunctionDef]:
-        return [
-            function_ast
-            for function_ast in function_asts
-            if all(
-                [
-                    ast.unparse(x) in allowed_decorators
-                    for x in function_ast.decorator_list
-                ]
-            )
-        ]
+    def has_allowed_decorators(
+        features: FunctionFeatures, allowed_decorators: list[str] = []
+    ) -> bool:
+        return all(x in allowed_decorators for x in features.decorators)
 
     @staticmethod
-    def filter_docstring_keywords(
-        function_asts: list[ast.FunctionDef],
-    ) -> list[ast.FunctionDef]:
-        BAD_DOC_SUBSTRINGS = {
-            "test",
-            "transformer",
-            "training",
-            "https",
-            "http",
-            "todo",
-        }
-        return [
-            function_ast
-            for function_ast in function_asts
-            if FileBaseExtractor.get_docstring_tokens_lowered(function_ast).isdisjoint(
-                BAD_DOC_SUBSTRINGS
-            )
-        ]
+    def has_bad_docstring_keywords(features: FunctionFeatures) -> bool:
+        assert features.docstring is not None
+        return BAD_DOC_MATCHER.search(features.docstring) is not None
 
     @staticmethod
-    def get_docstring_tokens_lowered(
-        function_ast: ast.FunctionDef,
-    ) -> set[str]:
-        body0_node = function_ast.body[0]
-        assert isinstance(body0_node, ast.Expr)
-        docstring_node = body0_node.value
-        assert isinstance(docstring_node, ast.Constant)
-        docstring = docstring_node.value
-        assert isinstance(docstring, str)
-        return {token.lower() for token in nltk.word_tokenize(docstring)}
+    def has_bad_body_keywords(features: FunctionFeatures) -> bool:
+        return not features.body_tokens.isdisjoint(BAD_BODY_SUBSTRINGS)
 
     @staticmethod
-    def filter_func_body_keywords(
-        function_asts: list[ast.FunctionDef],
-    ) -> list[ast.FunctionDef]:
-        BAD_CODE_SUBSTRINGS = {
-            "demo",
-            "gcp",
-            "s3",
-            "openai",
-            "aws",
-            "cuda",
-            "tensorflow",
-            "triton",
-            "gpu",
-            "nvidia",
-            "scheduler",
-            "async",
-            "job",
-            "do_not_import",
-            "do_not_run",
-            "do_not_call",
-            "plt",
-            "plot",
-            "matplotlib",
-            "seaborn",
-            "plotly",
-            "argparse",
-            "main",
-            "cuda_visible_devices",
-            "multiprocess",
-            "multiprocessing",
-            "pool",
-            "processpool",
-            "threadpool",
-            "joblib",
-            "pebble",
-        }
-        return [
-            function_ast
-            for function_ast in function_asts
-            if FileBaseExtractor.get_func_body_tokens_lowered(function_ast).isdisjoint(
-                BAD_CODE_SUBSTRINGS
-            )
-        ]
+    def has_bad_function_name(features: FunctionFeatures) -> bool:
+        return features.name.lower().startswith(BAD_FUNCTION_NAME_PREFIXES)
 
     @staticmethod
-    def filter_func_substrings(
-        function_asts: list[ast.FunctionDef],
-    ):
-        BAD_CODE_SUBSTRINGS = {
-            "cuda",
-            "gpu",
-            "nvidia",
-            "triton",
-            "tensorflow",
-            "multiprocess",
-            "pool",
-            "processpool",
-            "threadpool",
-            "joblib",
-            "mp.",
-        }
-        return [
-            function_ast
-            for function_ast in function_asts
-            if any(
-                substring in ast.unparse(function_ast).lower()
-                for substring in BAD_CODE_SUBSTRINGS
-            )
-        ]
-
-    @staticmethod
-    def get_func_body_tokens_lowered(
-        function_ast: ast.FunctionDef,
-    ) -> set[str]:
-        tokens = set()
-        for node in ast.walk(function_ast):
-            if isinstance(node, ast.Name):
-                tokens.add(node.id.lower())
-            elif isinstance(node, ast.Constant):
-                tokens.add(str(node.value).lower())
-        return tokens
+    def has_bad_code_substrings(function_ast: ast.FunctionDef) -> bool:
+        return BAD_CODE_MATCHER.search(ast.unparse(function_ast).lower()) is not None
 
     @staticmethod
-    def filter_bad_function_names(
+    def filter_func_substrings(
         function_asts: list[ast.FunctionDef],
-    ) -> list[ast.FunctionDef]:
+    ):
         return [
             function_ast
             for function_ast in function_asts
-            if not FileBaseExtractor.filter_bad_function_name(function_ast)
+            if FileBaseExtractor.has_bad_code_substrings(function_ast)
         ]
-
-    @staticmethod
-    def filter_bad_function_name(
-        function_ast: ast.FunctionDef,
-    ) -> bool:
-        BAD_FUNCTION_NAME_PREFIXES = {
-            "test",
-            "train_",
-            "main",
-            "demo",
-            "example",
-            "render_pep",
-            "_init",
-        }
-        return any(
-            function_ast.name.lower().startswith(prefix)
-            for prefix in BAD_FUNCTION_NAME_PREFIXES
-        )
@@ -1,6 +1,9 @@
 import ast
 
-from r2e.repo_builder.fut_extractor.extract_base import FileBaseExtractor
+from r2e.repo_builder.fut_extractor.extract_base import (
+    FileBaseExtractor,
+    FunctionFeatures,
+)
 
 
 class FileFunctionExtractor(FileBaseExtractor):
@@ -8,80 +11,40 @@ class FileFunctionExtractor(FileBaseExtractor):
     @staticmethod
     def extract_functions_from_ast(astree: ast.Module) -> list[ast.FunctionDef]:
         function_asts = FileFunctionExtractor.get_functions_from_ast(astree)
-
-        ## remove dunder methods
-        function_asts = FileFunctionExtractor.filter_dunder_methods(function_asts)
-
-        ## remove functions without docstrings
-        function_asts = FileFunctionExtractor.filter_keep_docstring(function_asts)
-
-        ## remove functions without arguments
-        function_asts = FileFunctionExtractor.filter_nonzero_arguments(function_asts)
-
-        ## remove functions without returns
-        function_asts = FileFunctionExtractor.filter_nonzero_returns(function_asts)
-
-        ## remove functions with literal returns
-        function_asts = FileFunctionExtractor.filter_literal_returns(function_asts)
-
-        ## has_decorator
-        function_asts = FileFunctionExtractor.filter_with_decorator(function_asts)
-
-        ## keyword filters
-        function_asts = FileFunctionExtractor.filter_docstring_keywords(function_asts)
-        function_asts = FileFunctionExtractor.filter_func_body_keywords(function_asts)
-
-        ## remove functions with bad function names
-        function_asts = FileFunctionExtractor.filter_bad_function_names(function_asts)
-
-        ## remove wrapper methods
-        function_asts = FileFunctionExtractor.filter_onlt_one_stmt(function_asts)
-
-        return function_asts
-
-    @staticmethod
-    def get_functions_from_ast(astree: ast.Module) -> list[ast.FunctionDef]:
-        functions: list[ast.FunctionDef] = []
-        for node in astree.body:
-            if isinstance(node, ast.FunctionDef):
-                functions.append(node)
-        return functions
-
-    @staticmethod
-    def filter_nonzero_arguments(
-        function_asts: list[ast.FunctionDef],
-    ) -> list[ast.FunctionDef]:
         return [
             function_ast
             for function_ast in function_asts
-            if FileFunctionExtractor.get_num_args(function_ast) > 0
+            if FileFunctionExtractor.keep_function(FunctionFeatures(function_ast))
         ]
 
     @staticmethod
-    def get_num_args(function_ast: ast.FunctionDef) -> int:
+    def keep_function(features: FunctionFeatures) -> bool:
         return (
-            len(function_ast.args.args)
-            + len(function_ast.args.kwonlyargs)
-            + len(function_ast.args.posonlyargs)
-            + (0 if function_ast.args.kwarg is None else 1)
-            + (0 if function_ast.args.vararg is None else 1)
+            ## remove dunder methods
+            not FileFunctionExtractor.is_dunder(features)
+            ## remove functions without docstrings
+            and FileFunctionExtractor.has_docstring(features)
+            ## remove functions without arguments
+            and features.num_args > 0
+            ## remove functions without returns
+            and len(features.literal_returns) > 0
+            ## remove functions with literal returns
+            and not FileFunctionExtractor.has_literal_return(features)
+            ## has_decorator
+            and FileFunctionExtractor.has_allowed_decorators(features)
+            ## remove functions with bad function names
+            and not FileFunctionExtractor.has_bad_function_name(features)
+            ## remove wrapper methods (body[0] is docstring!)
+            and features.num_stmts > 2
+            ## keyword filters
+            and not FileFunctionExtractor.has_bad_docstring_keywords(features)
+            and not FileFunctionExtractor.has_bad_body_keywords(features)
         )
 
     @staticmethod
-    def filter_nonzero_returns(
-        function_asts: list[ast.FunctionDef],
-    ) -> list[ast.FunctionDef]:
-        return [
-            function_ast
-            for function_ast in function_asts
-            if any(isinstance(node, ast.Return) for node in function_ast.body)
-        ]
-
-    @staticmethod
-    def filter_onlt_one_stmt(
-        function_asts: list[ast.FunctionDef],
-    ) -> list[ast.FunctionDef]:
-        ## body[0] is docstring!
-        return [
-            function_ast for function_ast in function_asts if len(function_ast.body) > 2
-        ]
+    def get_functions_from_ast(astree: ast.Module) -> list[ast.FunctionDef]:
+        functions: list[ast.FunctionDef] = []
+        for node in astree.body:
+            if isinstance(node, ast.FunctionDef):
+                functions.append(node)
+        return functions
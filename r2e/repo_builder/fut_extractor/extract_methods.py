@@ -1,7 +1,9 @@
 import ast
 
-from r2e.pat.ast import build_ast_file
-from r2e.repo_builder.fut_extractor.extract_base import FileBaseExtractor
+from r2e.repo_builder.fut_extractor.extract_base import (
+    FileBaseExtractor,
+    FunctionFeatures,
+)
 
 
 class FileMethodExtractor(FileBaseExtractor):
@@ -9,33 +11,34 @@ class FileMethodExtractor(FileBaseExtractor):
     @staticmethod
     def extract_methods_from_ast(astree: ast.Module) -> list[ast.FunctionDef]:
         method_asts = FileMethodExtractor.get_methods_from_ast(astree)
+        return [
+            method_ast
+            for method_ast in method_asts
+            if FileMethodExtractor.keep_method(FunctionFeatures(method_ast))
+        ]
 
-        ## remove dunder methods
-        method_asts = FileMethodExtractor.filter_dunder_methods(method_asts)
-
-        ## remove methods without docstrings
-        method_asts = FileMethodExtractor.filter_keep_docstring(method_asts)
-
-        ## remove methods with literal returns
-        method_asts = FileMethodExtractor.filter_literal_returns(method_asts)
-
-        ## has_decorator
-        method_asts = FileMethodExtractor.filter_with_decorator(
-            method_asts, allowed_decorators=["staticmethod", "classmethod"]
+    @staticmethod
+    def keep_method(features: FunctionFeatures) -> bool:
+        return (
+            ## remove dunder methods
+            not FileMethodExtractor.is_dunder(features)
+            ## remove methods without docstrings
+            and FileMethodExtractor.has_docstring(features)
+            ## remove methods with literal returns
+            and not FileMethodExtractor.has_literal_return(features)
+            ## has_decorator
+            and FileMethodExtractor.has_allowed_decorators(
+                features, allowed_decorators=["staticmethod", "classmethod"]
+            )
+            ## remove methods with bad function names
+            and not FileMethodExtractor.has_bad_function_name(features)
+            ## remove wrapper methods
+            and not FileMethodExtractor.is_wrapper_method(features.function_ast)
+            ## keyword filters
+            and not FileMethodExtractor.has_bad_docstring_keywords(features)
+            and not FileMethodExtractor.has_bad_body_keywords(features)
         )
 
-        ## keyword filters
-        method_asts = FileMethodExtractor.filter_docstring_keywords(method_asts)
-        method_asts = FileMethodExtractor.filter_func_body_keywords(method_asts)
-
-        ## remove methods with bad function names
-        method_asts = FileMethodExtractor.filter_bad_function_names(method_asts)
-
-        ## remove wrapper methods
-        method_asts = FileMethodExtractor.filter_wrapper_methods(method_asts)
-
-        return method_asts
-
     @staticmethod
     def get_methods_from_ast(astree: ast.Module) -> list[ast.FunctionDef]:
         methods: list[ast.FunctionDef] = []
@@ -46,16 +49,6 @@ class FileMethodExtractor(FileBaseExtractor):
                         methods.append(subnode)
         return methods
 
-    @staticmethod
-    def filter_wrapper_methods(
-        method_asts: list[ast.FunctionDef],
-    ) -> list[ast.FunctionDef]:
-        return [
-            method_ast
-            for method_ast in method_asts
-            if not FileMethodExtractor.is_wrapper_method(method_ast)
-        ]
-
     @staticmethod
     def is_wrapper_method(method_ast: ast.FunctionDef) -> bool:
         if len(method_ast.body) == 1:
@@ -1,7 +1,10 @@
+import os
 import ast
+from typing import Optional
 
-from r2e.pat.ast import build_ast_file
+from r2e.pat.ast import get_ast_cache
 from r2e.models import Identifier, Repo, File, Function, Method
+from r2e.models.callgraph import CallGraph, CompactCallGraph
 from r2e.repo_builder.fut_extractor.extract_methods import FileMethodExtractor
 from r2e.repo_builder.fut_extractor.extract_functions import FileFunctionExtractor
 
@@ -9,71 +12,148 @@ MAX_LINES_FUNCTION = 25
 MAX_LINES_METHOD = 20
 
 
-def extract_repo_data(repo: Repo) -> tuple[list[Function], list[Method]]:
+UTF8_BOM = b"\xef\xbb\xbf"
+
+
+def list_python_files(repo: Repo) -> list[str]:
+    """Paths of the python files of a repo (skipping hidden files and directories)"""
+    file_paths: list[str] = []
+    for root, dirs, files in os.walk(repo.repo_path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for file in sorted(files):
+            if file.endswith(".py") and not file.startswith("."):
+                file_paths.append(os.path.join(root, file))
+    return file_paths
+
+
+def read_source(file_path: str) -> str:
+    """Read a python file, removing a UTF-8 BOM.
+
+    NOTE: a file with a BOM is rewritten without it so that later readers
+    of the file (e.g., slicing and execution) see the extracted content.
+    """
+    with open(file_path, "rb") as f:
+        content = f.read()
+    if content.startswith(UTF8_BOM):
+        content = content[len(UTF8_BOM) :]
+        with open(file_path, "wb") as f:
+            f.write(content)
+    return content.decode("utf-8")
+
+
+def load_callgraph(repo: Repo) -> Optional[CallGraph | CompactCallGraph]:
+    """Call graph of a repo (None if it is missing or invalid)"""
+    try:
+        return repo.callgraph
+    except Exception as e:
+        return None
+
+
+def has_callees(
+    callgraph: Optional[CallGraph | CompactCallGraph], func_meth_id: str
+) -> bool:
+    ## functions are kept if the call graph is not present
+    return callgraph is None or callgraph.callee_count(func_meth_id) > 0
+
+
+def extract_file_data(
+    repo: Repo,
+    file_path: str,
+    callgraph: Optional[CallGraph | CompactCallGraph] = None,
+) -> tuple[list[Function], list[Method]]:
     functions: list[Function] = []
     methods: list[Method] = []
 
-    for file_path in repo.list_repo_files():
-        if not file_path.endswith(".py"):
-            continue
-        ## hidden file or hidden directory ignore
-        file_path_split = file_path.split("/")
-        if any([part.startswith(".") for part in file_path_split]):
-            continue
-        try:
-            astree = build_ast_file(file_path)
-        except Exception as e:
-            print(f"Error parsing {file_path}: {e}")
-            continue
-        function_asts = FileFunctionExtractor.extract_functions_from_ast(astree)
-        file_obj = File.from_file_path(file_path, repo)
-        for function_ast in function_asts:
-            function_name = function_ast.name
-            func_obj = Function(
-                function_id=Identifier(
-                    identifier=f"{file_obj.file_id}.{function_name}"
-                ),
-                file=file_obj,
-                function_code=ast.unparse(function_ast),
-                function_name=function_ast.name,
-                function_complexity=None,
-                context=None,
-            )
-
-            if func_obj.num_code_lines < MAX_LINES_FUNCTION:
-                try:
-                    if func_obj.callee_count:
-                        functions.append(func_obj)
-                except Exception as e:  ## if callee_count is not present
-                    functions.append(func_obj)
-
-        method_asts = FileMethodExtractor.extract_methods_from_ast(astree)
-        for method_ast in method_asts:
-            method_name = method_ast.name
-            parent_class_ast = method_ast.parent  # type: ignore
-            parent_class_name = parent_class_ast.name  # type: ignore
-            method_obj = Method(
-                method_id=Identifier(
-                    identifier=f"{file_obj.file_id}.{parent_class_name}.{method_name}"
-                ),
-                file=file_obj,
-                method_code=ast.unparse(method_ast),
-                method_name=method_ast.name,
-                parent_class_id=Identifier(
-                    identifier=f"{file_obj.file_id}.{parent_class_name}"
-                ),
-                context=None,
-            )
-            if method_obj.num_code_lines < MAX_LINES_METHOD:
-                try:
-                    if method_obj.callee_count:
-                        methods.append(method_obj)
-                except Exception as e:  ## if callee_count is not present
-                    methods.append(method_obj)
+    try:
+        astree = get_ast_cache().get_ast(file_path, read_source(file_path))
+    except Exception as e:
+        print(f"Error parsing {file_path}: {e}")
+        return functions, methods
+    function_asts = FileFunctionExtractor.extract_functions_from_ast(astree)
+    file_obj = File.from_file_path(file_path, repo)
+    for function_ast in function_asts:
+        function_name = function_ast.name
+        func_obj = Function(
+            function_id=Identifier(identifier=f"{file_obj.file_id}.{function_name}"),
+            file=file_obj,
+            function_code=ast.unparse(function_ast),
+            function_name=function_ast.name,
+            function_complexity=None,
+            context=None,
+        )
+
+        if func_obj.num_code_lines < MAX_LINES_FUNCTION:
+            if has_callees(callgraph, func_obj.id):
+                functions.append(func_obj)
+
+    method_asts = FileMethodExtractor.extract_methods_from_ast(astree)
+    for method_ast in method_asts:
+        method_name = method_ast.name
+        parent_class_ast = method_ast.parent  # type: ignore
+        parent_class_name = parent_class_ast.name  # type: ignore
+        method_obj = Method(
+            method_id=Identifier(
+                identifier=f"{file_obj.file_id}.{parent_class_name}.{method_name}"
+            ),
+            file=file_obj,
+            method_code=ast.unparse(method_ast),
+            method_name=method_ast.name,
+            parent_class_id=Identifier(
+                identifier=f"{file_obj.file_id}.{parent_class_name}"
+            ),
+            context=None,
+        )
+        if method_obj.num_code_lines < MAX_LINES_METHOD:
+            if has_callees(callgraph, method_obj.id):
+                methods.append(method_obj)
 
     return functions, methods
 
 
+def extract_files_data(
+    repo: Repo, file_paths: list[str]
+) -> tuple[list[Function], list[Method]]:
+    functions: list[Function] = []
+    methods: list[Method] = []
+    # the call graph is loaded once (and cached on the repo) for all the files
+    callgraph = load_callgraph(repo)
+    for file_path in file_paths:
+        file_functions, file_methods = extract_file_data(repo, file_path, callgraph)
+        functions.extend(file_functions)
+        methods.extend(file_methods)
+    return functions, methods
+
+
+def extract_repo_data(repo: Repo) -> tuple[list[Function], list[Method]]:
+    return extract_files_data(repo, list_python_files(repo))
+
+
+# per-process repos so that the call graph of a repo is loaded once per worker
+# (the repo of every task is a fresh unpickled copy)
+_worker_repos: dict[str, Repo] = {}
+
+
+def extract_files_data_wrapper(args) -> tuple[list[Function], list[Method]]:
+    """A wrapper over `extract_files_data` to be used in parallel processing"""
+    repo, file_paths = args
+    repo = _worker_repos.setdefault(repo.repo_id, repo)
+    return extract_files_data(repo, file_paths)
+
+
+def plan_extraction_tasks(
+    repos: list[Repo], chunk_size: int
+) -> list[tuple[Repo, list[str]]]:
+    """Split the python files of the repos into (repo, files) tasks of at most
+    `chunk_size` files, so that a large repo is spread over all the workers.
+    """
+    tasks: list[tuple[Repo, list[str]]] = []
+    for repo in repos:
+        file_paths = list_python_files(repo)
+        for start in range(0, len(file_paths), chunk_size):
+            tasks.append((repo, file_paths[start : start + chunk_size]))
+    return tasks
+
+
 if __name__ == "__main__":
     repo = Repo.from_file_path("/home/naman/Repos/r2e-internal")
     f, m = extract_repo_data(repo)
@@ -57,3 +57,7 @@ class RepoArgs(BaseModel):
         16,
         description="Number of processes to use for extracting functions and methods",
     )
+    extraction_chunk_size: int = Field(
+        32,
+        description="Number of files extracted per parallel task",
+    )
@@ -1,8 +1,11 @@
 import os
 import json
-from pathlib import Path
+from typing import Optional
 
-from r2e.models import Repo
+from r2e.models import Repo, Identifier
+from r2e.models.callgraph import CallGraph, CompactCallGraph
+from r2e.models.symbol_index import refresh_symbol_index
+from r2e.utils.models import get_type_from_identifier
 from r2e.paths import REPOS_DIR, GRAPHS_DIR
 from r2e.repo_builder.repo_args import RepoArgs
 from r2e.multiprocess import run_tasks_in_parallel_iter
@@ -10,29 +13,125 @@ from r2e.pat.callgraph import CallGraphGenerator, CallGraphProcessor
 
 
 def construct_pycg(repo: Repo):
-    cgraph = CallGraphGenerator.construct_call_graph(repo.repo_path)
+    """Construct (or incrementally update) the processed call graph of a repo.
+
+    The content hash and imports of every file are stored alongside the graph;
+    on reruns only the changed files and the modules importing them are
+    re-analyzed and their edges are spliced into the previous graph.
+    """
+    refresh_symbol_index(repo.symbol_index_path, repo.repo_path)
+    file_infos = CallGraphGenerator.get_file_infos(repo.repo_path)
+
+    old_cgraph = load_cgraph_data(repo)
+    if old_cgraph is None:
+        cgraph = CallGraphGenerator.construct_call_graph(repo.repo_path)
+        graph, id2type = process_pycg(repo, cgraph)
+
+    else:
+        old_infos = old_cgraph["files"]
+        changed, removed = CallGraphGenerator.get_changed_files(old_infos, file_infos)
+        if not changed and not removed:
+            if not CompactCallGraph.is_up_to_date(
+                repo.callgraph_bin_path, repo.callgraph_path
+            ):
+                CompactCallGraph.write(
+                    repo.callgraph_bin_path, old_cgraph["graph"], old_cgraph["id2type"]
+                )
+            return old_cgraph
+
+        module_ids = {
+            CallGraphGenerator.module_id_from_path(file_path)
+            for file_path in set(old_infos) | set(file_infos)
+        }
+        stale_modules = {
+            CallGraphGenerator.module_id_from_path(file_path)
+            for file_path in changed | removed
+        }
+
+        cgraph = {}
+        if changed:
+            cgraph = CallGraphGenerator.construct_call_graph(
+                repo.repo_path, entry_points=sorted(changed)
+            )
+        cgraph = CallGraphGenerator.splice_call_graph(
+            {}, cgraph, stale_modules, module_ids
+        )
+
+        # types of the elements of the stale modules may have changed
+        old_id2type = {
+            uid: utype
+            for uid, utype in old_cgraph.get("id2type", {}).items()
+            if CallGraphGenerator.get_caller_module(uid, module_ids)
+            not in stale_modules
+        }
+        graph, id2type = process_pycg(repo, cgraph, old_id2type)
+        graph = CallGraphGenerator.splice_call_graph(
+            old_cgraph["graph"], graph, stale_modules, module_ids
+        )
+        id2type = get_id2type(repo, graph, {**old_id2type, **id2type})
+
+    new_cgraph = {"graph": graph, "id2type": id2type, "files": file_infos}
+
     GRAPHS_DIR.mkdir(parents=True, exist_ok=True)
     with open(repo.callgraph_path, "w") as f:
-        json.dump(cgraph, f, indent=4)
+        json.dump(new_cgraph, f, indent=4)
+
+    # written after the JSON graph so that it is picked up by `Repo.callgraph`
+    CompactCallGraph.write(repo.callgraph_bin_path, graph, id2type)
+    repo._cached_callgraph = CompactCallGraph(repo.callgraph_bin_path)
+
+    return new_cgraph
+
+
+def process_pycg(
+    repo: Repo, cgraph: dict[str, list[str]], id2type: Optional[dict[str, str]] = None
+) -> tuple[dict[str, list[str]], dict[str, str]]:
+    """Normalize a raw PyCG graph and compute the types of its ids"""
+    repo._cached_callgraph = CallGraph.from_dict(cgraph, {})
 
     CallGraphProcessor.remove_unresolvable_callers(repo)
     CallGraphProcessor.normalize_callee_ids(repo)
 
-    id2type = CallGraphProcessor.get_id2type_map(repo)
-    id2type = {str(k): v.name for k, v in id2type.items()}
-    cgdict = repo.callgraph.to_dict()
+    graph = repo.callgraph.to_dict()
+    return graph, get_id2type(repo, graph, id2type or {})
 
-    new_cgraph = {"graph": cgdict, "id2type": id2type}
 
-    with open(repo.callgraph_path, "w") as f:
-        json.dump(new_cgraph, f, indent=4)
+def get_id2type(
+    repo: Repo, graph: dict[str, list[str]], id2type: dict[str, str]
+) -> dict[str, str]:
+    """Types of all the ids in the graph, reusing the known ones"""
+    unique_ids = set(graph)
+    for callees in graph.values():
+        unique_ids.update(callees)
 
-    return new_cgraph
+    return {
+        uid: id2type.get(uid)
+        or get_type_from_identifier(Identifier(identifier=uid), repo).name
+        for uid in unique_ids
+    }
+
+
+def load_cgraph_data(repo: Repo) -> Optional[dict]:
+    """Load a processed call graph that can be updated incrementally"""
+    if not os.path.exists(repo.callgraph_path):
+        return None
+
+    try:
+        with open(repo.callgraph_path, "r") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    # graphs built before file hashes were stored are rebuilt from scratch
+    if not isinstance(data, dict) or "graph" not in data or "files" not in data:
+        return None
+    return data
 
 
 def run_pycg(repo_args: RepoArgs):
     """
-    Runs pycg on all repos in repos_dir except where pycg has already been run
+    Runs pycg on all repos in repos_dir; repos where pycg has already been run
+    are only re-analyzed for the files that changed since the last run
     Also modifies the call graphs using the call-grpah processor storing metadata
     """
     all_repos_clones: list[str] = sorted(os.listdir(REPOS_DIR))
@@ -43,8 +142,7 @@ def run_pycg(repo_args: RepoArgs):
     print(f"Running pycg on {len(all_repos)} repos")
     if repo_args.pycg_multiprocess == 0:
         for repo in all_repos:
-            if not Path(repo.callgraph_path).exists():
-                construct_pycg(repo)
+            construct_pycg(repo)
     else:
         outputs = run_tasks_in_parallel_iter(
             construct_pycg,
@@ -0,0 +1,440 @@
+"""Normalized, columnar storage of functions, methods and their tests.
+
+A JSONL record of a function repeats its whole `file -> file_module -> repo`
+record. The columnar format stores each repo and file once and refers to
+them by integer ids::
+
+    repos.arrow           repo_idx, repo_org, repo_name, repo_id, local_repo_path
+    files.arrow           file_idx, repo_idx, module_id, module_type
+    functions/*.arrow     func_idx, file_idx, kind, id, name, code, ... , is_passing
+    tests/*.arrow         func_idx, version, operation, ..., updated, removed, exec_stats
+
+Like `TestHistory`, a row of the tests table only holds the tests a version
+adds, modifies or removes.
+
+Tables are Arrow IPC files (the format `datasets` is built on), written in
+shards of `shard_size` functions. They are memory-mapped on load, so reading a
+few columns (e.g., `id`, `code`, `is_passing`) does not materialize the
+others nor any model; `ColumnarDataset.to_models` rebuilds the models.
+
+NOTE: requires `pyarrow` (a dependency of `datasets`).
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+import fire
+
+from r2e.models import Repo, File, Function, Method, Module, Identifier
+from r2e.models.fut import FunctionUnderTest, MethodUnderTest
+from r2e.models.tests import TestHistory, TestsDelta, hash_test
+from r2e.models.context import Context
+from r2e.models.codegen_problem import CodeGenProblemFunction, CodeGenProblemMethod
+from r2e.utils.data import iter_json_records, parse_function, parse_function_under_test
+from r2e.utils.models import construct_from
+
+FuncMeth = Function | Method
+
+
+def import_pyarrow():
+    try:
+        import pyarrow  # type: ignore
+        import pyarrow.ipc  # type: ignore
+        import pyarrow.dataset  # type: ignore
+        import pyarrow.fs  # type: ignore
+    except ImportError as e:
+        raise ImportError("The columnar format requires `pip install pyarrow`") from e
+    return pyarrow
+
+
+def table_schemas() -> dict[str, Any]:
+    pa = import_pyarrow()
+    return {
+        "repos": pa.schema(
+            [
+                ("repo_idx", pa.int32()),
+                ("repo_org", pa.string()),
+                ("repo_name", pa.string()),
+                ("repo_id", pa.string()),
+                ("local_repo_path", pa.string()),
+            ]
+        ),
+        "files": pa.schema(
+            [
+                ("file_idx", pa.int32()),
+                ("repo_idx", pa.int32()),
+                ("module_id", pa.string()),
+                ("module_type", pa.string()),
+            ]
+        ),
+        "functions": pa.schema(
+            [
+                ("func_idx", pa.int64()),
+                ("file_idx", pa.int32()),
+                ("kind", pa.string()),  # "function" or "method"
+                ("id", pa.string()),
+                ("name", pa.string()),
+                ("code", pa.string()),
+                ("parent_class_id", pa.string()),
+                ("function_complexity", pa.string()),
+                ("context_type", pa.string()),
+                ("context", pa.string()),
+                ("under_test", pa.bool_()),
+                ("num_versions", pa.int32()),
+                ("is_passing", pa.bool_()),
+                ("spec", pa.string()),
+            ]
+        ),
+        "tests": pa.schema(
+            [
+                ("func_idx", pa.int64()),
+                ("version", pa.int32()),
+                ("operation", pa.string()),
+                ("gen_model", pa.string()),
+                ("gen_date", pa.string()),
+                ("updated", pa.string()),  # JSON object of test id -> test
+                ("removed", pa.string()),  # JSON list of test ids
+                ("exec_stats", pa.string()),  # JSON object
+            ]
+        ),
+    }
+
+
+def write_arrow_table(file_path: Path, rows: dict[str, list], schema) -> None:
+    pa = import_pyarrow()
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pydict(rows, schema=schema)
+    with pa.ipc.new_file(str(file_path), schema) as writer:
+        writer.write_table(table)
+
+
+class ColumnarWriter:
+    """Writer of functions, methods and FUTs in the columnar format.
+
+    Repos and files are kept in memory (deduplicated) and written on `close`;
+    functions and tests are written in shards of `shard_size` functions.
+
+    Args:
+        out_dir (str | Path): directory of the tables
+        shard_size (int): number of functions per shard
+    """
+
+    def __init__(self, out_dir: str | Path, shard_size: int = 100_000):
+        self.out_dir = Path(out_dir)
+        self.shard_size = shard_size
+        self.schemas = table_schemas()
+        self.count = 0
+
+        self._repo_idxs: dict[str, int] = {}
+        self._file_idxs: dict[tuple[int, str], int] = {}
+        self._repos = self._empty("repos")
+        self._files = self._empty("files")
+        self._functions = self._empty("functions")
+        self._tests = self._empty("tests")
+        self._num_shards = 0
+
+    def _empty(self, table: str) -> dict[str, list]:
+        return {name: [] for name in self.schemas[table].names}
+
+    def _repo_idx(self, repo: Repo) -> int:
+        if repo.repo_id not in self._repo_idxs:
+            self._repo_idxs[repo.repo_id] = len(self._repo_idxs)
+            self._repos["repo_idx"].append(self._repo_idxs[repo.repo_id])
+            self._repos["repo_org"].append(repo.repo_org)
+            self._repos["repo_name"].append(repo.repo_name)
+            self._repos["repo_id"].append(repo.repo_id)
+            self._repos["local_repo_path"].append(repo.local_repo_path)
+        return self._repo_idxs[repo.repo_id]
+
+    def _file_idx(self, file: File) -> int:
+        module = file.file_module
+        repo_idx = self._repo_idx(module.repo)
+        key = (repo_idx, module.module_id.identifier)
+        if key not in self._file_idxs:
+            self._file_idxs[key] = len(self._file_idxs)
+            self._files["file_idx"].append(self._file_idxs[key])
+            self._files["repo_idx"].append(repo_idx)
+            self._files["module_id"].append(module.module_id.identifier)
+            self._files["module_type"].append(module.module_type.value)
+        return self._file_idxs[key]
+
+    def write(self, func_meth: FuncMeth) -> None:
+        func_idx = self.count
+        is_method = isinstance(func_meth, Method)
+        under_test = isinstance(func_meth, (FunctionUnderTest, MethodUnderTest))
+
+        row = self._functions
+        row["func_idx"].append(func_idx)
+        row["file_idx"].append(self._file_idx(func_meth.file))
+        row["kind"].append("method" if is_method else "function")
+        row["id"].append(func_meth.id)
+        row["name"].append(func_meth.name)
+        row["code"].append(func_meth.code)
+        row["parent_class_id"].append(
+            func_meth.parent_class_id.identifier  # type: ignore
+            if is_method and func_meth.parent_class_id is not None  # type: ignore
+            else None
+        )
+        row["function_complexity"].append(
+            None if is_method else func_meth.function_complexity  # type: ignore
+        )
+        context = func_meth.context
+        row["context_type"].append(context.context_type if context else None)
+        row["context"].append(context.context if context else None)
+        row["under_test"].append(under_test)
+        row["num_versions"].append(
+            len(func_meth.test_history) if under_test else 0  # type: ignore
+        )
+        row["is_passing"].append(
+            func_meth.is_passing if under_test else None  # type: ignore
+        )
+        row["spec"].append(getattr(func_meth, "spec", None))
+
+        if under_test:
+            history: TestHistory = func_meth.test_history  # type: ignore
+            for version, delta in enumerate(history.deltas):
+                updated = {k: history.blobs[h] for k, h in delta.updated.items()}
+                self._tests["func_idx"].append(func_idx)
+                self._tests["version"].append(version)
+                self._tests["operation"].append(delta.operation)
+                self._tests["gen_model"].append(delta.gen_model)
+                self._tests["gen_date"].append(delta.gen_date)
+                self._tests["updated"].append(json.dumps(updated))
+                self._tests["removed"].append(json.dumps(delta.removed))
+                self._tests["exec_stats"].append(
+                    None if delta.exec_stats is None else json.dumps(delta.exec_stats)
+                )
+
+        self.count += 1
+        if len(self._functions["func_idx"]) >= self.shard_size:
+            self._write_shard()
+
+    def write_many(self, func_meths: Iterable[FuncMeth]) -> None:
+        for func_meth in func_meths:
+            self.write(func_meth)
+
+    def _write_shard(self) -> None:
+        shard_name = f"part-{self._num_shards:05d}.arrow"
+        for table, rows in [("functions", self._functions), ("tests", self._tests)]:
+            write_arrow_table(
+                self.out_dir / table / shard_name, rows, self.schemas[table]
+            )
+        self._functions = self._empty("functions")
+        self._tests = self._empty("tests")
+        self._num_shards += 1
+
+    def close(self) -> None:
+        if self._functions["func_idx"] or self._num_shards == 0:
+            self._write_shard()
+        for table, rows in [("repos", self._repos), ("files", self._files)]:
+            write_arrow_table(
+                self.out_dir / f"{table}.arrow", rows, self.schemas[table]
+            )
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ColumnarDataset:
+    """Lazily loaded (memory-mapped) dataset in the columnar format.
+
+    Args:
+        data_dir (str | Path): directory written by `ColumnarWriter`
+    """
+
+    TABLES = ("repos", "files", "functions", "tests")
+
+    def __init__(self, data_dir: str | Path):
+        self.data_dir = Path(data_dir)
+        self._datasets: dict[str, Any] = {}
+
+    def dataset(self, table: str):
+        """The (lazy) `pyarrow.dataset.Dataset` of a table"""
+        if table not in self.TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        if table not in self._datasets:
+            pa = import_pyarrow()
+            path = self.data_dir / table
+            if table in ("repos", "files"):
+                path = self.data_dir / f"{table}.arrow"
+            self._datasets[table] = pa.dataset.dataset(
+                str(path),
+                format="ipc",
+                schema=table_schemas()[table],
+                filesystem=pa.fs.LocalFileSystem(use_mmap=True),
+            )
+        return self._datasets[table]
+
+    def table(self, table: str, columns: Optional[list[str]] = None, filter=None):
+        """Read the `columns` (all by default) of a table.
+
+        Args:
+            table (str): one of "repos", "files", "functions" and "tests"
+            columns (list[str], optional): columns to read
+            filter (pyarrow.compute.Expression, optional): rows to read,
+                e.g., `pyarrow.compute.field("is_passing")`
+        """
+        return self.dataset(table).to_table(columns=columns, filter=filter)
+
+    def functions(self, columns: Optional[list[str]] = None, filter=None):
+        """Read the `columns` of the functions table; the columns of the files
+        and repos tables (e.g., `repo_id`, `module_id`) are joined on demand.
+        """
+        schemas = table_schemas()
+        function_columns = set(schemas["functions"].names)
+        file_columns = set(schemas["files"].names) - {"file_idx"}
+        repo_columns = set(schemas["repos"].names) - {"repo_idx"}
+
+        columns = columns or schemas["functions"].names
+        unknown = set(columns) - function_columns - file_columns - repo_columns
+        if unknown:
+            raise ValueError(f"Unknown columns: {sorted(unknown)}")
+
+        requested = [c for c in columns if c in function_columns]
+        joined_file = [c for c in columns if c in file_columns]
+        joined_repo = [c for c in columns if c in repo_columns]
+        needs_files = bool(joined_file or joined_repo)
+
+        table = self.table(
+            "functions",
+            requested + (["file_idx"] if needs_files else []),
+            filter,
+        )
+        if needs_files:
+            files = self.table("files", ["file_idx", "repo_idx"] + joined_file)
+            table = table.join(files, "file_idx")
+        if joined_repo:
+            repos = self.table("repos", ["repo_idx"] + joined_repo)
+            table = table.join(repos, "repo_idx")
+        return table.select(columns)
+
+    def __len__(self) -> int:
+        return self.dataset("functions").count_rows()
+
+    def to_models(self, filter=None) -> Iterator[FuncMeth]:
+        """Rebuild the (selected) functions, methods and FUTs.
+
+        NOTE: the functions of a file share the same `File` (and `Repo`).
+        """
+        pa = import_pyarrow()
+        repos = {
+            row["repo_idx"]: Repo(**{k: v for k, v in row.items() if k != "repo_idx"})
+            for row in self.table("repos").to_pylist()
+        }
+        files = {
+            row["file_idx"]: File(
+                file_module=Module(
+                    module_id=Identifier(identifier=row["module_id"]),
+                    module_type=row["module_type"],
+                    repo=repos[row["repo_idx"]],
+                )
+            )
+            for row in self.table("files").to_pylist()
+        }
+
+        for batch in self.dataset("functions").to_batches(filter=filter):
+            rows = batch.to_pylist()
+            histories: dict[int, TestHistory] = {}
+            func_idxs = [row["func_idx"] for row in rows if row["under_test"]]
+            if func_idxs:
+                test_rows = self.table(
+                    "tests", filter=pa.dataset.field("func_idx").isin(func_idxs)
+                ).to_pylist()
+                for test_row in sorted(
+                    test_rows, key=lambda r: (r["func_idx"], r["version"])
+                ):
+                    history = histories.setdefault(test_row["func_idx"], TestHistory())
+                    updated = json.loads(test_row["updated"])
+                    for test in updated.values():
+                        history.blobs[hash_test(test)] = test
+                    history.deltas.append(
+                        TestsDelta(
+                            updated={k: hash_test(v) for k, v in updated.items()},
+                            removed=json.loads(test_row["removed"]),
+                            operation=test_row["operation"],
+                            gen_model=test_row["gen_model"],
+                            gen_date=test_row["gen_date"],
+                            exec_stats=(
+                                None
+                                if test_row["exec_stats"] is None
+                                else json.loads(test_row["exec_stats"])
+                            ),
+                        )
+                    )
+
+            for row in rows:
+                yield self._to_model(row, files[row["file_idx"]], histories)
+
+    @staticmethod
+    def _to_model(
+        row: dict[str, Any], file: File, histories: dict[int, TestHistory]
+    ) -> FuncMeth:
+        context = None
+        if row["context_type"] is not None:
+            context = Context(context_type=row["context_type"], context=row["context"])
+
+        func_meth: FuncMeth
+        if row["kind"] == "method":
+            func_meth = Method(
+                method_id=Identifier(identifier=row["id"]),
+                file=file,
+                method_code=row["code"],
+                method_name=row["name"],
+                parent_class_id=(
+                    Identifier(identifier=row["parent_class_id"])
+                    if row["parent_class_id"] is not None
+                    else None
+                ),
+                context=context,
+            )
+        else:
+            func_meth = Function(
+                function_id=Identifier(identifier=row["id"]),
+                file=file,
+                function_code=row["code"],
+                function_name=row["name"],
+                function_complexity=row["function_complexity"],
+                context=context,
+            )
+
+        if not row["under_test"]:
+            return func_meth
+
+        history = histories.get(row["func_idx"]) or TestHistory()
+        if row["spec"] is not None:
+            problem_cls = (
+                CodeGenProblemMethod
+                if row["kind"] == "method"
+                else CodeGenProblemFunction
+            )
+            return construct_from(
+                problem_cls, func_meth, test_history=history, spec=row["spec"]
+            )
+        fut_cls = MethodUnderTest if row["kind"] == "method" else FunctionUnderTest
+        return construct_from(fut_cls, func_meth, test_history=history)
+
+
+def export_columnar(
+    in_file: str, out_dir: str, under_test: bool = True, shard_size: int = 100_000
+) -> int:
+    """Export a JSONL file of FUTs (or of functions if `under_test` is False)
+    to the columnar format.
+
+    Returns:
+        int: number of exported functions and methods
+    """
+    parse = parse_function_under_test if under_test else parse_function
+    files: dict[str, tuple[dict, File]] = {}
+    with ColumnarWriter(out_dir, shard_size=shard_size) as writer:
+        for func_data in iter_json_records(in_file):
+            writer.write(parse(func_data, files))
+    print(f"Exported {writer.count} functions and methods to {out_dir}")
+    return writer.count
+
+
+if __name__ == "__main__":
+    fire.Fire(export_columnar)
@@ -1,14 +1,89 @@
-"""Utilities to read and write data from disk."""
+"""Utilities to read and write data from disk.
 
+Functions and FUTs are stored as JSON Lines (one record per line, `.jsonl`),
+optionally zstd-compressed (`.jsonl.zst`, requires `zstandard`), so that they
+can be read and written one record at a time. Legacy `.json` files holding a
+single JSON array are still supported (but loaded into memory at once).
+"""
+
+import io
+import os
 import json
+import itertools
 from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, TypeVar
 
+from pydantic import BaseModel
 
+from r2e.models.file import File
 from r2e.models.function import Function
 from r2e.models.method import Method
 from r2e.models.fut import FunctionUnderTest, MethodUnderTest
 from r2e.models.codegen_problem import CodeGenProblemFunction, CodeGenProblemMethod
 
+T = TypeVar("T")
+
+JSONL_SUFFIXES = (".jsonl", ".jsonl.zst")
+
+
+def is_jsonl(file_path: str | Path) -> bool:
+    """Whether the file is in the (line-delimited) record format."""
+    return str(file_path).endswith(JSONL_SUFFIXES)
+
+
+def is_compressed(file_path: str | Path) -> bool:
+    return str(file_path).endswith(".zst")
+
+
+def open_data_file(file_path: str | Path, mode: str = "r") -> IO[str]:
+    """Open a (possibly zstd-compressed) data file in text mode.
+
+    Args:
+        file_path (str | Path): path of the file
+        mode (str): "r", "w" or "a"
+    """
+    if not is_compressed(file_path):
+        return open(file_path, mode)
+
+    try:
+        import zstandard  # type: ignore
+    except ImportError as e:
+        raise ImportError(
+            f"Reading or writing {file_path} requires `pip install zstandard`"
+        ) from e
+
+    if mode == "r":
+        # appended records are written as new zstd frames
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            open(file_path, "rb"), read_across_frames=True, closefd=True
+        )
+        return io.TextIOWrapper(reader, encoding="utf-8")
+
+    writer = zstandard.ZstdCompressor().stream_writer(
+        open(file_path, f"{mode}b"), closefd=True
+    )
+    return io.TextIOWrapper(writer, encoding="utf-8")
+
+
+def find_data_file(directory: str | Path, stem: str) -> Path:
+    """Path of the data file `stem` in `directory` for any of the known formats.
+
+    Defaults to the `.jsonl` path if no such file exists.
+    """
+    directory = Path(directory)
+    for suffix in JSONL_SUFFIXES + (".json",):
+        file_path = directory / f"{stem}{suffix}"
+        if file_path.exists():
+            return file_path
+    return directory / f"{stem}.jsonl"
+
+
+def iter_batches(items: Iterable[T], batch_size: int) -> Iterator[list[T]]:
+    """Split a (lazy) iterable into lists of at most `batch_size` items."""
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, batch_size)):
+        yield batch
+
 
 def load_json(file_path: str | Path) -> dict | list:
     """Load a JSON file from disk."""
@@ -16,72 +91,202 @@ def load_json(file_path: str | Path) -> dict | list:
         return json.load(f)
 
 
+def iter_json_records(file_path: str | Path) -> Iterator[dict]:
+    """Iterate over the records of a JSONL file (or a legacy JSON array).
+
+    Raises:
+        ValueError: if a line other than the last one is not valid JSON
+            (only the last line may be truncated by an interrupted run)
+    """
+    if not is_jsonl(file_path):
+        yield from load_json(file_path)  # type: ignore
+        return
+
+    bad_line_number = None
+    with open_data_file(file_path, "r") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if bad_line_number is not None:
+                raise ValueError(
+                    f"Invalid JSON record at line {bad_line_number} of {file_path}"
+                )
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # skipped if it is the (truncated) last line
+                bad_line_number = line_number
+                continue
+            yield record
+
+
+def share_file(func_data: dict, files: dict[str, tuple[dict, File]]) -> None:
+    """Replace the file data of a record by the `File` validated from the same
+    data in a previous record (so the records of a file share one `File`).
+
+    Args:
+        func_data (dict): record of a function or method (updated in place)
+        files (dict[str, tuple[dict, File]]): {module id -> (file data, File)}
+            of the previous records
+    """
+    file_data = func_data.get("file")
+    try:
+        module_id = file_data["file_module"]["module_id"]["identifier"]  # type: ignore
+    except (KeyError, TypeError):
+        return  # left to the validation of the record
+
+    shared = files.get(module_id)
+    if shared is None or shared[0] != file_data:
+        shared = (file_data, File.model_validate(file_data))
+        files[module_id] = shared
+    func_data["file"] = shared[1]
+
+
+def parse_function(
+    func_data: dict, files: dict[str, tuple[dict, File]] | None = None
+) -> Function | Method:
+    if files is not None:
+        share_file(func_data, files)
+    if func_data.get("function_id"):
+        return Function(**func_data)
+    elif func_data.get("method_id"):
+        return Method(**func_data)
+    else:
+        raise ValueError("Unknown input type")
+
+
+def parse_function_under_test(
+    func_data: dict, files: dict[str, tuple[dict, File]] | None = None
+) -> FunctionUnderTest | MethodUnderTest:
+    if not (func_data.get("function_id") or func_data.get("method_id")):
+        raise ValueError("Unknown input type")
+
+    ## TODO temp due to bad code
+    repo_data = func_data["file"]["file_module"]["repo"]
+    repo_data["repo_name"] = repo_data["repo_id"]
+    repo_data["repo_org"] = repo_data["repo_id"]
+
+    if files is not None:
+        share_file(func_data, files)
+
+    if func_data.get("function_id"):
+        return FunctionUnderTest(**func_data)
+    return MethodUnderTest(**func_data)
+
+
+def iter_functions(file_path: str | Path) -> Iterator[Function | Method]:
+    """Lazily load function and methods data from disk."""
+    files: dict[str, tuple[dict, File]] = {}
+    for func_data in iter_json_records(file_path):
+        yield parse_function(func_data, files)
+
+
+def iter_functions_under_test(
+    file_path: str | Path,
+) -> Iterator[FunctionUnderTest | MethodUnderTest]:
+    """Lazily load FUT data from disk."""
+    files: dict[str, tuple[dict, File]] = {}
+    for func_data in iter_json_records(file_path):
+        yield parse_function_under_test(func_data, files)
+
+
 def load_functions(file_path: str | Path) -> list[Function | Method]:
     """Load function and methods data from disk."""
-    data = load_json(file_path)
-    functions = []
-    for func_data in data:
-        if func_data.get("function_id"):
-            functions.append(Function(**func_data))
-        elif func_data.get("method_id"):
-            functions.append(Method(**func_data))
-        else:
-            raise ValueError("Unknown input type")
-    return functions
+    return list(iter_functions(file_path))
 
 
 def load_functions_under_test(
     file_path: str | Path,
 ) -> list[FunctionUnderTest | MethodUnderTest]:
     """Load FUT data from disk."""
-    data = load_json(file_path)
-    functions = []
-    for func_data in data:
-        if func_data.get("function_id"):
-            ## TODO temp due to bad code
-            func_data["file"]["file_module"]["repo"]["repo_name"] = func_data["file"][
-                "file_module"
-            ]["repo"]["repo_id"]
-            func_data["file"]["file_module"]["repo"]["repo_org"] = func_data["file"][
-                "file_module"
-            ]["repo"]["repo_id"]
-            functions.append(FunctionUnderTest(**func_data))
-        elif func_data.get("method_id"):
-            func_data["file"]["file_module"]["repo"]["repo_name"] = func_data["file"][
-                "file_module"
-            ]["repo"]["repo_id"]
-            func_data["file"]["file_module"]["repo"]["repo_org"] = func_data["file"][
-                "file_module"
-            ]["repo"]["repo_id"]
-            functions.append(MethodUnderTest(**func_data))
+    return list(iter_functions_under_test(file_path))
+
+
+class RecordWriter:
+    """Append-only writer of JSONL records (functions, FUTs, problems, ...).
+
+    Each record is flushed once written so that the records written before
+    an interruption are readable (a partially written last line is skipped
+    by `iter_json_records`).
+
+    Args:
+        file_path (str | Path): `.jsonl` or `.jsonl.zst` file
+        append (bool): keep the existing records of the file
+    """
+
+    def __init__(self, file_path: str | Path, append: bool = False):
+        if not is_jsonl(file_path):
+            raise ValueError(f"Not a JSONL file: {file_path}")
+
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        self.file_path = file_path
+        self.count = 0
+        self._file = open_data_file(file_path, "a" if append else "w")
+        if append and not is_compressed(file_path) and self._ends_mid_line():
+            # start after a truncated last line instead of completing it
+            self._file.write("\n")
+
+    def _ends_mid_line(self) -> bool:
+        with open(self.file_path, "rb") as f:
+            if f.seek(0, os.SEEK_END) == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def write(self, record: BaseModel | dict[str, Any]) -> None:
+        if isinstance(record, BaseModel):
+            line = record.model_dump_json()
         else:
-            raise ValueError("Unknown input type")
-    return functions
+            line = json.dumps(record)
+        self._file.write(line + "\n")
+        self._file.flush()
+        self.count += 1
+
+    def write_many(self, records: Iterable[BaseModel | dict[str, Any]]) -> None:
+        for record in records:
+            self.write(record)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_records(records: Iterable[BaseModel], file_path: str | Path) -> None:
+    """Write models to disk as JSONL records or (legacy) as a JSON array."""
+    if is_jsonl(file_path):
+        with RecordWriter(file_path) as writer:
+            writer.write_many(records)
+        return
+
+    data = [record.model_dump() for record in records]
+    with open(file_path, "w") as f:
+        json.dump(data, f, indent=4)
 
 
 def write_functions(
-    functions: list[Function | Method] | list[FunctionUnderTest], file_path: str | Path
+    functions: Iterable[Function | Method] | Iterable[FunctionUnderTest],
+    file_path: str | Path,
 ) -> None:
     """Write function data to disk."""
-    data = [func.model_dump() for func in functions]
-    with open(file_path, "w") as f:
-        json.dump(data, f, indent=4)
+    write_records(functions, file_path)
 
 
 def write_functions_under_test(
-    functions: list[FunctionUnderTest | MethodUnderTest], file_path: str | Path
+    functions: Iterable[FunctionUnderTest | MethodUnderTest], file_path: str | Path
 ) -> None:
     """Write FUT data to disk."""
-    data = [func.model_dump() for func in functions]
-    with open(file_path, "w") as f:
-        json.dump(data, f, indent=4)
+    write_records(functions, file_path)
 
 
 def write_codegen_problems(
-    codegen_problems: list[CodeGenProblemFunction | CodeGenProblemMethod],
+    codegen_problems: Iterable[CodeGenProblemFunction | CodeGenProblemMethod],
     file_path: str | Path,
 ) -> None:
     """Write codegen problems to disk."""
-    data = [prob.model_dump() for prob in codegen_problems]
-    with open(file_path, "w") as f:
-        json.dump(data, f, indent=4)
+    write_records(codegen_problems, file_path)
@@ -1,20 +1,19 @@
-import os
-import ast
-from typing import Any
+from typing import Any, TypeVar
 import typing_extensions
+from pydantic import BaseModel
 
 from r2e.models.identifier import Identifier
 from r2e.models.module import Module
 from r2e.models.repo import Repo
 from r2e.models.callgraph import CodeElemType
-from r2e.pat.ast.explorer import build_ast_file
-from r2e.paths import R2E_BUCKET_DIR
 
 
 IncEx: typing_extensions.TypeAlias = (
     "set[int] | set[str] | dict[int, Any] | dict[str, Any] | None"
 )
 
+M = TypeVar("M", bound=BaseModel)
+
 
 def get_module_from_identifier(identifier: Identifier, repo: Repo) -> Module:
     """Get the module of a code element given the identifier and repo.
@@ -33,6 +32,14 @@ def get_module_from_identifier(identifier: Identifier, repo: Repo) -> Module:
     Returns:
         Module: module of the code element
     """
+    index = repo.symbol_index
+    if not index.is_empty():
+        module_id = index.resolve_module_id(identifier.identifier)
+        if module_id is None:
+            raise ValueError(f"Could not find module for: {identifier}")
+        return Module(module_id=Identifier(identifier=module_id), repo=repo)
+
+    # no index for the repo (e.g., repo not available locally); probe the filesystem
     func_or_class_module = create_func_or_class_module(identifier, repo)
     meth_module = create_method_module(identifier, repo)
 
@@ -44,6 +51,37 @@ def get_module_from_identifier(identifier: Identifier, repo: Repo) -> Module:
         raise ValueError(f"Could not find module for: {identifier}")
 
 
+def get_method_ids(class_id: Identifier, repo: Repo) -> list[Identifier]:
+    """Get the ids of the methods of a class given its identifier.
+
+    NOTE: answered from the repo's symbol index if it knows the module of
+    the class; otherwise from the typed ids of the repo's call graph.
+
+    Args:
+        class_id (Identifier): identifier of the class
+        repo (Repo): repository of interest
+
+    Raises:
+        ValueError: if neither the symbol index nor the call graph types
+            know the class
+
+    Returns:
+        list[Identifier]: ids of the methods of the class
+    """
+    method_ids = repo.symbol_index.method_ids(class_id.identifier)
+    if method_ids is None:
+        if repo.callgraph is None:
+            raise ValueError("Callgraph not found in the repo")
+
+        if repo.callgraph.id2type is None:
+            raise ValueError("Callgraph id2type not found in the repo")
+
+        # methods of class are the ids one part below `class_id`
+        method_ids = repo.callgraph.trie.children(class_id.identifier)
+
+    return [Identifier(identifier=method_id) for method_id in method_ids]
+
+
 def get_module_from_path(local_path: str, repo: Repo) -> Module:
     """
     Gets the module from a local path in a repo.
@@ -64,8 +102,13 @@ def get_module_from_path(local_path: str, repo: Repo) -> Module:
 def get_type_from_identifier(identifier: Identifier, repo: Repo) -> CodeElemType:
     """Get the type of a code element given its identifier.
 
+    NOTE: answered from the repo's symbol index; ids that do not
+    resolve to a module of the repo are `API` unless their first part
+    names a package/module of the repo.
+
     Args:
         identifier (Identifier): identifier of the code element
+        repo (Repo): repository of interest
 
     Returns:
         CodeElemType: type of the code element
@@ -74,52 +117,7 @@ def get_type_from_identifier(identifier: Identifier, repo: Repo) -> CodeElemType
     if identifier.identifier.startswith("<builtin>"):
         return CodeElemType.BUILTIN
 
-    func_or_class_module = create_func_or_class_module(identifier, repo)
-    meth_module = create_method_module(identifier, repo)
-
-    if func_or_class_module.exists():
-        file_ast = build_ast_file(func_or_class_module.local_path)
-        code_elem_name = identifier.identifier.split(".")[-1]
-
-        for node in file_ast.body:  # type: ignore
-            if (
-                isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
-                and node.name == code_elem_name
-            ):
-                return CodeElemType.FUNCTION
-            elif isinstance(node, ast.ClassDef) and node.name == code_elem_name:
-                return CodeElemType.CLASS
-
-        return CodeElemType.OTHER
-
-    elif meth_module.exists():
-        file_ast = build_ast_file(meth_module.local_path)
-        code_elem_name = identifier.identifier.split(".")[-1]
-        code_elem_parent = identifier.identifier.split(".")[-2]
-
-        for node in file_ast.body:  # type: ignore
-            if isinstance(node, ast.ClassDef) and node.name == code_elem_parent:
-                for n in node.body:
-                    if (
-                        isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))
-                        and n.name == code_elem_name
-                    ):
-                        return CodeElemType.METHOD
-
-        return CodeElemType.OTHER
-
-    else:
-        first_part = identifier.identifier.split(".")[0]
-        paths_in_repo = []
-        for root, dirs, files in os.walk(f"{R2E_BUCKET_DIR}/{repo.local_repo_path}/"):
-            for file in files:
-                if file.endswith(".py"):
-                    paths_in_repo.append(os.path.join(root, file))
-
-        if not any(first_part in path for path in paths_in_repo):
-            return CodeElemType.API
-
-        return CodeElemType.OTHER
+    return repo.symbol_index.get_type(identifier.identifier)
 
 
 def create_func_or_class_module(identifier: Identifier, repo: Repo) -> Module:
@@ -163,3 +161,22 @@ def update_exclude_fields(exclude: IncEx, fields_to_exclude: set[str]) -> IncEx:
     else:
         raise ValueError("exclude must be None, a set, or a dict")
     return exclude
+
+
+def construct_from(model_cls: type[M], obj: BaseModel, **updates: Any) -> M:
+    """Create a model from the fields of an already validated model (e.g., a
+    `FunctionUnderTest` from a `Function`) without dumping and re-validating.
+
+    NOTE: the nested models of `obj` are shared, not copied.
+
+    Args:
+        model_cls (type[M]): model to create
+        obj (BaseModel): validated model whose fields are reused
+        **updates: values of the other (or replaced) fields of `model_cls`
+
+    Returns:
+        M: the model (not validated)
+    """
+    values = {name: getattr(obj, name) for name in type(obj).model_fields}
+    values.update(updates)
+    return model_cls.model_construct(**values)
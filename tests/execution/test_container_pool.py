@@ -0,0 +1,188 @@
+import unittest
+import tempfile
+import threading
+from unittest.mock import patch
+
+from r2e.execution.container_pool import ContainerPool
+from r2e.execution.ports import PortAllocator
+
+
+class FakeSimulator:
+    def __init__(self, repo_id: str, port: int):
+        self.repo_id = repo_id
+        self.port = port
+        self.running = True
+        self.restarts = 0
+        # connection attempts refused after a restart (server still starting)
+        self.starting_attempts = 0
+        self.refused = 0
+
+    def is_running(self) -> bool:
+        return self.running
+
+    def restart_server(self, port: int):
+        self.restarts += 1
+        self.refused = self.starting_attempts
+
+    def stop_container(self):
+        self.running = False
+
+
+class FakeConnection:
+    def __init__(self, port: int):
+        self.port = port
+        self.closed = False
+
+    def ping(self, timeout=None):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class TestContainerPool(unittest.TestCase):
+    def setUp(self):
+        self.simulators: list[FakeSimulator] = []
+        self.lock_dir = tempfile.TemporaryDirectory()
+        self.port_allocator = PortAllocator(lock_dir=self.lock_dir.name)
+        self.pool = ContainerPool(
+            "image",
+            containers_per_repo=2,
+            max_uses=3,
+            port_allocator=self.port_allocator,
+            ready_timeout=5,
+            start_simulator=self.start_simulator,
+            connect=self.connect,  # type: ignore
+        )
+
+    def tearDown(self):
+        self.port_allocator.release_all()
+        self.lock_dir.cleanup()
+
+    def start_simulator(self, repo_id: str, port: int) -> FakeSimulator:
+        simulator = FakeSimulator(repo_id, port)
+        self.simulators.append(simulator)
+        return simulator
+
+    def connect(self, port: int) -> FakeConnection:
+        simulator = next(s for s in self.simulators if s.port == port)
+        if simulator.refused > 0:
+            simulator.refused -= 1
+            raise ConnectionRefusedError(port)
+        return FakeConnection(port)
+
+    def test_reuse_and_reset(self):
+        ports = set()
+        for _ in range(2):
+            with self.pool.lease("repo_a") as conn:
+                ports.add(conn.port)
+
+        self.assertEqual(len(ports), 1)
+        self.assertEqual(self.pool.started, 1)
+        self.assertEqual(self.simulators[0].restarts, 2)
+
+        with self.pool.lease("repo_b") as conn:
+            self.assertNotIn(conn.port, ports)
+        self.assertEqual(self.pool.started, 2)
+
+    def test_recycle_after_max_uses(self):
+        for _ in range(4):
+            with self.pool.lease("repo_a"):
+                pass
+
+        self.assertEqual(self.pool.started, 2)
+        self.assertFalse(self.simulators[0].running)
+        self.assertTrue(self.simulators[1].running)
+
+    def test_reset_waits_for_server(self):
+        with self.pool.lease("repo_a"):
+            pass
+        self.simulators[0].starting_attempts = 2
+        with patch("r2e.execution.container_pool.time.sleep") as sleep:
+            with self.pool.lease("repo_a"):
+                pass
+        # the restarted server is connected to before the container is idle
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(self.simulators[0].refused, 0)
+        self.assertEqual(self.pool.started, 1)
+        self.assertTrue(self.simulators[0].running)
+
+        with self.pool.lease("repo_a"):
+            pass
+        self.assertEqual(self.pool.started, 1)
+
+    def test_reset_timeout_recycles_container(self):
+        self.pool.ready_timeout = 0
+        with self.pool.lease("repo_a"):
+            pass
+        self.simulators[0].starting_attempts = 1
+        with patch("r2e.execution.container_pool.time.sleep"):
+            with self.pool.lease("repo_a"):
+                pass
+
+        self.assertFalse(self.simulators[0].running)
+        self.assertEqual(self.port_allocator.reserved, set())
+        with self.pool.lease("repo_a"):
+            pass
+        self.assertEqual(self.pool.started, 2)
+
+    def test_unhealthy_container_replaced(self):
+        with self.pool.lease("repo_a"):
+            pass
+        self.simulators[0].running = False
+
+        with self.pool.lease("repo_a"):
+            pass
+        self.assertEqual(self.pool.started, 2)
+
+    def test_failed_lease_discards_container(self):
+        with self.assertRaises(RuntimeError):
+            with self.pool.lease("repo_a"):
+                raise RuntimeError("connection lost")
+
+        self.assertFalse(self.simulators[0].running)
+        self.assertEqual(self.port_allocator.reserved, set())
+        with self.pool.lease("repo_a"):
+            pass
+        self.assertEqual(self.pool.started, 2)
+
+    def test_containers_per_repo_limit(self):
+        leased = threading.Barrier(3)
+        release = threading.Event()
+        ports = []
+
+        def run():
+            with self.pool.lease("repo_a") as conn:
+                ports.append(conn.port)
+                leased.wait()
+                release.wait()
+
+        threads = [threading.Thread(target=run) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        leased.wait()
+
+        def run_after_release():
+            with self.pool.lease("repo_a") as conn:
+                ports.append(conn.port)
+
+        # a third lease waits for a container to be released
+        waiter = threading.Thread(target=run_after_release)
+        waiter.start()
+        waiter.join(timeout=0.2)
+        self.assertTrue(waiter.is_alive())
+        self.assertEqual(self.pool.started, 2)
+
+        release.set()
+        for thread in threads + [waiter]:
+            thread.join(timeout=5)
+        self.assertEqual(len(set(ports[:2])), 2)
+        self.assertEqual(self.pool.started, 2)
+
+        self.pool.close()
+        self.assertTrue(all(not s.running for s in self.simulators))
+        self.assertEqual(self.port_allocator.reserved, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import os
+import json
+import unittest
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from r2e.models import Repo, File, Function, Identifier
+from r2e.models import Tests as GeneratedTests
+from r2e.models.fut import FunctionUnderTest
+from r2e.execution.execute_futs import (
+    group_tests,
+    plan_fut_groups,
+    self_equiv_futs,
+    split_submission_logs,
+)
+from r2e.evaluators.testgen import TestGenEvaluator
+from r2e.utils.data import write_functions_under_test
+
+
+class FakeServiceClient:
+    def __init__(self, logs: dict):
+        self.logs = logs
+        self.tests: dict = {}
+        self.funclass_names: list[str] = []
+
+    def setup_repo(self, data):
+        pass
+
+    def setup_function(self, data):
+        self.funclass_names = json.loads(data)["funclass_names"]
+
+    def setup_test(self, data):
+        self.tests = json.loads(data)["generated_tests"]
+
+    def init(self):
+        return {"error": ""}
+
+    def submit(self):
+        return {"logs": json.dumps(self.logs), "error": ""}
+
+
+class FakeConnection:
+    def __init__(self, root: FakeServiceClient):
+        self.root = root
+
+
+class TestExecuteFuts(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.repos_dir = Path(self.test_dir.name)
+        os.makedirs(self.repos_dir / "exec_repo")
+        for name in ["a.py", "b.py"]:
+            with open(self.repos_dir / "exec_repo" / name, "w") as f:
+                f.write("def f(x):\n    return x\n")
+
+        self.patch = patch("r2e.models.repo.REPOS_DIR", self.repos_dir)
+        self.patch.start()
+        self.repo = Repo(
+            repo_org="exec_repo",
+            repo_name="exec_repo",
+            repo_id="exec_repo",
+            local_repo_path="exec_repo",
+        )
+
+    def tearDown(self):
+        self.patch.stop()
+        self.test_dir.cleanup()
+
+    def make_fut(self, file_name: str, name: str) -> FunctionUnderTest:
+        file = File.from_file_path(
+            str(self.repos_dir / "exec_repo" / file_name), self.repo
+        )
+        fut = FunctionUnderTest.from_function(
+            Function(
+                function_id=Identifier(identifier=f"{file_name[:-3]}.{name}"),
+                file=file,
+                function_code="",
+                function_name=name,
+            )
+        )
+        fut.update_history(GeneratedTests(tests={"test_0": f"# {name}"}))
+        return fut
+
+    def test_plan_fut_groups(self):
+        futs = [
+            self.make_fut("a.py", "f"),
+            self.make_fut("b.py", "f"),
+            self.make_fut("a.py", "g"),
+            self.make_fut("a.py", "f"),
+            self.make_fut("a.py", "h"),
+        ]
+        groups = plan_fut_groups(futs, max_group_size=8)
+        self.assertEqual(
+            [[fut.id for fut in group] for group in groups],
+            [
+                [futs[0].id, futs[2].id],
+                [futs[1].id],
+                [futs[3].id, futs[4].id],
+            ],
+        )
+        self.assertEqual(len(plan_fut_groups(futs, max_group_size=1)), 5)
+
+    def test_group_and_split(self):
+        futs = [self.make_fut("a.py", "f"), self.make_fut("a.py", "g")]
+        self.assertEqual(group_tests(futs[:1]), {"test_0": "# f"})
+        self.assertEqual(
+            group_tests(futs), {"fut0__test_0": "# f", "fut1__test_0": "# g"}
+        )
+
+        logs = {
+            "run_tests_logs": {
+                "fut0__test_0": {"valid": True},
+                "fut1__test_0": {"valid": False},
+            },
+            "coverage_logs": [{"f": 1}, {"g": 2}],
+        }
+        fut_logs = split_submission_logs(futs, logs)
+        self.assertEqual(fut_logs[0]["run_tests_logs"], {"test_0": {"valid": True}})
+        self.assertEqual(fut_logs[1]["run_tests_logs"], {"test_0": {"valid": False}})
+        self.assertEqual(fut_logs[1]["coverage_logs"], [{"g": 2}])
+
+    def test_split_unmatched_coverage_is_empty(self):
+        futs = [self.make_fut("a.py", "f"), self.make_fut("a.py", "g")]
+        logs = {"run_tests_logs": {}, "coverage_logs": [{"f": 1, "g": 2}]}
+        with self.assertLogs("r2e", level="WARNING"):
+            fut_logs = split_submission_logs(futs, logs)
+        self.assertEqual([x["coverage_logs"] for x in fut_logs], [[], []])
+
+    def test_evaluate_split_logs(self):
+        futs = [self.make_fut("a.py", name) for name in ["f", "g", "h", "i"]]
+        test_logs = {
+            "valid": True,
+            "passed_count": 1,
+            "failed_count": 0,
+            "errored_count": 0,
+        }
+        coverage = {
+            "num_executable_lines": 2,
+            "num_excluded_lines": 0,
+            "num_unexecuted_lines": 0,
+            "num_executed_branches": 0,
+            "line_coverage_percentage": 100.0,
+            "branch_coverage_percentage": 100.0,
+        }
+        split = {
+            "run_tests_logs": {"fut0__test_0": test_logs, "fut1__test_0": test_logs},
+            "coverage_logs": [coverage, coverage],
+        }
+        unsplit = dict(split, coverage_logs=[coverage])
+        for fut, logs in zip(futs[:2], split_submission_logs(futs[:2], split)):
+            fut.update_exec_stats(logs)
+        with self.assertLogs("r2e", level="WARNING"):
+            unsplit_logs = split_submission_logs(futs[2:], unsplit)
+        for fut, logs in zip(futs[2:], unsplit_logs):
+            fut.update_exec_stats(logs)
+
+        file_path = self.repos_dir / "futs.jsonl"
+        write_functions_under_test(futs, file_path)
+        evaluator = TestGenEvaluator(file_path)
+        evaluator.evaluate()
+        self.assertEqual(evaluator.overall_metrics["valid"], 4)
+        self.assertEqual(evaluator.coverage_metrics["valid_line_cov"], [100.0] * 2)
+
+    def test_self_equiv_multiple_futs(self):
+        futs = [self.make_fut("a.py", "f"), self.make_fut("a.py", "g")]
+        client = FakeServiceClient(
+            {
+                "run_tests_logs": {
+                    "fut0__test_0": {"valid": True},
+                    "fut1__test_0": {"valid": True},
+                },
+                "coverage_logs": [{}, {}],
+            }
+        )
+        success, _, _ = self_equiv_futs(futs, FakeConnection(client))  # type: ignore
+
+        self.assertTrue(success)
+        self.assertEqual(client.funclass_names, ["f", "g"])
+        self.assertEqual(len(client.tests), 2)
+        for fut in futs:
+            self.assertEqual(
+                fut.exec_stats["run_tests_logs"], {"test_0": {"valid": True}}  # type: ignore
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
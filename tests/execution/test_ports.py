@@ -0,0 +1,68 @@
+import os
+import socket
+import unittest
+import tempfile
+import subprocess
+from pathlib import Path
+
+from r2e.execution.ports import PortAllocator, is_port_free
+
+
+class TestPortAllocator(unittest.TestCase):
+    def setUp(self):
+        self.lock_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.lock_dir.cleanup()
+
+    def make_allocator(self, start=20000, end=20010) -> PortAllocator:
+        return PortAllocator(start=start, end=end, lock_dir=self.lock_dir.name)
+
+    def test_allocations_are_unique_across_allocators(self):
+        first, second = self.make_allocator(), self.make_allocator()
+        ports = [first.allocate() for _ in range(3)]
+        ports += [second.allocate() for _ in range(3)]
+        self.assertEqual(len(set(ports)), 6)
+        self.assertTrue(all(20000 <= port < 20010 for port in ports))
+
+    def test_release(self):
+        allocator = self.make_allocator(end=20001)
+        port = allocator.allocate()
+        with self.assertRaises(RuntimeError):
+            allocator.allocate()
+
+        allocator.release(port)
+        self.assertFalse((Path(self.lock_dir.name) / f"{port}.lock").exists())
+        self.assertEqual(allocator.allocate(), port)
+
+    def test_stale_lock_reclaimed(self):
+        proc = subprocess.Popen(["true"])
+        proc.wait()
+        lock_path = Path(self.lock_dir.name) / "20000.lock"
+        lock_path.write_text(str(proc.pid))
+
+        allocator = self.make_allocator(end=20001)
+        self.assertEqual(allocator.allocate(), 20000)
+        self.assertEqual(lock_path.read_text(), str(os.getpid()))
+
+    def test_live_lock_respected(self):
+        lock_path = Path(self.lock_dir.name) / "20000.lock"
+        lock_path.write_text(str(os.getppid()))
+
+        allocator = self.make_allocator(end=20002)
+        self.assertEqual(allocator.allocate(), 20001)
+
+    def test_bound_port_skipped(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(("0.0.0.0", 0))
+            port = sock.getsockname()[1]
+            self.assertFalse(is_port_free(port))
+
+            allocator = self.make_allocator(start=port, end=port + 1)
+            with self.assertRaises(RuntimeError):
+                allocator.allocate()
+            self.assertFalse((Path(self.lock_dir.name) / f"{port}.lock").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+import os
+import unittest
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from r2e.models import Repo, File, Function, Identifier
+from r2e.models import Tests as GeneratedTests
+from r2e.models.fut import FunctionUnderTest
+from r2e.execution.execution_args import ExecutionArgs
+from r2e.execution.run_self_equiv import run_self_equiv
+from r2e.execution.container_pool import ContainerPool
+from r2e.execution.ports import PortAllocator
+from r2e.multiprocess import TaskResult, TaskRunStatus
+from r2e.utils.data import load_functions_under_test, write_functions_under_test
+from tests.execution.test_container_pool import FakeConnection, FakeSimulator
+
+
+class TestRunSelfEquivResume(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.testgen_dir = Path(self.test_dir.name) / "testgen"
+        self.repos_dir = Path(self.test_dir.name) / "repos"
+        os.makedirs(self.repos_dir / "exec_repo")
+        with open(self.repos_dir / "exec_repo" / "api.py", "w") as f:
+            f.write("def first(x):\n    return x\n")
+
+        self.patches = [
+            patch("r2e.models.repo.REPOS_DIR", self.repos_dir),
+            patch("r2e.execution.run_self_equiv.TESTGEN_DIR", self.testgen_dir),
+            patch(
+                "r2e.execution.run_self_equiv.run_futs_with_port", self.fake_run_futs
+            ),
+        ]
+        for p in self.patches:
+            p.start()
+
+        repo = Repo(
+            repo_org="exec_repo",
+            repo_name="exec_repo",
+            repo_id="exec_repo",
+            local_repo_path="exec_repo",
+        )
+        self.file = File.from_file_path(
+            str(self.repos_dir / "exec_repo" / "api.py"), repo
+        )
+        self.write_input({"first": "v1", "second": "v1", "third": "v1"})
+
+        self.executed: list[str] = []
+        self.submissions: list[list[str]] = []
+        self.crash_on: str | None = "third"
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.test_dir.cleanup()
+
+    def write_input(self, test_versions: dict[str, str]):
+        futs = []
+        for name, version in test_versions.items():
+            fut = FunctionUnderTest.from_function(
+                Function(
+                    function_id=Identifier(identifier=f"api.{name}"),
+                    file=self.file,
+                    function_code="",
+                    function_name=name,
+                )
+            )
+            fut.update_history(GeneratedTests(tests={"test_0": version}))
+            futs.append(fut)
+        write_functions_under_test(futs, self.testgen_dir / "exp.jsonl")
+
+    def fake_run_futs(self, futs, port, image_name):
+        self.submissions.append([fut.name for fut in futs])
+        for fut in futs:
+            if fut.name == self.crash_on:
+                raise KeyboardInterrupt
+            self.executed.append(fut.name)
+            if fut.name == "second" and self.crash_on is not None:
+                fut.update_exec_stats({"error": "service error"})
+            else:
+                fut.update_exec_stats({"run_tests_logs": {}})
+        return futs
+
+    def run_exec(self, **kwargs):
+        kwargs.setdefault("max_futs_per_run", 1)
+        kwargs.setdefault("execution_multiprocess", 0)
+        exec_args = ExecutionArgs(
+            testgen_exp_id="exp",
+            containers_per_repo=0,
+            **kwargs,
+        )
+        run_self_equiv(exec_args)
+
+    def get_output(self) -> dict[str, dict]:
+        futs = load_functions_under_test(self.testgen_dir / "exp_out.jsonl")
+        self.assertEqual(len(futs), len({fut.id for fut in futs}))
+        return {fut.name: fut.exec_stats for fut in futs}  # type: ignore
+
+    def test_resume_and_retry_failed(self):
+        # completed FUTs are checkpointed before the crash
+        with self.assertRaises(KeyboardInterrupt):
+            self.run_exec()
+        self.assertEqual(self.executed, ["first", "second"])
+        self.assertEqual(set(self.get_output()), {"first", "second"})
+
+        self.crash_on = None
+        self.executed = []
+        self.run_exec(resume=True)
+        self.assertEqual(self.executed, ["third"])
+        self.assertEqual(self.get_output()["second"], {"error": "service error"})
+
+        self.executed = []
+        self.run_exec(retry_failed=True)
+        self.assertEqual(self.executed, ["second"])
+        self.assertEqual(self.get_output()["second"], {"run_tests_logs": {}})
+
+    def test_resume_reruns_changed_tests(self):
+        self.crash_on = None
+        self.run_exec()
+        self.assertEqual(len(self.get_output()), 3)
+
+        self.write_input({"first": "v2", "second": "v1", "third": "v1"})
+        self.executed = []
+        self.run_exec(resume=True)
+        self.assertEqual(self.executed, ["first"])
+        self.assertEqual(len(self.get_output()), 3)
+
+    def test_no_resume_overwrites(self):
+        self.crash_on = None
+        self.run_exec()
+        self.executed = []
+        self.run_exec()
+        self.assertEqual(self.executed, ["first", "second", "third"])
+        self.assertEqual(len(self.get_output()), 3)
+
+    def test_futs_of_a_file_batched(self):
+        self.crash_on = None
+        self.run_exec(max_futs_per_run=2)
+        self.assertEqual(self.submissions, [["first", "second"], ["third"]])
+        self.assertEqual(len(self.get_output()), 3)
+
+    def test_unsplit_coverage_reruns_futs(self):
+        def run_futs(futs, port, image_name):
+            self.submissions.append([fut.name for fut in futs])
+            # a group's coverage cannot be split (see `split_submission_logs`)
+            coverage_logs = [{}] if len(futs) == 1 else []
+            for fut in futs:
+                fut.update_exec_stats(
+                    {"run_tests_logs": {}, "coverage_logs": coverage_logs}
+                )
+            return futs
+
+        with patch("r2e.execution.run_self_equiv.run_futs_with_port", run_futs):
+            self.run_exec(max_futs_per_run=2)
+        self.assertEqual(
+            self.submissions, [["first", "second"], ["first"], ["second"], ["third"]]
+        )
+        for exec_stats in self.get_output().values():
+            self.assertEqual(exec_stats["coverage_logs"], [{}])
+
+    def test_failed_groups_get_error_records(self):
+        self.crash_on = None
+        timeouts = []
+
+        def run_tasks(func, tasks, timeout_per_task, **kwargs):
+            timeouts.append(timeout_per_task)
+            (first_group, image_name), _ = tasks
+            yield TaskResult(
+                status=TaskRunStatus.SUCCESS,
+                result=self.fake_run_futs(first_group, 0, image_name),
+            )
+            yield TaskResult(status=TaskRunStatus.TIMEOUT)
+
+        with patch(
+            "r2e.execution.run_self_equiv.run_tasks_in_parallel_iter", run_tasks
+        ):
+            self.run_exec(max_futs_per_run=2, execution_multiprocess=2)
+
+        # the group of 2 FUTs may run them twice (see `run_planned_futs`)
+        self.assertEqual(timeouts, [180 * 4])
+        output = self.get_output()
+        self.assertEqual(output["first"], {"run_tests_logs": {}})
+        self.assertEqual(output["third"], {"error": "Task timeout"})
+
+    def test_failed_group_error_without_multiprocess(self):
+        def run_futs(futs, port, image_name):
+            raise RuntimeError("service down")
+
+        with patch("r2e.execution.run_self_equiv.run_futs_with_port", run_futs):
+            self.run_exec()
+
+        output = self.get_output()
+        self.assertEqual(set(output), {"first", "second", "third"})
+        for exec_stats in output.values():
+            self.assertIn("RuntimeError: service down", exec_stats["error"])
+
+    def test_container_pool(self):
+        started: list[str] = []
+
+        def start_simulator(repo_id, port):
+            started.append(repo_id)
+            return FakeSimulator(repo_id, port)
+
+        def make_pool(image_name, **kwargs):
+            return ContainerPool(
+                image_name,
+                start_simulator=start_simulator,  # type: ignore
+                connect=FakeConnection,  # type: ignore
+                port_allocator=PortAllocator(lock_dir=self.test_dir.name),
+                **kwargs,
+            )
+
+        submissions = []
+
+        def fake_self_equiv_futs(futs, conn):
+            submissions.append(len(futs))
+            for fut in futs:
+                fut.update_exec_stats({"run_tests_logs": {}, "port": conn.port})
+            return True, "", futs[0]
+
+        with patch("r2e.execution.run_self_equiv.ContainerPool", make_pool), patch(
+            "r2e.execution.run_self_equiv.self_equiv_futs", fake_self_equiv_futs
+        ):
+            run_self_equiv(
+                ExecutionArgs(
+                    testgen_exp_id="exp",
+                    execution_multiprocess=2,
+                    containers_per_repo=1,
+                )
+            )
+
+        # all the FUTs of the file ran in one submission on a warm container
+        self.assertEqual(started, ["exec_repo"])
+        self.assertEqual(submissions, [3])
+        output = self.get_output()
+        self.assertEqual(len(output), 3)
+        self.assertEqual(len({stats["port"] for stats in output.values()}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import unittest
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from r2e.models import Repo, File, Function, Identifier, Context
+from r2e.generators.context.cache import ContextCache
+from r2e.generators.context.format import ContextFormat
+from r2e.generators.context.utils import generate_contexts
+
+API_CODE = """
+from helpers import helper
+
+
+def target(x):
+    return helper(x) + 1
+"""
+
+HELPERS_CODE = """
+def helper(x):
+    return x * 2
+"""
+
+
+class TestContextCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.repos_dir = Path(self.test_dir.name) / "repos"
+        self.repo_dir = self.repos_dir / "ctx_repo"
+        os.makedirs(self.repo_dir)
+        self.write_file("api.py", API_CODE)
+        self.write_file("helpers.py", HELPERS_CODE)
+
+        self.patch = patch("r2e.models.repo.REPOS_DIR", self.repos_dir)
+        self.patch.start()
+        repo = Repo(
+            repo_org="ctx_repo",
+            repo_name="ctx_repo",
+            repo_id="ctx_repo",
+            local_repo_path="ctx_repo",
+        )
+        file = File.from_file_path(str(self.repo_dir / "api.py"), repo)
+        self.function = Function(
+            function_id=Identifier(identifier="api.target"),
+            file=file,
+            function_code="def target(x):\n    return helper(x) + 1\n",
+            function_name="target",
+        )
+        self.context = Context(context="def helper(x): ...", context_type="sliced")
+        self.cache = ContextCache(Path(self.test_dir.name) / "context_cache.sqlite")
+
+    def tearDown(self):
+        self.cache.close()
+        self.patch.stop()
+        self.test_dir.cleanup()
+
+    def write_file(self, name: str, code: str):
+        with open(self.repo_dir / name, "w") as f:
+            f.write(code)
+
+    def put(self, max_context_size: int = 6000):
+        self.cache.put(
+            self.function,
+            "sliced",
+            max_context_size,
+            self.context,
+            ["api.py", "helpers.py"],
+        )
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(self.cache.get(self.function, "sliced", 6000))
+        self.put()
+        self.assertEqual(self.cache.get(self.function, "sliced", 6000), self.context)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(self.cache.hit_rate, 0.5)
+
+    def test_key_params(self):
+        self.put()
+        self.assertIsNone(self.cache.get(self.function, "full", 6000))
+        self.assertIsNone(self.cache.get(self.function, "sliced", 4000))
+        self.assertIsNone(
+            self.cache.get(self.function, "sliced", 6000, ContextFormat.PATH_COMMENT)
+        )
+
+    def test_invalidated_by_file_change(self):
+        self.put()
+        self.write_file("helpers.py", HELPERS_CODE + "\n\nLIMIT = 10\n")
+        self.assertIsNone(self.cache.get(self.function, "sliced", 6000))
+
+        os.remove(self.repo_dir / "helpers.py")
+        self.assertIsNone(self.cache.get(self.function, "sliced", 6000))
+
+    def test_persisted(self):
+        self.put()
+        self.cache.save()
+        cache = ContextCache(self.cache.cache_path)
+        self.assertEqual(cache.get(self.function, "sliced", 6000), self.context)
+        cache.close()
+
+    def test_generate_contexts_from_cache(self):
+        self.put()
+        with patch(
+            "r2e.generators.context.utils.run_tasks_in_parallel_iter"
+        ) as run_tasks:
+            (result,) = generate_contexts(
+                [self.function], "sliced", 6000, cache=self.cache
+            )
+        run_tasks.assert_not_called()
+        self.assertTrue(result.is_success())
+        self.assertEqual(result.result, self.context)
+
+
+if __name__ == "__main__":
+    unittest.main()
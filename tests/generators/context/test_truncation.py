@@ -0,0 +1,211 @@
+import os
+import re
+import ast
+import unittest
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from r2e.models import Repo, File, Function, Identifier
+from r2e.generators.context.base import ContextCreator
+from r2e.generators.context.format import ContextFormatter
+from r2e.generators.context.truncation import TruncatableCode
+
+HELPERS_CODE = '''
+import os
+
+CONSTANT = 1
+
+
+def helper_a(x):
+    """Helper a"""
+    return x + CONSTANT
+
+
+class Helper:
+    value = 2
+
+    def first(self):
+        return self.value
+
+    def second(self, y):
+        return [i * y for i in range(10)]
+
+
+def helper_b(x, y):
+    return helper_a(x) * y
+'''
+
+UTILS_CODE = """
+# only comments in the file
+"""
+
+API_CODE = """
+from helpers import helper_a, Helper
+
+LIMIT = 10
+
+
+class Store:
+    def __init__(self):
+        self.items = []
+
+    def add(self, item):
+        self.items.append(item)
+
+
+def unrelated(a, b):
+    return a - b
+
+
+def target(x):
+    return helper_a(x) + Helper().first()
+
+
+def after(x):
+    return target(x) * 2
+"""
+
+
+class WordTokenizer:
+    """Deterministic stand-in for a BPE tokenizer"""
+
+    def __init__(self):
+        self.num_chars = 0
+
+    def encode(self, text: str, disallowed_special=()) -> list[str]:
+        self.num_chars += len(text)
+        return re.findall(r"\w+|[^\w\s]|\n", text)
+
+
+class ReferenceContextCreator(ContextCreator):
+    """Truncation by re-rendering and re-tokenizing after every removal"""
+
+    def truncate_external_context(self):
+        file2code_map = self.file2code.copy()
+        fut_rel_path = self.full_to_rel_path(self.func_meth.file_path)
+        fut_code = file2code_map.pop(fut_rel_path)
+
+        while self.context_size > self.max_context_size and len(file2code_map) > 0:  # type: ignore
+            last_file = list(file2code_map.keys())[0]
+            last_code = file2code_map[last_file]
+            if ast.parse(last_code).body == []:
+                file2code_map.pop(last_file)
+            else:
+                truncated_code = self._remove_last_ast_node(last_code)
+                file2code_map[last_file] = f"{truncated_code}\n\n# ..."
+
+            self.context = ""
+            for rel_path, code in file2code_map.items():
+                self.context += ContextFormatter.format(code, rel_path, self.format)
+            self.context += ContextFormatter.format(fut_code, fut_rel_path, self.format)
+
+    def truncate_file_context(self):
+        fut_rel_path = self.full_to_rel_path(self.func_meth.file_path)
+        code = self.file2code[fut_rel_path]
+        code, func_class_code = self._remove_func_class_from_file(code, self.func_meth)
+
+        while self.context_size > self.max_context_size and ast.parse(code).body != []:  # type: ignore
+            code = self._remove_last_ast_node(code)
+            if ast.parse(code).body == []:
+                self.context = ContextFormatter.format(
+                    func_class_code, fut_rel_path, self.format
+                )
+                break
+            else:
+                code += "\n\n# ..."
+            formatted_code = self._append_code(code, func_class_code)
+            self.context = ContextFormatter.format(
+                formatted_code, fut_rel_path, self.format
+            )
+
+
+class TestContextTruncation(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.repos_dir = Path(self.test_dir.name)
+        repo_dir = self.repos_dir / "ctx_repo"
+        os.makedirs(repo_dir)
+        for name, code in [
+            ("helpers.py", HELPERS_CODE),
+            ("utils.py", UTILS_CODE),
+            ("api.py", API_CODE),
+        ]:
+            with open(repo_dir / name, "w") as f:
+                f.write(code)
+
+        self.patch = patch("r2e.models.repo.REPOS_DIR", self.repos_dir)
+        self.patch.start()
+        repo = Repo(
+            repo_org="ctx_repo",
+            repo_name="ctx_repo",
+            repo_id="ctx_repo",
+            local_repo_path="ctx_repo",
+        )
+        file = File.from_file_path(str(repo_dir / "api.py"), repo)
+        self.function = Function(
+            function_id=Identifier(identifier="api.target"),
+            file=file,
+            function_code="def target(x):\n    return helper_a(x) + Helper().first()\n",
+            function_name="target",
+        )
+
+    def tearDown(self):
+        self.patch.stop()
+        self.test_dir.cleanup()
+
+    def make_creator(self, cls, max_context_size: int, tokenizer=None, extra_files={}):
+        creator = cls(
+            self.function, max_context_size, tokenizer=tokenizer or WordTokenizer()
+        )
+        creator.file2code = {
+            **extra_files,
+            "utils.py": UTILS_CODE,
+            "helpers.py": HELPERS_CODE,
+            "api.py": API_CODE,
+        }
+        for rel_path, code in creator.file2code.items():
+            creator.context += ContextFormatter.format(code, rel_path, creator.format)
+        return creator
+
+    def test_same_context_as_reference(self):
+        full_size = self.make_creator(ContextCreator, 10**6).context_size
+        for max_context_size in range(10, full_size + 20, 7):
+            expected = self.make_creator(ReferenceContextCreator, max_context_size)
+            expected.truncate_context()
+            actual = self.make_creator(ContextCreator, max_context_size)
+            actual.truncate_context()
+            self.assertEqual(actual.context, expected.context, max_context_size)
+
+    def test_less_text_tokenized(self):
+        large_code = "\n\n".join(
+            f"def func_{i}(x):\n    return x + {i}\n" for i in range(200)
+        )
+        extra_files = {"large.py": large_code}
+        reference_tokenizer, tokenizer = WordTokenizer(), WordTokenizer()
+        expected = self.make_creator(
+            ReferenceContextCreator, 200, reference_tokenizer, extra_files
+        )
+        expected.truncate_context()
+        actual = self.make_creator(ContextCreator, 200, tokenizer, extra_files)
+        actual.truncate_context()
+
+        self.assertEqual(actual.context, expected.context)
+        self.assertLess(tokenizer.num_chars, reference_tokenizer.num_chars / 20)
+
+    def test_truncatable_code_steps(self):
+        truncatable = TruncatableCode(HELPERS_CODE, lambda text: len(text.split()))
+        # import, constant, helper_a, class (value, first, second), helper_b
+        self.assertEqual(truncatable.num_steps, 7)
+        self.assertNotIn("helper_b", truncatable.unparse(1))
+        self.assertNotIn("second", truncatable.unparse(2))
+        self.assertIn("first", truncatable.unparse(2))
+        self.assertNotIn("class Helper", truncatable.unparse(4))
+        self.assertEqual(truncatable.unparse(7), "")
+        self.assertEqual(truncatable.tokens_after(7), 0)
+        # the parsed nodes are not modified by unparsing a step
+        self.assertIn("def second", truncatable.unparse(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
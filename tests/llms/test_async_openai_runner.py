@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import asyncio
+import unittest
+import tempfile
+import threading
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from r2e.llms.llm_args import LLMArgs
+from r2e.llms.cache_object import Cache
+from r2e.llms.language_model import LanguageModel, LanguageModelStyle
+from r2e.llms.async_openai_runner import AsyncOpenAIRunner
+from r2e.llms.rate_limit import RateLimiter, TokenBucket, parse_duration
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """Stand-in for the chat completions endpoint of the OpenAI API"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeOpenAIHandler)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.num_requests = 0
+        self.requested_n: list[int] = []
+        self.rate_limited: set[str] = set()
+        self.fail: set[str] = set()
+        self.headers = {
+            "x-ratelimit-limit-requests": "6000",
+            "x-ratelimit-remaining-requests": "5999",
+        }
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    server: FakeOpenAIServer
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][-1]["content"]
+        server = self.server
+        with server.lock:
+            server.num_requests += 1
+            server.requested_n.append(body["n"])
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            rate_limited = prompt in server.rate_limited
+            server.rate_limited.discard(prompt)
+        time.sleep(0.05)
+        with server.lock:
+            server.in_flight -= 1
+
+        if rate_limited:
+            self.send_json(
+                429, {"error": {"message": "Rate limit"}}, {"retry-after-ms": "10"}
+            )
+        elif prompt in server.fail:
+            self.send_json(400, {"error": {"message": "Bad request"}})
+        else:
+            choices = [
+                {
+                    "index": i,
+                    "message": {"role": "assistant", "content": f"{prompt}:{i}"},
+                    "finish_reason": "stop",
+                }
+                for i in range(body["n"])
+            ]
+            completion = {
+                "id": "chatcmpl-0",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": choices,
+            }
+            self.send_json(200, completion, server.headers)
+
+    def send_json(self, status: int, data: dict, headers: dict = {}):
+        content = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class TestAsyncOpenAIRunner(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeOpenAIServer()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.env = patch.dict(
+            os.environ, {"OPENAI_KEY": "test", "OPENAI_BASE_URL": base_url}
+        )
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def make_runner(self, **kwargs) -> AsyncOpenAIRunner:
+        args = LLMArgs(
+            model_name="gpt-4-turbo-2024-04-09",
+            use_cache=False,
+            backoff_base=0.01,
+            **kwargs,
+        )
+        model = LanguageModel(args.model_name, LanguageModelStyle.OpenAI)
+        return AsyncOpenAIRunner(args, model)
+
+    @staticmethod
+    def payload(prompt: str) -> list[dict[str, str]]:
+        return [{"role": "user", "content": prompt}]
+
+    def test_max_in_flight(self):
+        runner = self.make_runner(max_in_flight=3, n=2)
+        outputs = runner.run_main([self.payload(f"p{i}") for i in range(12)])
+
+        self.assertEqual(outputs, [[f"p{i}:0", f"p{i}:1"] for i in range(12)])
+        self.assertEqual(self.server.max_in_flight, 3)
+        self.assertEqual(runner.rate_limiter.requests.limit, 6000)
+
+    def test_no_barrier_between_cache_batches(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            runner = self.make_runner(max_in_flight=4, cache_batch_size=1)
+            runner.cache = Cache(runner.cache_key_params(), cache_dir=cache_dir)
+            with patch.object(
+                runner, "save_cache", wraps=runner.save_cache
+            ) as save_cache:
+                outputs = runner.run_main([self.payload(f"p{i}") for i in range(8)])
+
+            self.assertEqual(outputs, [[f"p{i}:0"] for i in range(8)])
+            self.assertEqual(self.server.max_in_flight, 4)
+            # saved as the completions arrive (and once at the end)
+            self.assertEqual(save_cache.call_count, 9)
+            self.assertEqual(runner.cache.get_samples(self.payload("p7")), ["p7:0"])
+
+    def test_retries_and_failures(self):
+        self.server.rate_limited = {"p1", "p2"}
+        self.server.fail = {"p3"}
+        runner = self.make_runner(max_in_flight=4)
+        outputs = runner.run_main([self.payload(f"p{i}") for i in range(4)])
+
+        self.assertEqual(outputs, [["p0:0"], ["p1:0"], ["p2:0"], [""]])
+        self.assertEqual(self.server.num_requests, 6)
+
+    def test_partial_cache_hit(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            runner = self.make_runner(n=3)
+            runner.cache = Cache(runner.cache_key_params(), cache_dir=cache_dir)
+            runner.cache.add_to_cache(self.payload("p0"), ["cached"])
+
+            outputs = runner.run_main([self.payload("p0")])
+            self.assertEqual(outputs, [["cached", "p0:0", "p0:1"]])
+            self.assertEqual(self.server.requested_n, [2])
+            self.assertEqual(len(runner.cache.get_samples(self.payload("p0"))), 3)
+
+    def test_request_rate_limit(self):
+        # 60 requests/minute with 2 remaining: the third request waits ~1 second
+        self.server.headers = {
+            "x-ratelimit-limit-requests": "60",
+            "x-ratelimit-remaining-requests": "2",
+        }
+        runner = self.make_runner(max_in_flight=8)
+        runner.run_main([self.payload("p0")])
+
+        start = time.monotonic()
+        runner.run_main([self.payload(f"p{i}") for i in range(3)])
+        self.assertGreater(time.monotonic() - start, 0.8)
+
+
+class TestRateLimit(unittest.TestCase):
+    def test_parse_duration(self):
+        self.assertEqual(parse_duration("20ms"), 0.02)
+        self.assertEqual(parse_duration("6m0s"), 360)
+        self.assertEqual(parse_duration("1.5s"), 1.5)
+        self.assertEqual(parse_duration("2"), 2)
+        self.assertIsNone(parse_duration(None))
+
+    def test_token_bucket(self):
+        bucket = TokenBucket()
+        self.assertEqual(bucket.wait_time(10**6), 0)
+
+        bucket.update(limit=600, remaining=100)
+        self.assertEqual(bucket.wait_time(50), 0)
+        bucket.consume(100)
+        # refilled at 10 tokens per second
+        self.assertAlmostEqual(bucket.wait_time(10), 1, delta=0.05)
+
+    def test_limiter_pause(self):
+        limiter = RateLimiter()
+        limiter.pause(0.2)
+        start = time.monotonic()
+        asyncio.run(limiter.acquire(1))
+        self.assertGreater(time.monotonic() - start, 0.15)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import tempfile
+
+from r2e.llms.llm_args import LLMArgs
+from r2e.llms.base_runner import BaseRunner
+from r2e.llms.cache_object import Cache
+from r2e.llms.language_model import LanguageModel, LanguageModelStyle
+
+
+class CountingRunner(BaseRunner):
+    def __init__(self, args: LLMArgs, cache_dir: str):
+        super().__init__(args, LanguageModel(args.model_name, LanguageModelStyle.VLLM))
+        self.cache = Cache(self.cache_key_params(), cache_dir=cache_dir)
+        self.requests: list[tuple[str, int]] = []
+
+    def _run_single(self, payload, n=None) -> list[str]:
+        n = self.args.n if n is None else n
+        self.requests.append((payload, n))
+        num_cached = len(self.cache.get_samples(payload))  # type: ignore
+        return [f"{payload}:{num_cached + i}" for i in range(n)]
+
+
+class TestBaseRunnerCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def make_runner(self, **kwargs) -> CountingRunner:
+        return CountingRunner(LLMArgs(model_name="m", **kwargs), self.cache_dir.name)
+
+    def test_partial_hits_request_missing_samples(self):
+        runner = self.make_runner(n=3)
+        self.assertEqual(runner.run_main(["p"]), [["p:0", "p:1", "p:2"]])
+
+        runner = self.make_runner(n=5)
+        self.assertEqual(runner.run_main(["p", "q"])[0], [f"p:{i}" for i in range(5)])
+        self.assertEqual(runner.requests, [("p", 2), ("q", 5)])
+
+        # fewer samples than cached: no requests
+        runner = self.make_runner(n=2)
+        self.assertEqual(runner.run_main(["p", "q"]), [["p:0", "p:1"], ["q:0", "q:1"]])
+        self.assertEqual(runner.requests, [])
+
+    def test_sampling_params_in_key(self):
+        self.make_runner(n=1, temperature=0.2).run_main(["p"])
+
+        runner = self.make_runner(n=1, temperature=0.8)
+        runner.run_main(["p"])
+        self.assertEqual(runner.requests, [("p", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import json
+import pickle
+import sqlite3
+import unittest
+import tempfile
+import multiprocessing as mp
+from pathlib import Path
+from unittest.mock import patch
+
+from r2e.llms.cache_object import Cache
+
+
+def write_entries(cache_dir: str, worker: int):
+    cache = Cache({"model": "m"}, cache_dir=cache_dir, num_shards=4)
+    for i in range(50):
+        cache.add_to_cache(f"w{worker}_{i}", [f"out{i}"])
+    cache.save_cache()
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def make_cache(self, **key_params) -> Cache:
+        return Cache(key_params, cache_dir=self.cache_dir.name, num_shards=4)
+
+    def test_add_and_get(self):
+        cache = self.make_cache(model="m", n=1)
+        payload = [{"role": "user", "content": "hi"}]
+        self.assertIsNone(cache.get_from_cache(payload))
+
+        cache.add_to_cache(payload, ["hello"])
+        self.assertEqual(cache.get_from_cache(payload), ["hello"])  # pending
+        cache.save_cache()
+        cache.close()
+
+        # persisted for a new cache with the same params only
+        self.assertEqual(
+            self.make_cache(n=1, model="m").get_from_cache(payload), ["hello"]
+        )
+        self.assertIsNone(self.make_cache(model="m2", n=1).get_from_cache(payload))
+
+    def test_n_aware_lookup(self):
+        cache = self.make_cache(model="m")
+        cache.add_to_cache("prompt", ["a", "b", "c"])
+
+        self.assertEqual(cache.get_from_cache("prompt", n=2), ["a", "b"])
+        self.assertEqual(cache.get_from_cache("prompt"), ["a", "b", "c"])
+        self.assertIsNone(cache.get_from_cache("prompt", n=5))
+        self.assertEqual(cache.get_samples("prompt"), ["a", "b", "c"])
+        self.assertEqual(cache.get_samples("other"), [])
+
+    def test_stable_key(self):
+        payload = [{"role": "user", "content": "hi"}]
+        first = self.make_cache(model="m", temperature=0.2).cache_key(payload)
+        second = self.make_cache(temperature=0.2, model="m").cache_key(payload)
+        self.assertEqual(first, second)
+        self.assertEqual(len(first), 64)
+
+    def test_pickled_cache(self):
+        cache = self.make_cache(model="m")
+        cache.add_to_cache("saved", ["a"])
+        cache.save_cache()
+        cache.add_to_cache("pending", ["b"])
+
+        copied: Cache = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(copied.get_from_cache("saved"), ["a"])
+        self.assertEqual(copied.get_from_cache("pending"), ["b"])
+
+    def test_concurrent_writers(self):
+        ctx = mp.get_context("spawn")
+        processes = [
+            ctx.Process(target=write_entries, args=(self.cache_dir.name, worker))
+            for worker in range(3)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+        cache = self.make_cache(model="m")
+        for worker in range(3):
+            for i in range(50):
+                self.assertEqual(cache.get_from_cache(f"w{worker}_{i}"), [f"out{i}"])
+
+    def test_wal_switch_retried_while_locked(self):
+        class LockedConnection:
+            attempts = 0
+
+            def execute(self, sql):
+                self.attempts += 1
+                if self.attempts < 3:
+                    raise sqlite3.OperationalError("database is locked")
+
+        conn = LockedConnection()
+        with patch("r2e.llms.cache_object.time.sleep"):
+            Cache._enable_wal(conn)  # type: ignore
+        self.assertEqual(conn.attempts, 3)
+
+    def test_import_json_cache(self):
+        payload = [{"role": "user", "content": "hi"}]
+        json_path = Path(self.cache_dir.name) / "cache.json"
+        json_path.write_text(json.dumps({json.dumps(payload): ["hello"]}))
+
+        cache = self.make_cache(model="m")
+        self.assertEqual(cache.import_json_cache(json_path), 1)
+        self.assertEqual(cache.get_from_cache(payload), ["hello"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,246 @@
+import os
+import json
+import unittest
+import tempfile
+import threading
+from pathlib import Path
+from email.parser import BytesParser
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from r2e.llms.llm_args import LLMArgs
+from r2e.llms.cache_object import Cache
+from r2e.llms.language_model import LanguageModel, LanguageModelStyle
+from r2e.llms.openai_batch_runner import OpenAIBatchRunner
+
+
+class FakeBatchServer(ThreadingHTTPServer):
+    """Stand-in for the files and batches endpoints of the OpenAI API"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeBatchHandler)
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict] = {}
+        self.polls_until_done = 1
+        self.fail: set[str] = set()
+
+
+class FakeBatchHandler(BaseHTTPRequestHandler):
+    server: FakeBatchServer
+
+    def log_message(self, *args):
+        pass
+
+    def read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers["Content-Length"]))
+
+    def do_POST(self):
+        server = self.server
+        if self.path == "/v1/files":
+            message = BytesParser().parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+                + self.read_body()
+            )
+            parts = {
+                part.get_param("name", header="content-disposition"): part
+                for part in message.get_payload()  # type: ignore
+            }
+            file_id = f"file-{len(server.files)}"
+            server.files[file_id] = parts["file"].get_payload(decode=True)
+            self.send_json(self.file_object(file_id))
+        elif self.path == "/v1/batches":
+            body = json.loads(self.read_body())
+            batch_id = f"batch-{len(server.batches)}"
+            server.batches[batch_id] = {
+                "id": batch_id,
+                "object": "batch",
+                "endpoint": body["endpoint"],
+                "input_file_id": body["input_file_id"],
+                "completion_window": body["completion_window"],
+                "status": "validating",
+                "created_at": 0,
+                "polls": 0,
+            }
+            self.send_json(self.batch_object(batch_id))
+        else:
+            self.send_error(404)
+
+    def do_GET(self):
+        server = self.server
+        parts = self.path.strip("/").split("/")
+        if parts[1] == "batches":
+            batch = server.batches[parts[2]]
+            batch["polls"] += 1
+            if (
+                batch["polls"] > server.polls_until_done
+                and batch["status"] != "completed"
+            ):
+                batch["status"] = "completed"
+                batch["output_file_id"] = self.run_batch(batch["input_file_id"])
+            elif batch["status"] != "completed":
+                batch["status"] = "in_progress"
+            self.send_json(self.batch_object(parts[2]))
+        elif parts[1] == "files" and parts[-1] == "content":
+            content = server.files[parts[2]]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+        else:
+            self.send_error(404)
+
+    def run_batch(self, input_file_id: str) -> str:
+        server = self.server
+        lines = []
+        for line in server.files[input_file_id].decode().splitlines():
+            request = json.loads(line)
+            body = request["body"]
+            prompt = body["messages"][-1]["content"]
+            if prompt in server.fail:
+                response = {"status_code": 400, "body": {"error": "bad request"}}
+            else:
+                choices = [
+                    {
+                        "index": i,
+                        "message": {"role": "assistant", "content": f"{prompt}:{i}"},
+                    }
+                    for i in range(body["n"])
+                ]
+                response = {"status_code": 200, "body": {"choices": choices}}
+            lines.append(
+                json.dumps(
+                    {
+                        "custom_id": request["custom_id"],
+                        "response": response,
+                        "error": None,
+                    }
+                )
+            )
+        file_id = f"file-{len(server.files)}"
+        server.files[file_id] = "\n".join(lines).encode()
+        return file_id
+
+    def file_object(self, file_id: str) -> dict:
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(self.server.files[file_id]),
+            "created_at": 0,
+            "filename": "input.jsonl",
+            "purpose": "batch",
+            "status": "processed",
+        }
+
+    def batch_object(self, batch_id: str) -> dict:
+        batch = dict(self.server.batches[batch_id])
+        batch.pop("polls")
+        return batch
+
+    def send_json(self, data: dict):
+        content = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class TestOpenAIBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeBatchServer()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.env = patch.dict(
+            os.environ, {"OPENAI_KEY": "test", "OPENAI_BASE_URL": base_url}
+        )
+        self.env.start()
+        self.test_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.env.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        self.test_dir.cleanup()
+
+    def make_runner(self, **kwargs) -> OpenAIBatchRunner:
+        args = LLMArgs(
+            model_name="gpt-4-turbo-2024-04-09",
+            batch_poll_interval=0,
+            use_cache=False,
+            batch_dir=str(Path(self.test_dir.name) / "batches"),
+            **kwargs,
+        )
+        model = LanguageModel(args.model_name, LanguageModelStyle.OpenAI)
+        runner = OpenAIBatchRunner(args, model)
+        runner.cache = Cache(
+            runner.cache_key_params(), cache_dir=Path(self.test_dir.name) / "cache"
+        )
+        return runner
+
+    @staticmethod
+    def payload(prompt: str) -> list[dict[str, str]]:
+        return [{"role": "user", "content": prompt}]
+
+    def test_batch_results_mapped_and_cached(self):
+        self.server.fail = {"p2"}
+        runner = self.make_runner(n=2)
+        payloads = [self.payload(f"p{i}") for i in range(3)] + [self.payload("p0")]
+        outputs = runner.run_main(payloads)
+
+        self.assertEqual(outputs[0], ["p0:0", "p0:1"])
+        self.assertEqual(outputs[1], ["p1:0", "p1:1"])
+        self.assertEqual(outputs[2], ["", ""])
+        self.assertEqual(outputs[3], outputs[0])
+        self.assertEqual(len(self.server.batches), 1)
+        input_file_id = self.server.batches["batch-0"]["input_file_id"]
+        self.assertEqual(len(self.server.files[input_file_id].splitlines()), 3)
+
+        # cached results are not resubmitted (only the failed request is)
+        runner = self.make_runner(n=2)
+        runner.run_main(payloads[:2])
+        self.assertEqual(len(self.server.batches), 1)
+        runner.run_main(payloads)
+        self.assertEqual(len(self.server.batches), 2)
+
+    def test_resume_submitted_batch(self):
+        runner = self.make_runner()
+        payloads = [self.payload(f"p{i}") for i in range(2)]
+        with patch.object(runner, "wait_for_batch", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                runner.run_main(payloads)
+        self.assertEqual(len(self.server.batches), 1)
+
+        runner = self.make_runner()
+        outputs = runner.run_main(payloads)
+        self.assertEqual(outputs, [["p0:0"], ["p1:0"]])
+        self.assertEqual(len(self.server.batches), 1)
+        self.assertEqual(list(Path(runner.batch_dir).iterdir()), [])
+
+        # interrupted in the second of two batches
+        runner = self.make_runner(batch_max_requests=1)
+        payloads = [self.payload(f"p{i}") for i in range(2, 4)]
+        wait_for_batch = runner.wait_for_batch
+
+        def wait_for_first_batch(batch_id):
+            if batch_id != "batch-1":
+                raise KeyboardInterrupt
+            return wait_for_batch(batch_id)
+
+        with patch.object(runner, "wait_for_batch", side_effect=wait_for_first_batch):
+            with self.assertRaises(KeyboardInterrupt):
+                runner.run_main(payloads)
+        self.assertEqual(len(self.server.batches), 3)
+
+        # the first batch is cached and the second one is resumed
+        runner = self.make_runner(batch_max_requests=1)
+        self.assertEqual(runner.get_cached_samples(payloads), [["p2:0"], []])
+        outputs = runner.run_main(payloads)
+        self.assertEqual(outputs, [["p2:0"], ["p3:0"]])
+        self.assertEqual(len(self.server.batches), 3)
+        self.assertEqual(list(Path(runner.batch_dir).iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import pickle
+import unittest
+import tempfile
+
+from r2e.models.identifier import Identifier
+from r2e.models.callgraph import CallGraph, CompactCallGraph, CodeElemType
+
+
+GRAPH = {
+    "src.utils.foo": ["src.utils.bar", "src.utils.baz"],
+    "src.classes.MyClass": ["<builtin>.print"],
+    "src.classes.MyClass.my_method": ["src.utils.baz"],
+    "src.classes.MyClass.my_method2": ["src.classes.MyClass.my_method"],
+    "src.utils.empty": [],
+}
+
+ID2TYPE = {
+    "src.utils.foo": "FUNCTION",
+    "src.utils.bar": "FUNCTION",
+    "src.utils.baz": "FUNCTION",
+    "src.utils.empty": "FUNCTION",
+    "src.classes.MyClass": "CLASS",
+    "src.classes.MyClass.my_method": "METHOD",
+    "src.classes.MyClass.my_method2": "METHOD",
+    "<builtin>.print": "BUILTIN",
+}
+
+
+class TestCompactCallGraph(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.test_dir.name, "repo_cgraph.bin")
+        CompactCallGraph.write(self.file_path, GRAPH, ID2TYPE)
+        self.compact = CompactCallGraph(self.file_path)
+        self.cgraph = CallGraph.from_dict(GRAPH, ID2TYPE)
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def test_same_api_as_callgraph(self):
+        for caller in list(GRAPH) + ["src.utils.bar", "missing.id"]:
+            identifier = Identifier(identifier=caller)
+            self.assertEqual(self.compact.get(identifier), self.cgraph.get(identifier))
+            self.assertEqual(
+                self.compact.get_type(identifier), self.cgraph.get_type(identifier)
+            )
+            self.assertEqual(identifier in self.compact, identifier in self.cgraph)
+            self.assertEqual(
+                self.compact.callee_count(identifier),
+                self.cgraph.callee_count(identifier),
+            )
+            self.assertEqual(
+                self.cgraph.callee_count(caller), len(self.cgraph.get(identifier))
+            )
+
+        self.assertEqual(len(self.compact), len(self.cgraph))
+        self.assertEqual(dict(self.compact.items()), dict(self.cgraph.items()))
+        self.assertEqual(self.compact.id2type, self.cgraph.id2type)
+        self.assertEqual(self.compact.to_dict(), self.cgraph.to_dict())
+
+    def test_string_keys(self):
+        self.assertEqual(
+            self.compact.get("src.classes.MyClass"),
+            [Identifier(identifier="<builtin>.print")],
+        )
+        self.assertEqual(self.compact.get_type("src.utils.bar"), CodeElemType.FUNCTION)
+        self.assertNotIn("src.utils.bar", self.compact)
+        with self.assertRaises(KeyError):
+            self.compact["src.utils.bar"]
+
+    def test_pickle(self):
+        loaded = pickle.loads(pickle.dumps(self.compact))
+        self.assertEqual(loaded.to_dict(), self.compact.to_dict())
+
+    def test_empty_graph(self):
+        CompactCallGraph.write(self.file_path, {}, {})
+        compact = CompactCallGraph(self.file_path)
+        self.assertEqual(len(compact), 0)
+        self.assertEqual(compact.get("src.utils.foo"), [])
+        self.assertEqual(compact.get_type("src.utils.foo"), CodeElemType.OTHER)
+
+    def test_is_up_to_date(self):
+        json_path = os.path.join(self.test_dir.name, "repo_cgraph.json")
+        self.assertTrue(CompactCallGraph.is_up_to_date(self.file_path, json_path))
+
+        with open(json_path, "w") as f:
+            f.write("{}")
+        os.utime(self.file_path, (0, 0))
+        self.assertFalse(CompactCallGraph.is_up_to_date(self.file_path, json_path))
+        self.assertFalse(CompactCallGraph.is_up_to_date(json_path + ".bin", json_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import unittest
+import tempfile
+
+from r2e.models.callgraph import CallGraph, CompactCallGraph, CodeElemType
+from r2e.models.identifier_trie import IdentifierTrie
+
+ID2TYPE = {
+    "src.utils.foo": "FUNCTION",
+    "src.utils.bar": "FUNCTION",
+    "src.classes.MyClass": "CLASS",
+    "src.classes.MyClass.my_method": "METHOD",
+    "src.classes.MyClass.my_method2": "METHOD",
+    "src.classes.MyClass.my_method.inner": "OTHER",
+    "<builtin>.print": "BUILTIN",
+}
+
+
+def scan_children(prefix: str) -> list[str]:
+    # the scan of all the ids the trie replaces
+    return [
+        id_str
+        for id_str in ID2TYPE
+        if id_str.startswith(prefix + ".")
+        and id_str.count(".") == prefix.count(".") + 1
+    ]
+
+
+class TestIdentifierTrie(unittest.TestCase):
+    def setUp(self):
+        self.trie = IdentifierTrie.from_types(
+            (k, CodeElemType[v]) for k, v in ID2TYPE.items()
+        )
+
+    def test_types(self):
+        for identifier, elem_type in ID2TYPE.items():
+            self.assertIn(identifier, self.trie)
+            self.assertEqual(self.trie.get_type(identifier), CodeElemType[elem_type])
+        self.assertNotIn("src.classes", self.trie)
+        self.assertIsNone(self.trie.get_type("src.classes"))
+        self.assertIsNone(self.trie.get_type("src.missing.foo"))
+
+    def test_children(self):
+        for prefix in ["src", "src.utils", "src.classes.MyClass", "src.missing"]:
+            self.assertEqual(self.trie.children(prefix), scan_children(prefix))
+        self.assertEqual(
+            self.trie.children("src.classes.MyClass", CodeElemType.METHOD),
+            ["src.classes.MyClass.my_method", "src.classes.MyClass.my_method2"],
+        )
+
+    def test_resolve_module_id(self):
+        self.trie.add_module("src.utils")
+        self.trie.add_module("src.classes")
+        self.assertTrue(self.trie.is_module("src.utils"))
+        self.assertFalse(self.trie.is_module("src"))
+        self.assertEqual(self.trie.resolve_module_id("src.utils.foo"), "src.utils")
+        self.assertEqual(
+            self.trie.resolve_module_id("src.classes.MyClass.my_method"),
+            "src.classes",
+        )
+        self.assertEqual(self.trie.resolve_module_id("src.utils.missing"), "src.utils")
+        self.assertIsNone(
+            self.trie.resolve_module_id("src.classes.MyClass.my_method.inner")
+        )
+        self.assertIsNone(self.trie.resolve_module_id("src"))
+
+    def test_callgraphs(self):
+        with tempfile.TemporaryDirectory() as test_dir:
+            file_path = os.path.join(test_dir, "repo_cgraph.bin")
+            CompactCallGraph.write(file_path, {}, ID2TYPE)
+            for callgraph in [
+                CallGraph.from_dict({}, ID2TYPE),
+                CompactCallGraph(file_path),
+            ]:
+                self.assertIs(callgraph.trie, callgraph.trie)
+                self.assertEqual(
+                    callgraph.trie.children("src.classes.MyClass"),
+                    scan_children("src.classes.MyClass"),
+                )
+                self.assertEqual(
+                    callgraph.trie.get_type("<builtin>.print"), CodeElemType.BUILTIN
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
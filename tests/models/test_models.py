@@ -1,12 +1,22 @@
 import unittest
 import json
 import os
+import sys
+import pickle
 from unittest.mock import patch, mock_open
+from pydantic import ValidationError
 from r2e.models.repo import Repo
 from r2e.models.module import Module, ModuleTypeEnum
 from r2e.models.identifier import Identifier
 from r2e.models.function import Function
+from r2e.models.method import Method
 from r2e.models.file import File
+from r2e.models.fut import (
+    FunctionUnderTest,
+    MethodUnderTest,
+    create_code_under_test,
+)
+from r2e.models.codegen_problem import create_codegen_problem
 from r2e.models.callgraph import CallGraph, CodeElemType
 from r2e.paths import REPOS_DIR
 
@@ -115,5 +125,65 @@ class TestFunction(unittest.TestCase):
         self.assertEqual(self.function.callees[1].function_name, "callee2")
 
 
+class TestFastPaths(unittest.TestCase):
+    def setUp(self):
+        self.function = Function.model_validate_json(function_json)
+        self.method = Method(
+            method_id=Identifier(identifier="test.module.MyClass.method"),
+            file=self.function.file,
+            method_code="def method(self): pass",
+        )
+
+    def test_file_hash_does_not_read(self):
+        with patch("builtins.open", side_effect=AssertionError("file read")):
+            file_hash = hash(self.function.file)
+        self.assertEqual(file_hash, hash(File(file_module=self.function.module)))
+
+    def test_class_name_does_not_find_module(self):
+        with patch("os.path.exists", side_effect=AssertionError("module lookup")):
+            self.assertEqual(self.method.class_name, "MyClass")
+
+    def test_create_code_under_test(self):
+        fut = create_code_under_test(self.function)
+        expected = FunctionUnderTest(
+            **self.function.model_dump(), test_history=fut.test_history
+        )
+        self.assertIsInstance(fut, FunctionUnderTest)
+        self.assertEqual(fut.model_dump(), expected.model_dump())
+        self.assertEqual(
+            FunctionUnderTest.model_validate_json(fut.model_dump_json()), fut
+        )
+
+        mut = create_code_under_test(self.method)
+        self.assertIsInstance(mut, MethodUnderTest)
+        self.assertEqual(mut.execution_fut_data, ("MyClass.method", "test/module.py"))
+
+    def test_identifier_record(self):
+        identifier = self.function.function_id
+        self.assertEqual(identifier, Identifier(identifier="test.module.function"))
+        self.assertIs(identifier.identifier, sys.intern("test.module.function"))
+        self.assertEqual(pickle.loads(pickle.dumps(identifier)), identifier)
+        with self.assertRaises(AttributeError):
+            identifier.identifier = "test.module.other"  # type: ignore
+
+        # (de)serialized as before it was a plain record
+        self.assertEqual(
+            self.function.model_dump()["function_id"],
+            {"identifier": "test.module.function"},
+        )
+        self.assertEqual(
+            Function.model_validate(self.function.model_dump()), self.function
+        )
+        with self.assertRaises(ValidationError):
+            Function(**{**self.function.model_dump(), "function_id": {"id": "x"}})
+
+    def test_create_codegen_problem(self):
+        fut = create_code_under_test(self.function)
+        problem = create_codegen_problem(fut, "A spec")
+        self.assertEqual(problem.spec, "A spec")
+        self.assertEqual(problem.id, fut.id)
+        self.assertEqual(problem.model_dump()["spec"], "A spec")
+
+
 if __name__ == "__main__":
     unittest.main()
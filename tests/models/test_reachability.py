@@ -0,0 +1,104 @@
+import os
+import random
+import unittest
+import tempfile
+
+from r2e.models.identifier import Identifier
+from r2e.models.callgraph import CallGraph, CompactCallGraph, ReachabilityIndex
+
+
+def random_graph(num_nodes: int, num_edges: int, seed: int) -> dict[str, list[str]]:
+    rng = random.Random(seed)
+    names = [f"mod.f{i}" for i in range(num_nodes)]
+    graph: dict[str, list[str]] = {name: [] for name in names[: num_nodes // 2]}
+    for _ in range(num_edges):
+        caller = rng.choice(names)
+        graph.setdefault(caller, []).append(rng.choice(names))
+    return graph
+
+
+def bfs(graph: dict[str, list[str]], start: str, max_depth=None) -> list[str]:
+    found: set[str] = set()
+    frontier, depth = [start], 0
+    while frontier and (max_depth is None or depth < max_depth):
+        depth += 1
+        frontier = [
+            callee
+            for node in frontier
+            for callee in graph.get(node, [])
+            if callee not in found and not found.add(callee)  # type: ignore
+        ]
+    return sorted(found)
+
+
+def reverse(graph: dict[str, list[str]]) -> dict[str, list[str]]:
+    reversed_graph: dict[str, list[str]] = {}
+    for caller, callees in graph.items():
+        for callee in callees:
+            reversed_graph.setdefault(callee, []).append(caller)
+    return reversed_graph
+
+
+class TestReachabilityIndex(unittest.TestCase):
+    def test_cycles(self):
+        index = ReachabilityIndex.from_dict(
+            {"a": ["b"], "b": ["c", "a"], "c": ["d"], "r": ["r"]}
+        )
+        self.assertEqual(index.component[0], index.component[1])
+        self.assertEqual(index.reachable_from("a"), ["a", "b", "c", "d"])
+        self.assertEqual(index.reachable_from("c"), ["d"])
+        self.assertEqual(index.reaching("c"), ["a", "b"])
+        self.assertTrue(index.reaches("r", "r"))
+        self.assertFalse(index.reaches("d", "d"))
+        self.assertFalse(index.reaches("d", "a"))
+        self.assertEqual(index.callers(Identifier(identifier="a")), ["b"])
+        self.assertEqual(index.reachable_from("missing"), [])
+        self.assertFalse(index.reaches("a", "missing"))
+
+    def test_same_as_bfs(self):
+        for seed in range(5):
+            graph = random_graph(200, 300, seed)
+            reversed_graph = reverse(graph)
+            index = ReachabilityIndex.from_dict(graph)
+            for name in index.names:
+                reachable = bfs(graph, name)
+                self.assertEqual(index.reachable_from(name), reachable)
+                self.assertEqual(index.reachable_from(name, 2), bfs(graph, name, 2))
+                self.assertEqual(index.reaching(name), bfs(reversed_graph, name))
+                self.assertEqual(
+                    index.callers(name), sorted(set(reversed_graph.get(name, [])))
+                )
+                for target in index.names[:20]:
+                    self.assertEqual(
+                        index.reaches(name, target), target in reachable, name
+                    )
+
+    def test_callgraphs(self):
+        graph = random_graph(100, 150, 0)
+        expected = ReachabilityIndex.from_dict(graph)
+
+        with tempfile.TemporaryDirectory() as test_dir:
+            file_path = os.path.join(test_dir, "repo_cgraph.bin")
+            CompactCallGraph.write(file_path, graph, {})
+            for callgraph in [
+                CallGraph.from_dict(graph, {}),
+                CompactCallGraph(file_path),
+            ]:
+                index = callgraph.reachability
+                self.assertIs(callgraph.reachability, index)
+                self.assertEqual(index.names, expected.names)
+                for name in expected.names:
+                    self.assertEqual(
+                        index.reachable_from(name), expected.reachable_from(name)
+                    )
+                    self.assertEqual(index.callers(name), expected.callers(name))
+
+    def test_reset_on_update(self):
+        callgraph = CallGraph.from_dict({"a": ["b"]}, {})
+        self.assertFalse(callgraph.reachability.reaches("b", "a"))
+        callgraph[Identifier(identifier="b")] = [Identifier(identifier="a")]
+        self.assertTrue(callgraph.reachability.reaches("b", "a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import time
+import unittest
+import tempfile
+
+from r2e.models.callgraph import CodeElemType
+from r2e.models.symbol_index import (
+    SymbolIndex,
+    _loaded_indexes,
+    get_symbol_index,
+    refresh_symbol_index,
+)
+
+
+class TestSymbolIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.repo_path = self.test_dir.name
+        os.makedirs(os.path.join(self.repo_path, "pkg"))
+
+        with open(os.path.join(self.repo_path, "pkg", "__init__.py"), "w") as f:
+            f.write("")
+
+        with open(os.path.join(self.repo_path, "pkg", "utils.py"), "w") as f:
+            f.write(
+                """
+CONSTANT = 1
+
+def helper():
+    pass
+
+async def async_helper():
+    pass
+
+class Utils:
+    def compute(self, x):
+        return x * x
+
+    async def fetch(self):
+        pass
+"""
+            )
+
+        self.index = SymbolIndex.build(self.repo_path)
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def test_resolve_module_id(self):
+        self.assertEqual(self.index.resolve_module_id("pkg.utils.helper"), "pkg.utils")
+        self.assertEqual(
+            self.index.resolve_module_id("pkg.utils.Utils.compute"), "pkg.utils"
+        )
+        self.assertIsNone(self.index.resolve_module_id("pkg.missing.helper"))
+
+    def test_get_type(self):
+        self.assertEqual(self.index.get_type("pkg.utils.helper"), CodeElemType.FUNCTION)
+        self.assertEqual(
+            self.index.get_type("pkg.utils.async_helper"), CodeElemType.FUNCTION
+        )
+        self.assertEqual(self.index.get_type("pkg.utils.Utils"), CodeElemType.CLASS)
+        self.assertEqual(
+            self.index.get_type("pkg.utils.Utils.compute"), CodeElemType.METHOD
+        )
+        self.assertEqual(self.index.get_type("pkg.utils.CONSTANT"), CodeElemType.OTHER)
+        self.assertEqual(self.index.get_type("pkg.missing.helper"), CodeElemType.OTHER)
+        self.assertEqual(self.index.get_type("numpy.array"), CodeElemType.API)
+
+    def test_method_ids(self):
+        self.assertEqual(
+            sorted(self.index.method_ids("pkg.utils.Utils")),  # type: ignore
+            ["pkg.utils.Utils.compute", "pkg.utils.Utils.fetch"],
+        )
+        self.assertIsNone(self.index.method_ids("pkg.missing.Utils"))
+
+    def test_refresh(self):
+        self.assertFalse(self.index.refresh(self.repo_path))
+
+        new_file = os.path.join(self.repo_path, "pkg", "more.py")
+        with open(new_file, "w") as f:
+            f.write("def more():\n    pass\n")
+
+        self.assertTrue(self.index.refresh(self.repo_path))
+        self.assertEqual(self.index.get_type("pkg.more.more"), CodeElemType.FUNCTION)
+
+        # bump the mtime so the change is visible on coarse clocks
+        with open(new_file, "w") as f:
+            f.write("class more:\n    pass\n")
+        mtime = time.time() + 10
+        os.utime(new_file, (mtime, mtime))
+
+        self.assertTrue(self.index.refresh(self.repo_path))
+        self.assertEqual(self.index.get_type("pkg.more.more"), CodeElemType.CLASS)
+
+        os.remove(new_file)
+        self.assertTrue(self.index.refresh(self.repo_path))
+        self.assertIsNone(self.index.resolve_module_id("pkg.more.more"))
+
+    def test_json_roundtrip(self):
+        index_path = os.path.join(self.repo_path, "index", "repo_symbols.json")
+        self.index.to_json(index_path)
+
+        loaded = SymbolIndex.from_json(index_path)
+        self.assertEqual(loaded.modules, self.index.modules)
+        self.assertFalse(loaded.refresh(self.repo_path))
+
+    def test_refresh_loaded_index_is_saved(self):
+        index_path = os.path.join(self.repo_path, "index", "repo_symbols.json")
+        index = get_symbol_index(index_path, self.repo_path)
+        self.addCleanup(_loaded_indexes.pop, self.repo_path)
+        self.assertTrue(os.path.exists(index_path))
+
+        with open(os.path.join(self.repo_path, "pkg", "more.py"), "w") as f:
+            f.write("def more():\n    pass\n")
+
+        self.assertIs(refresh_symbol_index(index_path, self.repo_path), index)
+        loaded = SymbolIndex.from_json(index_path)
+        self.assertEqual(loaded.get_type("pkg.more.more"), CodeElemType.FUNCTION)
+
+
+if __name__ == "__main__":
+    unittest.main()
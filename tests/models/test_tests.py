@@ -0,0 +1,135 @@
+import json
+import unittest
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from r2e.models import Function, Tests as GeneratedTests
+from r2e.models import TestHistory as GeneratedTestHistory
+from r2e.models.fut import FunctionUnderTest
+from r2e.utils.data import load_functions_under_test
+from r2e.generators.testgen.compact import compact_test_histories
+from tests.models.test_models import function_json
+
+PASSING_STATS = {"run_tests_logs": {"test_0": {"valid": True}}}
+
+
+def oversample(history: GeneratedTestHistory, rounds: int):
+    """Add tests like oversampling does: a copy of the tests plus a new test"""
+    for i in range(1, rounds + 1):
+        tests = GeneratedTests(tests=history.latest_tests, operation="oversample")
+        tests.add(f"test_{i}", f"def test_{i}():\n    assert f({i}) == {i}\n")
+        history.add(tests)
+
+
+class TestTestHistory(unittest.TestCase):
+    def setUp(self):
+        self.history = GeneratedTestHistory()
+        self.history.add(GeneratedTests(tests={"test_0": "def test_0(): pass"}))
+
+    def test_deltas(self):
+        oversample(self.history, 3)
+        self.history.add(
+            GeneratedTests(
+                tests={"test_0": "def test_0(): pass", "test_1": "# filtered"},
+                operation="filter",
+            )
+        )
+
+        self.assertEqual(len(self.history), 5)
+        self.assertEqual(
+            [list(d.updated) for d in self.history.deltas[1:4]],
+            [["test_1"], ["test_2"], ["test_3"]],
+        )
+        self.assertEqual(self.history.deltas[-1].removed, ["test_2", "test_3"])
+        self.assertEqual(
+            self.history.latest_tests,
+            {"test_0": "def test_0(): pass", "test_1": "# filtered"},
+        )
+        self.assertEqual(
+            [len(tests.tests) for tests in self.history.versions()], [1, 2, 3, 4, 2]
+        )
+        self.assertEqual(self.history.latest_operation, "filter")
+
+    def test_size_is_linear(self):
+        oversample(self.history, 50)
+        num_blobs = len(self.history.blobs)
+        num_refs = sum(len(d.updated) for d in self.history.deltas)
+        self.assertEqual((num_blobs, num_refs), (51, 51))
+
+    def test_serialization(self):
+        oversample(self.history, 2)
+        self.history.update_exec_stats(PASSING_STATS)
+
+        loaded = GeneratedTestHistory.model_validate_json(
+            self.history.model_dump_json()
+        )
+        self.assertEqual(loaded, self.history)
+        self.assertEqual(loaded.latest_tests, self.history.latest_tests)
+        self.assertTrue(loaded.is_passing)
+
+    def test_full_history_is_converted(self):
+        oversample(self.history, 2)
+        versions = [tests.model_dump() for tests in self.history.versions()]
+
+        loaded = GeneratedTestHistory.model_validate({"history": versions})
+        self.assertEqual(loaded, self.history)
+        self.assertEqual([tests.model_dump() for tests in loaded.history], versions)
+
+    def test_latest_tests_is_a_copy(self):
+        self.history.latest_tests["test_1"] = "def test_1(): pass"
+        self.assertEqual(list(self.history.latest_tests), ["test_0"])
+
+    def test_compact(self):
+        self.history.update_exec_stats({"error": "failed"})
+        self.history.add(GeneratedTests(tests={"test_0": "def test_0(): assert 1"}))
+        self.history.update_exec_stats(PASSING_STATS)
+        self.history.blobs["unused"] = "def test(): pass"
+
+        self.history.compact(keep_exec_stats=False)
+        self.assertEqual(len(self.history.blobs), 2)
+        self.assertIsNone(self.history.deltas[0].exec_stats)
+        self.assertTrue(self.history.is_passing)
+
+
+class TestCompactTestHistories(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.patch = patch(
+            "r2e.generators.testgen.compact.TESTGEN_DIR", Path(self.test_dir.name)
+        )
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.test_dir.cleanup()
+
+    def test_compacts_full_histories(self):
+        fut = FunctionUnderTest.from_function(
+            Function.model_validate_json(function_json)
+        )
+        fut.update_history(GeneratedTests(tests={"test_0": "def test_0(): pass"}))
+        oversample(fut.test_history, 10)
+        fut.update_exec_stats(PASSING_STATS)
+
+        record = fut.model_dump()
+        record["test_history"] = {
+            "history": [tests.model_dump() for tests in fut.test_history.versions()]
+        }
+        in_file = Path(self.test_dir.name) / "legacy.jsonl"
+        in_file.write_text(json.dumps(record) + "\n")
+
+        out_file = compact_test_histories("legacy.jsonl", "compact.jsonl")
+        self.assertLess(out_file.stat().st_size, in_file.stat().st_size)
+        (compacted,) = load_functions_under_test(out_file)
+        self.assertEqual(compacted.tests, fut.tests)
+        self.assertEqual(compacted.test_version, fut.test_version)
+        self.assertTrue(compacted.is_passing)
+
+        compact_test_histories("legacy.jsonl")
+        (compacted,) = load_functions_under_test(in_file)
+        self.assertEqual(compacted.test_history, fut.test_history)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import unittest
+import tempfile
+
+from r2e.pat.ast.cache import AstCache
+
+
+class TestAstCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.file_paths = []
+        for i in range(3):
+            file_path = os.path.join(self.test_dir.name, f"mod_{i}.py")
+            with open(file_path, "w") as f:
+                f.write(f"def func_{i}():\n    return {i}\n")
+            self.file_paths.append(file_path)
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def test_hit_and_miss(self):
+        cache = AstCache()
+        tree = cache.get_ast(self.file_paths[0])
+        self.assertIs(cache.get_ast(self.file_paths[0]), tree)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # parent information is added to the cached tree
+        func_node = tree.body[0]
+        self.assertIs(func_node.parent, tree)  # type: ignore
+
+    def test_lru_eviction(self):
+        cache = AstCache(max_entries=2)
+        cache.get_ast(self.file_paths[0])
+        cache.get_ast(self.file_paths[1])
+        cache.get_ast(self.file_paths[0])
+        cache.get_ast(self.file_paths[2])
+
+        self.assertEqual(len(cache), 2)
+        cache.get_ast(self.file_paths[0])
+        self.assertEqual(cache.misses, 3)
+        cache.get_ast(self.file_paths[1])
+        self.assertEqual(cache.misses, 4)
+
+    def test_changed_content_replaces_entry(self):
+        cache = AstCache()
+        old_tree = cache.get_ast(self.file_paths[0])
+        new_tree = cache.get_ast(self.file_paths[0], content="x = 1\n")
+
+        self.assertIsNot(old_tree, new_tree)
+        self.assertEqual(len(cache), 1)
+
+    def test_derived(self):
+        cache = AstCache()
+        calls = []
+
+        def builder(tree):
+            calls.append(tree)
+            return len(tree.body)
+
+        self.assertEqual(cache.get_derived(self.file_paths[0], "n", builder), 1)
+        self.assertEqual(cache.get_derived(self.file_paths[0], "n", builder), 1)
+        self.assertEqual(len(calls), 1)
+
+    def test_dump_and_load(self):
+        cache = AstCache()
+        for file_path in self.file_paths:
+            cache.get_ast(file_path)
+
+        dump_path = os.path.join(self.test_dir.name, "cache", "ast_cache.pkl")
+        cache.dump(dump_path)
+
+        warm_cache = AstCache()
+        self.assertEqual(warm_cache.load(dump_path), 3)
+
+        tree = warm_cache.get_ast(self.file_paths[1])
+        self.assertEqual(warm_cache.misses, 0)
+        self.assertEqual(tree.body[0].name, "func_1")  # type: ignore
+        self.assertIs(tree.body[0].parent, tree)  # type: ignore
+
+
+if __name__ == "__main__":
+    unittest.main()
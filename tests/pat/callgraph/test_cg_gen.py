@@ -86,6 +86,73 @@ if __name__ == "__main__":
             self.assertIn(key, cgraph)
             self.assertEqual(sorted(expected_graph[key]), sorted(cgraph[key]))
 
+    def test_get_changed_files(self):
+        old_infos = CallGraphGenerator.get_file_infos(self.repo_path)
+        self.assertIn(
+            "module.utils",
+            old_infos[os.path.join("module", "more_utils.py")]["imports"],
+        )
+
+        with open(os.path.join(self.repo_path, "module", "utils.py"), "a") as f:
+            f.write("\ndef new_helper():\n    pass\n")
+
+        new_infos = CallGraphGenerator.get_file_infos(self.repo_path)
+        changed, removed = CallGraphGenerator.get_changed_files(old_infos, new_infos)
+
+        # utils changed; more_utils and test import it
+        self.assertEqual(
+            changed,
+            {
+                os.path.join("module", "utils.py"),
+                os.path.join("module", "more_utils.py"),
+                "test.py",
+            },
+        )
+        self.assertEqual(removed, set())
+        self.assertEqual(
+            CallGraphGenerator.get_changed_files(new_infos, new_infos), (set(), set())
+        )
+
+    def test_incremental_call_graph(self):
+        old_infos = CallGraphGenerator.get_file_infos(self.repo_path)
+        old_cgraph = CallGraphGenerator.construct_call_graph(self.repo_path)
+
+        with open(os.path.join(self.repo_path, "module", "more_utils.py"), "w") as f:
+            f.write(
+                """
+from .utils import Utils, helper
+
+def advanced_helper():
+    helper()
+    return 0
+"""
+            )
+
+        new_infos = CallGraphGenerator.get_file_infos(self.repo_path)
+        changed, removed = CallGraphGenerator.get_changed_files(old_infos, new_infos)
+        self.assertEqual(changed, {os.path.join("module", "more_utils.py"), "test.py"})
+
+        module_ids = {
+            CallGraphGenerator.module_id_from_path(file_path) for file_path in new_infos
+        }
+        stale_modules = {
+            CallGraphGenerator.module_id_from_path(file_path) for file_path in changed
+        }
+        delta_cgraph = CallGraphGenerator.construct_call_graph(
+            self.repo_path, entry_points=sorted(changed)
+        )
+        cgraph = CallGraphGenerator.splice_call_graph(
+            old_cgraph, delta_cgraph, stale_modules, module_ids
+        )
+
+        full_cgraph = CallGraphGenerator.construct_call_graph(self.repo_path)
+        for key in full_cgraph:
+            self.assertIn(key, cgraph)
+            self.assertEqual(sorted(full_cgraph[key]), sorted(cgraph[key]))
+        self.assertEqual(
+            cgraph["module.more_utils.advanced_helper"], ["module.utils.helper"]
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -126,6 +126,39 @@ class TestCallGraphExplorer(unittest.TestCase):
             elif isinstance(callee, Function):
                 self.assertIn(callee.function_id.identifier, expected_callees)
 
+    @patch("os.path.exists", return_value=True)
+    @patch(
+        "builtins.open",
+        new_callable=mock_open,
+        read_data=callgraph_json,
+    )
+    def test_reachability(self, mock_open, mock_exists):
+        cg_explorer = CallGraphExplorer(self.repo)
+        self.assertEqual(
+            cg_explorer.callers("src.classes.MyClass.my_method"),
+            ["src.classes.MyClass.my_method2"],
+        )
+        self.assertEqual(
+            cg_explorer.reachable_from("src.classes.MyClass.my_method2"),
+            ["src.classes.MyClass.my_method", "src.utils.baz"],
+        )
+        self.assertEqual(
+            cg_explorer.reachable_from("src.classes.MyClass.my_method2", max_depth=1),
+            ["src.classes.MyClass.my_method"],
+        )
+        self.assertEqual(
+            cg_explorer.reaching("src.utils.baz"),
+            ["src.classes.MyClass.my_method", "src.classes.MyClass.my_method2"],
+        )
+        self.assertTrue(
+            cg_explorer.reaches("src.classes.MyClass.my_method2", "src.utils.baz")
+        )
+        self.assertFalse(cg_explorer.reaches("src.utils.foo", "src.utils.baz"))
+
+        (caller,) = cg_explorer.callers("src.utils.bar", as_models=True)
+        self.assertIsInstance(caller, Function)
+        self.assertEqual(caller.function_id.identifier, "src.utils.foo")
+
 
 if __name__ == "__main__":
     unittest.main()
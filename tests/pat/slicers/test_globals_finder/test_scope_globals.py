@@ -0,0 +1,142 @@
+import ast
+import io
+import glob
+import os
+import unittest
+import contextlib
+
+import r2e
+from r2e.pat.dependency_slicer.globals_finder.scope_globals import (
+    get_scope_globals,
+    get_stmt_scope_globals,
+)
+from r2e.pat.dependency_slicer.globals_finder.bytecode_globals import (
+    get_funclass_globals,
+)
+from tests.pat.slicers.test_globals_finder import test_bytecode_globals
+
+
+class TestScopeGlobalsFinder(test_bytecode_globals.TestBytecodeGlobalsFinder):
+    """Runs the bytecode globals test-suite against the AST scope analyzer."""
+
+    def build_ast_get_global_access_symbols(self, code: str):
+        node = ast.parse(code).body[0]
+        assert isinstance(
+            node,
+            (
+                ast.FunctionDef,
+                ast.ClassDef,
+                ast.AsyncFunctionDef,
+            ),
+        )
+        return get_scope_globals(node)
+
+    def compare_stmt(self, code, expected):
+        predicted = get_stmt_scope_globals(ast.parse(code).body[0])
+        self.assertEqual(set(predicted), set(expected))
+
+    def test_read_before_store(self):
+        code = """
+def f():
+    x = x + 1
+    y = 1
+    return y + z
+"""
+        self.compare(code, ["x", "z"])
+
+    def test_closures(self):
+        code = """
+def f():
+    a = 1
+    def g():
+        return a + b
+    h = lambda c: a + c + d
+    return [a + e for e in range(3) if e > k]
+"""
+        self.compare(code, ["b", "d", "k", "range"])
+
+    def test_class_scope(self):
+        code = """
+class A(Base):
+    x = 1
+    y = x + z
+    def f(self):
+        return x + self.y
+"""
+        self.compare(code, ["x", "z"])
+
+    def test_private_names_mangled(self):
+        code = """
+class A:
+    __marker = object()
+    def f(self, default=__marker):
+        return __marker
+"""
+        self.compare(code, ["object"])
+
+    def test_unreachable_code(self):
+        code = """
+def f():
+    if False:
+        dead()
+    return alive()
+    after()
+"""
+        self.compare(code, ["alive"])
+
+    def test_comprehension_walrus(self):
+        code = """
+def f():
+    if any((n := x) > 0 for x in xs):
+        return n
+"""
+        self.compare(code, ["any", "xs"])
+
+    def test_nonlocal_without_binding(self):
+        code = """
+def f():
+    nonlocal a
+    a = 1
+"""
+        self.compare(code, [])
+
+    def test_stmt(self):
+        self.compare_stmt("x = y + z", ["y", "z"])
+        self.compare_stmt("x += 1", ["x"])
+        self.compare_stmt("for i in items:\n    total = i + total", ["items", "total"])
+        self.compare_stmt(
+            "try:\n    import a\nexcept E as e:\n    b = e + c", ["E", "c"]
+        )
+        self.compare_stmt("with open(f) as g:\n    g.read(h)", ["open", "f", "h"])
+        self.compare_stmt("from x import *", [])
+
+    def test_matches_bytecode_globals(self):
+        # the analyzer replaces compiling each statement (wrapped in a fake
+        # function) and walking its bytecode; both must agree on real code
+        # NOTE: the bytecode version wrongly keeps some parameters, e.g., of
+        # decorated methods or functions containing lambdas, so these are ignored
+        package_dir = os.path.dirname(r2e.__file__)
+        file_paths = sorted(glob.glob(f"{package_dir}/**/*.py", recursive=True))
+
+        for file_path in file_paths:
+            with open(file_path, "r") as f:
+                module_ast = ast.parse(f.read())
+
+            for stmt in module_ast.body:
+                fake_func = ast.parse(
+                    "async def fake_func():\n"
+                    + "\n".join("    " + l for l in ast.unparse(stmt).split("\n"))
+                ).body[0]
+                with contextlib.redirect_stdout(io.StringIO()):
+                    expected = set(get_funclass_globals(fake_func))  # type: ignore
+                predicted = set(get_stmt_scope_globals(stmt))
+
+                params = {n.arg for n in ast.walk(stmt) if isinstance(n, ast.arg)}
+                self.assertEqual(predicted - expected, set(), (file_path, stmt.lineno))
+                self.assertEqual(
+                    expected - predicted - params, set(), (file_path, stmt.lineno)
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
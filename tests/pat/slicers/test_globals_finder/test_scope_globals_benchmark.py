@@ -0,0 +1,66 @@
+import ast
+import io
+import os
+import glob
+import time
+import unittest
+import contextlib
+
+import r2e
+from r2e.pat.dependency_slicer.globals_finder.scope_globals import (
+    get_stmt_scope_globals,
+)
+from r2e.pat.dependency_slicer.globals_finder.bytecode_globals import (
+    get_funclass_globals,
+)
+
+
+def bytecode_stmt_globals(stmt: ast.stmt) -> list[str]:
+    """Globals of a statement wrapped in a fake function (the bytecode version)"""
+    fake_func = ast.parse(
+        "async def fake_func():\n"
+        + "\n".join("    " + l for l in ast.unparse(stmt).split("\n"))
+    ).body[0]
+    with contextlib.redirect_stdout(io.StringIO()):
+        return get_funclass_globals(fake_func)  # type: ignore
+
+
+def time_per_stmt(find_globals, stmts: list[ast.stmt], repeat: int) -> float:
+    """Best time (over `repeat` runs) to find the globals of a statement, in ms"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for stmt in stmts:
+            find_globals(stmt)
+        best = min(best, time.perf_counter() - start)
+    return best / len(stmts) * 1000
+
+
+@unittest.skipUnless(os.environ.get("R2E_BENCHMARK"), "set R2E_BENCHMARK=1 to run")
+class TestScopeGlobalsBenchmark(unittest.TestCase):
+    """Globals of the top-level statements of the r2e sources.
+
+    Run with `R2E_BENCHMARK=1 python -m pytest -s` on this file.
+    """
+
+    def setUp(self):
+        package_dir = os.path.dirname(r2e.__file__)
+        self.stmts: list[ast.stmt] = []
+        for file_path in sorted(glob.glob(f"{package_dir}/**/*.py", recursive=True)):
+            with open(file_path, "r") as f:
+                self.stmts.extend(ast.parse(f.read()).body)
+
+    def test_scope_vs_bytecode_globals(self):
+        bytecode_ms = time_per_stmt(bytecode_stmt_globals, self.stmts, repeat=1)
+        scope_ms = time_per_stmt(get_stmt_scope_globals, self.stmts, repeat=3)
+
+        print(
+            f"\n{len(self.stmts)} statements: "
+            f"bytecode {bytecode_ms:.2f} ms/stmt, scope analyzer {scope_ms:.2f} ms/stmt "
+            f"({bytecode_ms / scope_ms:.0f}x)"
+        )
+        self.assertLess(scope_ms, bytecode_ms)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import os
+import json
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from r2e.models import Function, Identifier
+from r2e.pat.dependency_slicer import DependencySlicer
+from r2e.pat.dependency_slicer import slice_memo
+from r2e.pat.dependency_slicer.slice_memo import clear_slice_memos, get_slice_memo
+from tests.repo_test_case import RepoTestCase
+
+
+class TestSliceMemo(RepoTestCase):
+    repo_id = "memo_repo"
+
+    def setUp(self):
+        super().setUp()
+        self.write_repo_file("pkg/__init__.py", "")
+        self.write_repo_file(
+            "pkg/helpers.py",
+            """
+import os
+
+SCALE = 2
+
+def scale(x):
+    return x * SCALE
+
+def join(a, b):
+    return os.path.join(a, b)
+""",
+        )
+        self.write_repo_file(
+            "pkg/api.py",
+            """
+from pkg.helpers import scale, join
+
+OFFSET = 1
+
+def first(x):
+    return scale(x) + OFFSET
+
+def second(x):
+    return join(str(scale(x)), "y")
+""",
+        )
+
+        with open(self.graphs_dir / "memo_repo_cgraph.json", "w") as f:
+            json.dump(
+                {
+                    "graph": {
+                        "pkg.api.first": ["pkg.helpers.scale"],
+                        "pkg.api.second": ["pkg.helpers.scale", "pkg.helpers.join"],
+                    },
+                    "id2type": {
+                        "pkg.api.first": "FUNCTION",
+                        "pkg.api.second": "FUNCTION",
+                        "pkg.helpers.scale": "FUNCTION",
+                        "pkg.helpers.join": "FUNCTION",
+                    },
+                },
+                f,
+            )
+        clear_slice_memos(self.repo.repo_id)
+
+    def tearDown(self):
+        super().tearDown()
+        clear_slice_memos(self.repo.repo_id)
+
+    def get_function(self, name: str) -> Function:
+        return Function(
+            function_id=Identifier(identifier=f"pkg.api.{name}"),
+            file=self.get_file("pkg/api.py"),
+            function_code="",
+            function_name=name,
+        )
+
+    def get_slicer(self, name: str) -> DependencySlicer:
+        return DependencySlicer.from_function_models(self.get_function(name))
+
+    def get_slice(self, name: str, use_slice_memo: bool) -> str:
+        slicer = self.get_slicer(name)
+        if not use_slice_memo:
+            slicer.slice_memo = None
+        slicer.run()
+        return slicer.dependency_graph.unparse()
+
+    def test_memoized_slices_match(self):
+        expected = [self.get_slice(name, False) for name in ["first", "second"]]
+        self.assertIn("def scale(x)", expected[0])
+        self.assertIn("SCALE = 2", expected[0])
+        self.assertIn("import os", expected[1])
+
+        memo = self.get_slicer("first").slice_memo
+        assert memo is not None
+        self.assertEqual(len(memo), 0)
+
+        # the second slice reuses the dependencies of `scale` and `SCALE`
+        self.assertEqual(self.get_slice("first", True), expected[0])
+        hits = memo.hits
+        self.assertEqual(self.get_slice("second", True), expected[1])
+        self.assertGreater(memo.hits, hits)
+
+        # fully memoized slices match too
+        self.assertEqual(self.get_slice("first", True), expected[0])
+        self.assertEqual(self.get_slice("second", True), expected[1])
+
+    def test_changed_file_invalidates_memo(self):
+        self.get_slice("first", True)
+
+        self.write_repo_file(
+            "pkg/helpers.py",
+            """
+FACTOR = 3
+
+def scale(x):
+    return x * FACTOR
+""",
+        )
+
+        sliced = self.get_slice("first", True)
+        self.assertIn("FACTOR = 3", sliced)
+        self.assertNotIn("SCALE", sliced)
+
+    def test_memo_per_callgraph(self):
+        memo = self.get_slicer("first").slice_memo
+        self.assertIs(self.get_slicer("second").slice_memo, memo)
+
+        # a rebuilt call graph does not reuse the memoized steps
+        callgraph_path = Path(self.repo.callgraph_path)
+        stat = callgraph_path.stat()
+        os.utime(callgraph_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNot(self.get_slicer("first").slice_memo, memo)
+
+        # neither do slicers without a call graph
+        with patch(
+            "r2e.pat.dependency_slicer.slicer_main.CallGraphExplorer",
+            side_effect=FileNotFoundError,
+        ):
+            slicer = self.get_slicer("first")
+        self.assertIsNone(slicer.callgraph_explorer)
+        self.assertIs(slicer.slice_memo, get_slice_memo(self.repo.repo_id, None))
+
+    def test_memos_are_bounded(self):
+        memos = [get_slice_memo(f"repo_{i}") for i in range(3)]
+        with patch.object(slice_memo, "MAX_SLICE_MEMOS", 2):
+            get_slice_memo("repo_0")
+            get_slice_memo("repo_3")
+            self.assertIs(get_slice_memo("repo_0"), memos[0])
+            self.assertIsNot(get_slice_memo("repo_1"), memos[1])
+        for i in range(4):
+            clear_slice_memos(f"repo_{i}")
+
+    def test_slice_many(self):
+        expected = {
+            f"pkg.api.{name}": self.get_slice(name, False)
+            for name in ["first", "second"]
+        }
+
+        functions = [self.get_function(name) for name in ["first", "second"]]
+        missing = self.get_function("missing")
+        with self.assertRaises(AssertionError):
+            DependencySlicer.slice_many(functions + [missing])
+
+        graphs = DependencySlicer.slice_many(functions + [missing], skip_errors=True)
+        self.assertEqual(sorted(graphs), sorted(expected))
+        for function_id, graph in graphs.items():
+            self.assertEqual(graph.unparse(), expected[function_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import ast
+import unittest
+import importlib.util
+
+from r2e.repo_builder.fut_extractor.extract_base import (
+    BAD_DOC_MATCHER,
+    BAD_DOC_SUBSTRINGS,
+    FunctionFeatures,
+    decorator_name,
+)
+from r2e.repo_builder.fut_extractor.extract_functions import FileFunctionExtractor
+from r2e.repo_builder.fut_extractor.extract_methods import FileMethodExtractor
+
+DOCSTRINGS = [
+    "Run the test",
+    "Run the test.",
+    "Run the Test, then return.",
+    "See https://example.com for details.",
+    "See http://example.com.",
+    "TODO: handle the empty case",
+    "A (test) helper",
+    "The 'test' value",
+    'The "test" value',
+    "The test's value",
+    "Check [training] data?",
+    "transformer!",
+    "Run tests only",
+    "Parse test.py and test-case files",
+    "Values like test:1 are kept",
+    "A unittest and a contest",
+    "path/test/file",
+    "x=test",
+    "todo_list of items",
+    "Latest results...test",
+]
+
+
+def reference_has_bad_keyword(docstring: str) -> bool:
+    from nltk.tokenize.destructive import NLTKWordTokenizer
+
+    tokens = NLTKWordTokenizer().tokenize(docstring)
+    return not {token.lower() for token in tokens}.isdisjoint(BAD_DOC_SUBSTRINGS)
+
+
+class TestDocstringKeywords(unittest.TestCase):
+    @unittest.skipUnless(importlib.util.find_spec("nltk"), "requires nltk")
+    def test_same_as_treebank_tokens(self):
+        for docstring in DOCSTRINGS:
+            self.assertEqual(
+                BAD_DOC_MATCHER.search(docstring) is not None,
+                reference_has_bad_keyword(docstring),
+                docstring,
+            )
+
+    def test_sentence_final_period(self):
+        # sentences are split first, so a period ends the token mid-text
+        self.assertIsNotNone(BAD_DOC_MATCHER.search("Run the test. Then stop"))
+        self.assertIsNone(BAD_DOC_MATCHER.search("Run the test.py script"))
+
+
+class TestFunctionFeatures(unittest.TestCase):
+    def parse(self, code: str) -> ast.FunctionDef:
+        return ast.parse(code).body[0]  # type: ignore
+
+    def test_features(self):
+        features = FunctionFeatures(
+            self.parse(
+                'def scale(values, *, factor=2, **kwargs):\n    """Scale"""\n'
+                "    if not values:\n        return None\n"
+                "    return [v * factor for v in values]\n"
+            )
+        )
+        self.assertEqual(features.name, "scale")
+        self.assertEqual(features.num_args, 3)
+        self.assertEqual(features.num_stmts, 3)
+        self.assertEqual(features.docstring, "Scale")
+        self.assertEqual(features.literal_returns, [False])
+        self.assertTrue({"values", "factor", "v", "scale", "2"} <= features.body_tokens)
+
+    def test_decorator_name(self):
+        function_ast = self.parse(
+            "@staticmethod\n@a.b.c\n@cache(1)\n@x[0].y\ndef f():\n    pass\n"
+        )
+        self.assertEqual(
+            [decorator_name(x) for x in function_ast.decorator_list],
+            [ast.unparse(x) for x in function_ast.decorator_list],
+        )
+
+    def test_extract_functions(self):
+        tree = ast.parse(
+            '''
+def kept(values):
+    """Sum the values."""
+    total = sum(values)
+    return total
+
+
+def no_docstring(values):
+    total = sum(values)
+    return total
+
+
+def bad_docstring(values):
+    """TODO: sum the values."""
+    total = sum(values)
+    return total
+
+
+def bad_body(values):
+    """Sum the values."""
+    total = sum(plot(values))
+    return total
+
+
+@decorated
+def with_decorator(values):
+    """Sum the values."""
+    total = sum(values)
+    return total
+
+
+def literal(values):
+    """Sum the values."""
+    total = sum(values)
+    return 0
+'''
+        )
+        self.assertEqual(
+            [f.name for f in FileFunctionExtractor.extract_functions_from_ast(tree)],
+            ["kept"],
+        )
+
+    def test_extract_methods(self):
+        tree = ast.parse(
+            '''
+class A:
+    @staticmethod
+    def kept(values):
+        """Sum the values."""
+        total = sum(values)
+        return total
+
+    @property
+    def with_decorator(self):
+        """Sum the values."""
+        total = sum(self.values)
+        return total
+
+    def wrapper(self):
+        """Sum the values."""
+        return self.total()
+'''
+        )
+        self.assertEqual(
+            [f.name for f in FileMethodExtractor.extract_methods_from_ast(tree)],
+            ["kept"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
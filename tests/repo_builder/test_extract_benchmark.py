@@ -0,0 +1,97 @@
+import os
+import json
+import unittest
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from r2e.models import Repo
+from r2e.models.callgraph import CallGraph
+from r2e.pat.callgraph.explorer import CallGraphExplorer
+from r2e.repo_builder.fut_extractor.extract_repo_data import extract_repo_data
+
+NUM_FILES = 100
+FUNCTIONS_PER_FILE = 100
+
+FUNCTION_TEMPLATE = '''
+def func_{idx}(values, factor):
+    """Scale values by a factor."""
+    scaled = [value * factor for value in values]
+    total = sum(scaled) + {idx}
+    return [value / total for value in scaled]
+'''
+
+
+class TestExtractionBenchmark(unittest.TestCase):
+    """Extraction of a repo with 10k functions loads its call graph once"""
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        repos_dir = Path(self.test_dir.name) / "repos"
+        graphs_dir = Path(self.test_dir.name) / "graphs"
+        os.makedirs(graphs_dir)
+
+        graph = {}
+        for file_idx in range(NUM_FILES):
+            os.makedirs(repos_dir / "bench_repo" / "pkg", exist_ok=True)
+            functions = range(
+                file_idx * FUNCTIONS_PER_FILE, (file_idx + 1) * FUNCTIONS_PER_FILE
+            )
+            with open(
+                repos_dir / "bench_repo" / "pkg" / f"mod_{file_idx}.py", "w"
+            ) as f:
+                f.write("".join(FUNCTION_TEMPLATE.format(idx=idx) for idx in functions))
+            for idx in functions:
+                # every other function calls another function
+                callees = [f"<builtin>.sum"] if idx % 2 == 0 else []
+                graph[f"pkg.mod_{file_idx}.func_{idx}"] = callees
+        with open(graphs_dir / "bench_repo_cgraph.json", "w") as f:
+            json.dump({"graph": graph, "id2type": {}}, f)
+
+        self.patches = [
+            patch("r2e.models.repo.REPOS_DIR", repos_dir),
+            patch("r2e.models.repo.GRAPHS_DIR", graphs_dir),
+        ]
+        for p in self.patches:
+            p.start()
+        self.repo = Repo(
+            repo_org="bench_repo",
+            repo_name="bench_repo",
+            repo_id="bench_repo",
+            local_repo_path="bench_repo",
+        )
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.test_dir.cleanup()
+
+    def test_callgraph_loaded_once(self):
+        with patch.object(
+            CallGraph, "from_json", wraps=CallGraph.from_json
+        ) as from_json:
+            functions, methods = extract_repo_data(self.repo)
+
+        num_functions = NUM_FILES * FUNCTIONS_PER_FILE
+        self.assertEqual(from_json.call_count, 1)
+        self.assertEqual(len(functions), num_functions // 2)
+        self.assertEqual(methods, [])
+
+    def test_callee_count_degree_table(self):
+        explorer = CallGraphExplorer(self.repo)
+        self.assertIsInstance(explorer.callgraph, CallGraph)
+        # counts are read from the degree table, not the callee lists
+        with patch.object(CallGraph, "get", wraps=explorer.callgraph.get) as get:
+            counts = [
+                explorer.get_callee_count(
+                    f"pkg.mod_{idx // FUNCTIONS_PER_FILE}.func_{idx}"
+                )
+                for idx in range(NUM_FILES * FUNCTIONS_PER_FILE)
+            ]
+
+        self.assertEqual(sum(counts), NUM_FILES * FUNCTIONS_PER_FILE // 2)
+        self.assertEqual(get.call_count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,25 @@
+import os
 import unittest
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
 
 from r2e.models import Repo
-from r2e.repo_builder.fut_extractor.extract_repo_data import extract_repo_data
+from r2e.repo_builder.fut_extractor.extract_repo_data import (
+    UTF8_BOM,
+    extract_repo_data,
+    list_python_files,
+    plan_extraction_tasks,
+    read_source,
+)
+
+FUNCTION_CODE = '''
+def scale(values, factor):
+    """Scale values by a factor."""
+    scaled = [value * factor for value in values]
+    total = sum(scaled)
+    return [value / total for value in scaled]
+'''
 
 
 class TestExtractRepoData(unittest.TestCase):
@@ -16,3 +34,77 @@ class TestExtractRepoData(unittest.TestCase):
         repo = Repo(**repo_dict)
 
         extract_repo_data(repo)
+
+
+class TestExtractFiles(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.repos_dir = Path(self.test_dir.name)
+        self.repo_dir = self.repos_dir / "ext_repo"
+        for rel_path in [
+            "pkg/__init__.py",
+            "pkg/core.py",
+            "pkg/data.json",
+            ".hidden/skip.py",
+            "pkg/.cache/skip.py",
+        ]:
+            os.makedirs((self.repo_dir / rel_path).parent, exist_ok=True)
+            with open(self.repo_dir / rel_path, "w") as f:
+                f.write(FUNCTION_CODE)
+
+        self.patch = patch("r2e.models.repo.REPOS_DIR", self.repos_dir)
+        self.patch.start()
+        self.repo = Repo(
+            repo_org="ext_repo",
+            repo_name="ext_repo",
+            repo_id="ext_repo",
+            local_repo_path="ext_repo",
+        )
+
+    def tearDown(self):
+        self.patch.stop()
+        self.test_dir.cleanup()
+
+    def test_list_python_files(self):
+        file_paths = list_python_files(self.repo)
+        self.assertEqual(
+            [os.path.relpath(path, self.repo_dir) for path in file_paths],
+            ["pkg/__init__.py", "pkg/core.py"],
+        )
+
+    def test_read_source_removes_bom(self):
+        file_path = self.repo_dir / "pkg" / "core.py"
+        with open(file_path, "wb") as f:
+            f.write(UTF8_BOM + FUNCTION_CODE.encode())
+
+        self.assertEqual(read_source(str(file_path)), FUNCTION_CODE)
+        with open(file_path, "rb") as f:
+            self.assertEqual(f.read(), FUNCTION_CODE.encode())
+
+    def test_plan_extraction_tasks(self):
+        for idx in range(5):
+            with open(self.repo_dir / f"module_{idx}.py", "w") as f:
+                f.write(FUNCTION_CODE)
+
+        tasks = plan_extraction_tasks([self.repo], chunk_size=3)
+        self.assertEqual([len(file_paths) for _, file_paths in tasks], [3, 3, 1])
+        self.assertEqual(
+            sum((file_paths for _, file_paths in tasks), []),
+            list_python_files(self.repo),
+        )
+
+    def test_extract_file_with_bom(self):
+        file_path = self.repo_dir / "pkg" / "core.py"
+        with open(file_path, "wb") as f:
+            f.write(UTF8_BOM + FUNCTION_CODE.encode())
+
+        functions, methods = extract_repo_data(self.repo)
+        self.assertEqual(
+            sorted(function.id for function in functions),
+            ["pkg.__init__.scale", "pkg.core.scale"],
+        )
+        self.assertEqual(methods, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import unittest
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from r2e.models import Repo, File
+
+
+class RepoTestCase(unittest.TestCase):
+    """Test case with a repo (`repo_id`) in temporary repos and graphs dirs.
+
+    `setUp` patches the `REPOS_DIR` and `GRAPHS_DIR` used by `Repo` and
+    creates `self.repo`; subclasses write the repo files with
+    `write_repo_file` and start their own patches with `start_patch`
+    (all the patches are stopped in `tearDown`).
+    """
+
+    repo_id = "test_repo"
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.repos_dir = Path(self.test_dir.name) / "repos"
+        self.graphs_dir = Path(self.test_dir.name) / "graphs"
+        self.repo_dir = self.repos_dir / self.repo_id
+        os.makedirs(self.repo_dir)
+        os.makedirs(self.graphs_dir)
+
+        self.patches = []
+        self.start_patch(patch("r2e.models.repo.REPOS_DIR", self.repos_dir))
+        self.start_patch(patch("r2e.models.repo.GRAPHS_DIR", self.graphs_dir))
+
+        self.repo = Repo(
+            repo_org=self.repo_id,
+            repo_name=self.repo_id,
+            repo_id=self.repo_id,
+            local_repo_path=self.repo_id,
+        )
+
+    def tearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        self.test_dir.cleanup()
+
+    def start_patch(self, p):
+        p.start()
+        self.patches.append(p)
+
+    def write_repo_file(self, rel_path: str, code: str) -> Path:
+        path = self.repo_dir / rel_path
+        os.makedirs(path.parent, exist_ok=True)
+        with open(path, "w") as f:
+            f.write(code)
+        return path
+
+    def get_file(self, rel_path: str) -> File:
+        return File.from_file_path(str(self.repo_dir / rel_path), self.repo)
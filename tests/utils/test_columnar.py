@@ -0,0 +1,152 @@
+import os
+import unittest
+import tempfile
+import importlib.util
+from pathlib import Path
+from unittest.mock import patch
+
+from r2e.models import Repo, File, Function, Method, Identifier, Context
+from r2e.models import Tests as GeneratedTests
+from r2e.models import TestHistory
+from r2e.models.fut import FunctionUnderTest, MethodUnderTest
+from r2e.models.codegen_problem import CodeGenProblemFunction
+from r2e.utils.data import write_functions_under_test
+from r2e.utils.columnar import ColumnarWriter, ColumnarDataset, export_columnar
+
+API_CODE = """
+def first(x):
+    return x
+
+
+class Box:
+    def get(self):
+        return self.value
+"""
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyarrow"), "requires pyarrow")
+class TestColumnar(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.out_dir = Path(self.test_dir.name) / "columnar"
+        self.repos_dir = Path(self.test_dir.name) / "repos"
+        os.makedirs(self.repos_dir / "col_repo")
+        with open(self.repos_dir / "col_repo" / "api.py", "w") as f:
+            f.write(API_CODE)
+        with open(self.repos_dir / "col_repo" / "utils.py", "w") as f:
+            f.write("def second(x):\n    return x\n")
+
+        self.patch = patch("r2e.models.repo.REPOS_DIR", self.repos_dir)
+        self.patch.start()
+
+        repo = Repo(
+            repo_org="col_repo",
+            repo_name="col_repo",
+            repo_id="col_repo",
+            local_repo_path="col_repo",
+        )
+        api = File.from_file_path(str(self.repos_dir / "col_repo" / "api.py"), repo)
+        utils = File.from_file_path(str(self.repos_dir / "col_repo" / "utils.py"), repo)
+        history = TestHistory(
+            history=[
+                GeneratedTests(tests={"test_1": "def test_1(): pass"}),
+                GeneratedTests(
+                    tests={"test_1": "def test_1(): assert True"},
+                    operation="refine",
+                    exec_stats={"run_tests_logs": {"test_1": {"valid": True}}},
+                ),
+            ]
+        )
+        first = Function(
+            function_id=Identifier(identifier="api.first"),
+            file=api,
+            function_code="def first(x):\n    return x\n",
+            context=Context(context="# api.py", context_type="sliced"),
+        )
+        self.records = [
+            FunctionUnderTest.from_function_and_history(first, history),
+            MethodUnderTest.from_method_and_history(
+                Method(
+                    method_id=Identifier(identifier="api.Box.get"),
+                    file=api,
+                    method_code="def get(self):\n    return self.value\n",
+                ),
+                TestHistory(),
+            ),
+            FunctionUnderTest.from_function_and_history(
+                Function(
+                    function_id=Identifier(identifier="utils.second"),
+                    file=utils,
+                    function_code="def second(x):\n    return x\n",
+                ),
+                TestHistory(),
+            ),
+        ]
+
+    def tearDown(self):
+        self.patch.stop()
+        self.test_dir.cleanup()
+
+    def write(self, records, shard_size: int = 100_000) -> ColumnarDataset:
+        with ColumnarWriter(self.out_dir, shard_size=shard_size) as writer:
+            writer.write_many(records)
+        return ColumnarDataset(self.out_dir)
+
+    def test_normalized_tables(self):
+        dataset = self.write(self.records)
+        self.assertEqual(dataset.table("repos").num_rows, 1)
+        self.assertEqual(dataset.table("files").num_rows, 2)
+        self.assertEqual(len(dataset), 3)
+        self.assertEqual(dataset.table("tests").num_rows, 2)
+
+    def test_round_trip(self):
+        dataset = self.write(self.records, shard_size=2)
+        self.assertEqual(
+            len(list((self.out_dir / "functions").glob("part-*.arrow"))), 2
+        )
+
+        loaded = list(dataset.to_models())
+        self.assertEqual(
+            [x.model_dump() for x in loaded], [x.model_dump() for x in self.records]
+        )
+        self.assertEqual([type(x) for x in loaded], [type(x) for x in self.records])
+        self.assertTrue(loaded[0].is_passing)
+        # the functions of a file share the same file
+        self.assertIs(loaded[0].file, loaded[1].file)
+
+    def test_codegen_problem(self):
+        problem = CodeGenProblemFunction.from_fut_and_spec(self.records[0], "spec")
+        (loaded,) = self.write([problem]).to_models()
+        self.assertIsInstance(loaded, CodeGenProblemFunction)
+        self.assertEqual(loaded.spec, "spec")
+
+    def test_projection(self):
+        import pyarrow.dataset as ds
+
+        dataset = self.write(self.records)
+        table = dataset.functions(
+            ["id", "repo_id", "module_id"], filter=ds.field("kind") == "function"
+        )
+        self.assertEqual(table.column_names, ["id", "repo_id", "module_id"])
+        self.assertEqual(
+            sorted(table.to_pylist(), key=lambda row: row["id"]),
+            [
+                {"id": "api.first", "repo_id": "col_repo", "module_id": "api"},
+                {"id": "utils.second", "repo_id": "col_repo", "module_id": "utils"},
+            ],
+        )
+        with self.assertRaises(ValueError):
+            dataset.functions(["unknown"])
+
+    def test_export(self):
+        in_file = Path(self.test_dir.name) / "futs.json"
+        write_functions_under_test(self.records, in_file)
+        self.assertEqual(export_columnar(str(in_file), str(self.out_dir)), 3)
+        self.assertEqual(
+            [x.id for x in ColumnarDataset(self.out_dir).to_models()],
+            [x.id for x in self.records],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import json
+import unittest
+import tempfile
+import importlib.util
+from pathlib import Path
+from unittest.mock import patch
+
+from r2e.models import Repo, File, Function, Identifier
+from r2e.models import Tests as GeneratedTests
+from r2e.models.fut import FunctionUnderTest
+from r2e.utils.data import (
+    RecordWriter,
+    find_data_file,
+    iter_batches,
+    iter_functions,
+    iter_functions_under_test,
+    load_functions,
+    write_functions,
+)
+
+
+class TestData(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.test_dir.name) / "data"
+        self.repos_dir = Path(self.test_dir.name) / "repos"
+        os.makedirs(self.repos_dir / "data_repo")
+        with open(self.repos_dir / "data_repo" / "api.py", "w") as f:
+            f.write("def first(x):\n    return x\n\ndef second(x):\n    return x\n")
+
+        self.patch = patch("r2e.models.repo.REPOS_DIR", self.repos_dir)
+        self.patch.start()
+
+        repo = Repo(
+            repo_org="data_repo",
+            repo_name="data_repo",
+            repo_id="data_repo",
+            local_repo_path="data_repo",
+        )
+        file = File.from_file_path(str(self.repos_dir / "data_repo" / "api.py"), repo)
+        self.functions = [
+            Function(
+                function_id=Identifier(identifier=f"api.{name}"),
+                file=file,
+                function_code=f"def {name}(x):\n    return x\n",
+                function_name=name,
+            )
+            for name in ["first", "second"]
+        ]
+
+    def tearDown(self):
+        self.patch.stop()
+        self.test_dir.cleanup()
+
+    def test_jsonl_roundtrip(self):
+        file_path = self.data_dir / "functions.jsonl"
+        write_functions(self.functions, file_path)
+
+        with open(file_path, "r") as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        loaded = list(iter_functions(file_path))
+        self.assertEqual([f.id for f in loaded], ["api.first", "api.second"])
+        self.assertEqual(loaded[0].function_code, self.functions[0].function_code)
+
+    def test_records_of_a_file_share_it(self):
+        file_path = self.data_dir / "functions.jsonl"
+        write_functions(self.functions, file_path)
+        first, second = load_functions(file_path)
+        self.assertIs(first.file, second.file)
+        self.assertEqual(first.file, self.functions[0].file)
+
+        with open(file_path, "a") as f:
+            other = self.functions[0].model_dump()
+            other["file"]["file_module"]["repo"]["repo_name"] = "other_repo"
+            f.write(json.dumps(other) + "\n")
+        _, second, other = load_functions(file_path)
+        self.assertIsNot(other.file, second.file)
+        self.assertEqual(other.file.repo.repo_name, "other_repo")
+
+    def test_legacy_json(self):
+        file_path = self.data_dir / "functions.json"
+        os.makedirs(self.data_dir)
+        write_functions(self.functions, file_path)
+
+        with open(file_path, "r") as f:
+            self.assertIsInstance(json.load(f), list)
+        self.assertEqual(len(load_functions(file_path)), 2)
+        self.assertEqual(find_data_file(self.data_dir, "functions"), file_path)
+
+    def test_append_and_truncated_record(self):
+        file_path = self.data_dir / "futs.jsonl"
+        fut = FunctionUnderTest.from_function(self.functions[0])
+        fut.update_history(GeneratedTests(tests={"test_0": "def test(): pass"}))
+
+        with RecordWriter(file_path) as writer:
+            writer.write(fut)
+
+        with RecordWriter(file_path, append=True) as writer:
+            writer.write(FunctionUnderTest.from_function(self.functions[1]))
+
+        # an interrupted writer can leave a partial last line
+        with open(file_path, "a") as f:
+            f.write('{"function_id": {"ident')
+
+        futs = list(iter_functions_under_test(file_path))
+        self.assertEqual([f.id for f in futs], ["api.first", "api.second"])
+        self.assertEqual(futs[0].tests, {"test_0": "def test(): pass"})
+        self.assertEqual(find_data_file(self.data_dir, "futs"), file_path)
+
+    def test_corrupt_record_is_an_error(self):
+        file_path = self.data_dir / "functions.jsonl"
+        write_functions(self.functions, file_path)
+        with open(file_path) as f:
+            lines = f.readlines()
+        with open(file_path, "w") as f:
+            f.writelines([lines[0][:20] + "\n", lines[1]])
+
+        with self.assertRaisesRegex(ValueError, "line 1 of"):
+            list(iter_functions(file_path))
+
+    def test_append_after_truncated_record(self):
+        file_path = self.data_dir / "functions.jsonl"
+        write_functions(self.functions[:1], file_path)
+        with open(file_path, "a") as f:
+            f.write('{"function_id": {"ident')
+
+        with RecordWriter(file_path, append=True) as writer:
+            writer.write(self.functions[1])
+
+        # the truncated record is now a bad line in the middle of the file
+        with self.assertRaisesRegex(ValueError, "line 2 of"):
+            list(iter_functions(file_path))
+
+    @unittest.skipUnless(importlib.util.find_spec("zstandard"), "requires zstandard")
+    def test_zstd_roundtrip(self):
+        file_path = self.data_dir / "functions.jsonl.zst"
+        write_functions(self.functions[:1], file_path)
+        with RecordWriter(file_path, append=True) as writer:
+            writer.write(self.functions[1])
+
+        loaded = list(iter_functions(file_path))
+        self.assertEqual([f.id for f in loaded], ["api.first", "api.second"])
+
+    def test_iter_batches(self):
+        batches = list(iter_batches(iter(range(5)), 2))
+        self.assertEqual(batches, [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(iter_batches([], 2)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()